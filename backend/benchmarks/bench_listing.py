@@ -0,0 +1,142 @@
+"""Before/after numbers for projected listing queries and lean serialization.
+
+Simulates one page of /news/all without a database: BSON bytes on the wire,
+BSON decode time, and response build time, for full documents with the old
+formatter versus projected documents with the lean serializer.
+
+    python -m backend.benchmarks.bench_listing --limit 20 --rounds 2000
+"""
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+import bson
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from backend.routes.news import LISTING_PROJECTION, BREAKING_PROJECTION, _serialize_listing
+from backend.services.response_cache import ResponseCache, orjson
+
+WORDS = ['महाराष्ट्र', 'सरकार', 'जालना', 'पुलिस', 'किसान', 'योजना', 'हादसा', 'मुंबई', 'बारिश', 'चुनाव',
+         'अस्पताल', 'गिरफ्तार', 'विधानसभा', 'क्रिकेट', 'फिल्म', 'सड़क', 'पानी', 'स्कूल', 'बाजार', 'मराठवाड़ा']
+
+
+def make_article(article_id: int, rng: random.Random) -> dict:
+    def text(words: int) -> str:
+        return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+    now = datetime(2025, 1, 1) - timedelta(minutes=article_id)
+    return {
+        '_id': ObjectId(),
+        'articleId': article_id,
+        'title': text(10),
+        'summary': text(30),
+        'content': text(rng.randint(300, 500)),
+        'category': rng.choice(['अपराध', 'राजनीति', 'खेल', 'स्थानीय']),
+        'district': rng.choice([None, 'जालना', 'परभणी']),
+        'image': 'https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=800',
+        'date': now,
+        'author': 'महादेश न्यूज़ डेस्क',
+        'views': rng.randint(0, 50000),
+        'sourceTitle': text(12),
+        'sourceUrl': f'https://example.com/story/{article_id}',
+        'sourcePublishedAt': now.isoformat(),
+        'isBreaking': rng.random() < 0.3,
+        'priority': rng.choice([5, 7, 10]),
+        'aiGenerated': True,
+        'createdAt': now,
+        'updatedAt': now
+    }
+
+
+def project(doc: dict, projection: dict) -> dict:
+    return {key: doc[key] for key, include in projection.items() if include and key in doc}
+
+
+def legacy_format(article: dict) -> dict:
+    """The listing formatter as it was before projections"""
+    return {
+        'id': article['articleId'],
+        'title': article['title'],
+        'summary': article['summary'],
+        'category': article['category'],
+        'district': article.get('district'),
+        'image': article['image'],
+        'date': article['date'].isoformat() if isinstance(article['date'], datetime) else article['date'],
+        'author': article['author'],
+        'views': article['views']
+    }
+
+
+def timed(fn, rounds: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def run(limit: int, rounds: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    full_docs = [make_article(i, rng) for i in range(1, limit + 1)]
+    listing_docs = [project(doc, LISTING_PROJECTION) for doc in full_docs]
+    ticker_docs = [project(doc, BREAKING_PROJECTION) for doc in full_docs[:10]]
+
+    full_wire = b''.join(bson.encode(doc) for doc in full_docs)
+    listing_wire = b''.join(bson.encode(doc) for doc in listing_docs)
+    ticker_full_wire = b''.join(bson.encode(doc) for doc in full_docs[:10])
+    ticker_wire = b''.join(bson.encode(doc) for doc in ticker_docs)
+
+    def build_before():
+        payload = {'success': True, 'data': {'articles': [legacy_format(a) for a in bson.decode_all(full_wire)]}}
+        return json.dumps(jsonable_encoder(payload), ensure_ascii=False).encode('utf-8')
+
+    def build_after():
+        payload = {'success': True, 'data': {'articles': [_serialize_listing(a) for a in bson.decode_all(listing_wire)]}}
+        return ResponseCache.serialize(payload)
+
+    return {
+        'limit': limit,
+        'orjson': orjson is not None,
+        'listing': {
+            'wireBytes': {'before': len(full_wire), 'after': len(listing_wire)},
+            'decodeUs': {
+                'before': round(timed(lambda: bson.decode_all(full_wire), rounds), 1),
+                'after': round(timed(lambda: bson.decode_all(listing_wire), rounds), 1)
+            },
+            'decodeAndBuildUs': {
+                'before': round(timed(build_before, rounds), 1),
+                'after': round(timed(build_after, rounds), 1)
+            }
+        },
+        'breaking': {
+            'wireBytes': {'before': len(ticker_full_wire), 'after': len(ticker_wire)},
+            'decodeUs': {
+                'before': round(timed(lambda: bson.decode_all(ticker_full_wire), rounds), 1),
+                'after': round(timed(lambda: bson.decode_all(ticker_wire), rounds), 1)
+            }
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--limit', type=int, default=20, help='articles per page')
+    parser.add_argument('--rounds', type=int, default=2000)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run(args.limit, args.rounds)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"page of {args.limit} articles, orjson={'yes' if results['orjson'] else 'no'}")
+    for endpoint in ('listing', 'breaking'):
+        for metric, values in results[endpoint].items():
+            ratio = values['before'] / values['after'] if values['after'] else float('inf')
+            print(f"  {endpoint:9} {metric:17} before={values['before']:>10} after={values['after']:>10}  ({ratio:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""End-to-end fetch job throughput against the fake NewsAPI and a fake LLM.
+
+Runs NewsScheduler.fetch_and_process_news() as the scheduler leader, with
+NewsAPI served by fake_newsapi on localhost and rewrites answered by
+fake_llm. Every round starts from an empty database, so each is a full
+backfill of the fake feed. Reports job wall time, stored articles per
+second, NewsAPI and LLM requests and per-stage timings. The LLM rate
+limiter is lifted unless AI_REQUESTS_PER_MINUTE / AI_TOKENS_PER_MINUTE are
+set, so the numbers measure the pipeline rather than the quota.
+
+    python -m backend.benchmarks.bench_pipeline --rounds 3 --newsapi-latency-ms 50 --llm-latency-ms 800
+"""
+import os
+import json
+import time
+import asyncio
+import argparse
+from typing import Dict, Optional
+import uvicorn
+from backend.benchmarks.bench_upstream import free_port
+from backend.benchmarks.corpus import DEFAULT_DB_NAME, open_database
+from backend.benchmarks.fake_llm import make_chat_factory
+from backend.benchmarks.fake_newsapi import create_app
+from backend.services.indexes import ensure_indexes
+
+
+async def run_round(db, chat_factory) -> Dict:
+    from backend.services.scheduler import NewsScheduler
+
+    await ensure_indexes(db)
+    scheduler = NewsScheduler(db, chat_factory=chat_factory)
+    await scheduler.lock.acquire()
+    requests_before = chat_factory.stats['requests']
+    try:
+        started = time.perf_counter()
+        result = await scheduler.fetch_and_process_news()
+        seconds = time.perf_counter() - started
+    finally:
+        await scheduler.lock.release()
+        await scheduler.pipeline.close()
+
+    if result is None:
+        raise RuntimeError("The fetch job did not run (leader lock or run claim refused)")
+    stored = result.get('articlesProcessed', 0)
+    return {
+        'status': result['status'],
+        'seconds': round(seconds, 3),
+        'articlesStored': stored,
+        'articlesPerSecond': round(stored / seconds, 2) if seconds else 0.0,
+        'newsapiRequests': scheduler.pipeline.news_fetcher.last_run_stats.get('requests', 0),
+        'llmRequests': chat_factory.stats['requests'] - requests_before,
+        'llm': result.get('llm', {}),
+        'timings': result.get('timings', {})
+    }
+
+
+async def run(
+    rounds: int,
+    newsapi_latency_ms: float = 0.0,
+    llm_latency_ms: float = 0.0,
+    llm_ms_per_article: float = 0.0,
+    llm_words: int = 400,
+    malformed_rate: float = 0.0,
+    interval_minutes: float = 20,
+    mongo_uri: Optional[str] = None,
+    db_name: str = DEFAULT_DB_NAME
+) -> Dict:
+    port = free_port()
+    os.environ.setdefault('NEWS_API_KEY', 'bench')
+    os.environ.setdefault('EMERGENT_LLM_KEY', 'bench')
+    os.environ.setdefault('AI_REQUESTS_PER_MINUTE', '1000000')
+    os.environ.setdefault('AI_TOKENS_PER_MINUTE', '1000000000')
+    os.environ['NEWS_API_BASE_URL'] = f"http://127.0.0.1:{port}/v2"
+
+    app = create_app(interval_minutes=interval_minutes, latency_ms=newsapi_latency_ms)
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    chat_factory = make_chat_factory(
+        latency_ms=llm_latency_ms,
+        ms_per_article=llm_ms_per_article,
+        words=llm_words,
+        malformed_rate=malformed_rate
+    )
+    results = []
+    try:
+        for _ in range(rounds):
+            db = open_database(mongo_uri, f"{db_name}_pipeline")
+            await db.client.drop_database(db.name)
+            results.append(await run_round(db, chat_factory))
+    finally:
+        server.should_exit = True
+        await serving
+
+    seconds = sorted(r['seconds'] for r in results)
+    throughput = sorted(r['articlesPerSecond'] for r in results)
+    return {
+        'rounds': rounds,
+        'mongo': 'mongod' if mongo_uri else 'mongomock',
+        'newsapiLatencyMs': newsapi_latency_ms,
+        'llmLatencyMs': llm_latency_ms,
+        'llmMsPerArticle': llm_ms_per_article,
+        'malformedRate': malformed_rate,
+        'medianSeconds': seconds[len(seconds) // 2],
+        'medianArticlesPerSecond': throughput[len(throughput) // 2],
+        'runs': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--newsapi-latency-ms', type=float, default=0.0)
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='fake LLM latency per request')
+    parser.add_argument('--llm-ms-per-article', type=float, default=0.0, help='extra latency per article in a request')
+    parser.add_argument('--llm-words', type=int, default=400, help='words per rewritten article')
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help='share of rewrites the fake LLM garbles')
+    parser.add_argument('--interval-minutes', type=float, default=20, help='fake NewsAPI article spacing')
+    parser.add_argument('--mongo-uri', help='use this mongod instead of an in-memory mongomock')
+    parser.add_argument('--db', default=DEFAULT_DB_NAME)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(
+        args.rounds, args.newsapi_latency_ms, args.llm_latency_ms, args.llm_ms_per_article, args.llm_words,
+        args.malformed_rate, args.interval_minutes, args.mongo_uri, args.db
+    ))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.rounds} fetch jobs on {results['mongo']}, NewsAPI latency={args.newsapi_latency_ms}ms, "
+          f"LLM latency={args.llm_latency_ms}ms")
+    for number, r in enumerate(results['runs'], 1):
+        stages = ' '.join(f"{stage}={ms:.0f}" for stage, ms in r['timings'].items())
+        print(f"  run {number}: {r['status']}, {r['articlesStored']} articles in {r['seconds']}s "
+              f"({r['articlesPerSecond']}/s), {r['newsapiRequests']} NewsAPI / {r['llmRequests']} LLM requests")
+        print(f"         stages (ms): {stages}")
+    print(f"  median: {results['medianSeconds']}s, {results['medianArticlesPerSecond']} articles/s")
+
+
+if __name__ == '__main__':
+    main()
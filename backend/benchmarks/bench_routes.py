@@ -0,0 +1,210 @@
+"""Requests/s and p50/p99 latency of every /api/news route on a synthetic corpus.
+
+Loads a corpus (see corpus.py) into a local mongod or mongomock, serves
+the news router the way server.py mounts it with uvicorn on localhost, and
+drives each route with `--concurrency` clients, varying pages, categories,
+article IDs and search terms. Listing responses are cached in process, so
+by default the parameter mix decides the hit rate; `--cold` clears the
+response cache before every request. /stream is timed to its first
+backfilled article.
+
+    python -m backend.benchmarks.bench_routes --articles 10000 --requests 500 --concurrency 8
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+import uvicorn
+from fastapi import FastAPI, APIRouter
+from backend.benchmarks.bench_search import NEWS_TERMS, percentile
+from backend.benchmarks.bench_upstream import free_port
+from backend.benchmarks.corpus import CATEGORIES, DEFAULT_DB_NAME, load_corpus, open_database
+from backend.routes import news
+from backend.services.response_cache import news_cache
+
+
+def build_app(db) -> FastAPI:
+    app = FastAPI(title="Mahadeshnews API (benchmark)")
+    api_router = APIRouter(prefix="/api")
+    news.set_db(db)
+    api_router.include_router(news.router)
+    app.include_router(api_router)
+    return app
+
+
+def make_workload(rng: random.Random, max_id: int) -> Dict[str, Callable[[], Tuple[str, str]]]:
+    """Route template -> a function returning the next (method, URL) to request"""
+    def recent_id() -> int:
+        # Readers mostly open recent articles
+        return max(1, max_id - int(rng.expovariate(1 / 200)))
+
+    def search_query() -> str:
+        return ' '.join(rng.sample(NEWS_TERMS, rng.randint(1, 2)))
+
+    return {
+        '/news/all': lambda: ('GET', f"/api/news/all?page={rng.randint(1, 5)}&limit=20"),
+        '/news/breaking': lambda: ('GET', "/api/news/breaking"),
+        '/news/trending': lambda: ('GET', f"/api/news/trending?limit={rng.choice([10, 20])}"),
+        '/news/search': lambda: ('GET', f"/api/news/search?q={search_query()}&page={rng.randint(1, 2)}"),
+        '/news/{article_id}': lambda: ('GET', f"/api/news/{recent_id()}"),
+        '/news/increment-view/{article_id}': lambda: ('POST', f"/api/news/increment-view/{recent_id()}"),
+        '/news/category/{category}': lambda: (
+            'GET', f"/api/news/category/{rng.choice(CATEGORIES)}?page={rng.randint(1, 3)}"
+        )
+    }
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict:
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / seconds, 1) if seconds else 0.0,
+        'latencyMs': {
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'mean': round(sum(latencies) / len(latencies), 2),
+            'max': round(max(latencies), 2)
+        }
+    }
+
+
+async def measure(client: httpx.AsyncClient, send: Callable, requests: int, concurrency: int) -> Dict:
+    """Run `send` `requests` times over `concurrency` workers; it returns True on success"""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            ok = await send(client)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def request_sender(next_request: Callable[[], Tuple[str, str]], cold: bool) -> Callable:
+    async def send(client: httpx.AsyncClient) -> bool:
+        method, url = next_request()
+        if cold:
+            news_cache.invalidate()
+        response = await client.request(method, url)
+        return response.status_code < 400
+    return send
+
+
+def stream_sender(max_id: int) -> Callable:
+    async def send(client: httpx.AsyncClient) -> bool:
+        # Connect, receive the backfilled articles' first frame, disconnect
+        async with client.stream('GET', f"/api/news/stream?format=ndjson&after={max(max_id - 5, 0)}") as response:
+            if response.status_code >= 400:
+                return False
+            async for line in response.aiter_lines():
+                if line.strip():
+                    return True
+        return False
+    return send
+
+
+async def run(
+    articles: int,
+    requests: int,
+    concurrency: int,
+    cold: bool = False,
+    warmup: int = 20,
+    mongo_uri: Optional[str] = None,
+    db_name: str = DEFAULT_DB_NAME,
+    seed: int = 9
+) -> Dict:
+    db = open_database(mongo_uri, db_name)
+    if articles:
+        corpus = await load_corpus(db, articles)
+    else:
+        # Reuse a corpus already loaded with `python -m backend.benchmarks.corpus`
+        corpus = {'articles': await db.articles.count_documents({}), 'loadSeconds': 0}
+    last = await db.articles.find_one({}, {'articleId': 1}, sort=[('articleId', -1)])
+    max_id = last['articleId'] if last else 1
+
+    app = build_app(db)
+    started = time.perf_counter()
+    await news.search_index.load()
+    await news.trending.load()
+    index_seconds = time.perf_counter() - started
+    news.view_counter.start()
+    news_cache.invalidate()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    rng = random.Random(seed)
+    senders = {
+        route: request_sender(next_request, cold)
+        for route, next_request in make_workload(rng, max_id).items()
+    }
+    senders['/news/stream'] = stream_sender(max_id)
+
+    results = {}
+    try:
+        limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            for route, send in senders.items():
+                if warmup:
+                    await measure(client, send, warmup, concurrency)
+                results[route] = await measure(client, send, requests, concurrency)
+    finally:
+        server.should_exit = True
+        await serving
+        await news.view_counter.stop()
+
+    return {
+        'articles': corpus['articles'],
+        'loadSeconds': corpus['loadSeconds'],
+        'indexSeconds': round(index_seconds, 1),
+        'mongo': 'mongod' if mongo_uri else 'mongomock',
+        'requests': requests,
+        'concurrency': concurrency,
+        'cold': cold,
+        'routes': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000, help='corpus size to load (0: use the existing one)')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20, help='unmeasured requests per route')
+    parser.add_argument('--cold', action='store_true', help='clear the response cache before every request')
+    parser.add_argument('--mongo-uri', help='use this mongod instead of an in-memory mongomock')
+    parser.add_argument('--db', default=DEFAULT_DB_NAME)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(
+        args.articles, args.requests, args.concurrency, args.cold, args.warmup, args.mongo_uri, args.db
+    ))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['articles']} articles on {results['mongo']}, {args.requests} requests per route, "
+          f"concurrency {args.concurrency}{', cold cache' if args.cold else ''}")
+    for route, r in results['routes'].items():
+        latency = r['latencyMs']
+        print(f"  {route:36} {r['rps']:>8} req/s  p50={latency['p50']:>8}ms  p99={latency['p99']:>8}ms  "
+              f"{r['errors']} errors")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Query latency of the in-process search index on a synthetic Hindi corpus.
+
+Builds a corpus with a Zipfian vocabulary of pseudo-Hindi words plus real
+news terms, indexes it, and times a mix of one-to-three term queries over
+common, mid-frequency and rare terms.
+
+    python -m backend.benchmarks.bench_search --articles 100000
+"""
+import json
+import time
+import random
+import argparse
+from typing import Dict, List
+from backend.services.search_index import SearchIndex
+
+CONSONANTS = 'कखगघचछजझटठडढतथदधनपफबभमयरलवशसह'
+VOWEL_SIGNS = ['', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ', 'ं']
+NEWS_TERMS = ['महाराष्ट्र', 'सरकार', 'जालना', 'पुलिस', 'किसान', 'योजना', 'हादसा', 'मुंबई', 'बारिश', 'चुनाव',
+              'अस्पताल', 'गिरफ्तार', 'विधानसभा', 'क्रिकेट', 'फिल्म', 'सड़क', 'पानी', 'स्कूल', 'बाजार', 'मराठवाड़ा']
+
+
+def make_vocabulary(size: int, rng: random.Random) -> List[str]:
+    words = set(NEWS_TERMS)
+    while len(words) < size:
+        syllables = rng.randint(2, 4)
+        words.add(''.join(rng.choice(CONSONANTS) + rng.choice(VOWEL_SIGNS) for _ in range(syllables)))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def make_corpus(count: int, vocabulary: List[str], rng: random.Random):
+    """Yield synthetic articles whose words follow a Zipf distribution"""
+    cumulative = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank ** 1.07
+        cumulative.append(total)
+
+    def text(words: int) -> str:
+        return ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=words))
+
+    for article_id in range(1, count + 1):
+        yield {
+            'articleId': article_id,
+            'title': text(10),
+            'summary': text(30),
+            'content': text(rng.randint(300, 500))
+        }
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(articles: int, queries: int, vocabulary_size: int, seed: int = 11) -> Dict:
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    index = SearchIndex()
+
+    started = time.perf_counter()
+    for article in make_corpus(articles, vocabulary, rng):
+        index.add(article)
+    build_seconds = time.perf_counter() - started
+
+    # Common (top 100), mid (100-2000) and rare (tail) terms, 1-3 per query
+    bands = [vocabulary[:100], vocabulary[100:2000], vocabulary[2000:]]
+    query_set = [
+        ' '.join(rng.choice(rng.choice(bands)) for _ in range(rng.randint(1, 3)))
+        for _ in range(queries)
+    ]
+
+    latencies = []
+    for query in query_set:
+        started = time.perf_counter()
+        index.search(query, offset=0, limit=20)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        'articles': articles,
+        'terms': len(index._postings),
+        'buildSeconds': round(build_seconds, 1),
+        'queries': queries,
+        'latencyMs': {
+            'p50': round(percentile(latencies, 0.50), 2),
+            'p95': round(percentile(latencies, 0.95), 2),
+            'p99': round(percentile(latencies, 0.99), 2),
+            'max': round(max(latencies), 2)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--vocabulary', type=int, default=50000)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = run(args.articles, args.queries, args.vocabulary)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    latency = results['latencyMs']
+    print(f"{results['articles']} articles, {results['terms']} terms, built in {results['buildSeconds']}s")
+    print(f"{results['queries']} queries: p50={latency['p50']}ms p95={latency['p95']}ms "
+          f"p99={latency['p99']}ms max={latency['max']}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Upstream fetch cost against the local fake NewsAPI: throwaway vs pooled client.
+
+Runs NewsFetcher.fetch_all_news() several times against an in-process fake
+NewsAPI. "before" opens a fresh connection per query and takes the body
+uncompressed, like the old per-call NewsApiClient; "after" uses the shared
+pooled UpstreamClient with gzip and retries. Runs are plain HTTP on
+localhost, so the TLS handshakes saved in production are not included.
+
+    python -m backend.benchmarks.bench_upstream --rounds 5 --latency-ms 30
+"""
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+from typing import Dict
+import httpx
+import uvicorn
+from backend.benchmarks.fake_newsapi import create_app
+from backend.services.http_client import UpstreamClient
+
+
+class ThrowawayClient(UpstreamClient):
+    """One connection per request, no compression, no retries"""
+
+    async def _send(self, url: str, headers: Dict) -> httpx.Response:
+        async with httpx.AsyncClient(headers={'Accept-Encoding': 'identity'}) as client:
+            self.stats['requests'] += 1
+            response = await client.get(url, headers=headers)
+            self.stats['bytes'] += len(response.content)
+            return response
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def measure(client: UpstreamClient, rounds: int) -> Dict:
+    from backend.services.news_fetcher import NewsFetcher
+
+    fetcher = NewsFetcher(http_client=client)
+    timings = []
+    articles = 0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        news = await fetcher.fetch_all_news()
+        timings.append((time.perf_counter() - started) * 1000)
+        articles += sum(len(items) for items in news.values())
+    await fetcher.close()
+    return {
+        'roundMs': round(sum(timings) / len(timings), 1),
+        'articles': articles,
+        'requests': client.stats['requests'],
+        'retries': client.stats['retries'],
+        'wireBytes': client.stats['bytes']
+    }
+
+
+async def run(rounds: int, latency_ms: float, error_rate: float) -> Dict:
+    port = free_port()
+    os.environ.setdefault('NEWS_API_KEY', 'bench')
+    os.environ['NEWS_API_BASE_URL'] = f"http://127.0.0.1:{port}/v2"
+
+    app = create_app(latency_ms=latency_ms, error_rate=error_rate)
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=port, log_level='warning'))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        before = await measure(ThrowawayClient(max_attempts=1), rounds)
+        after = await measure(UpstreamClient(backoff_base=0.05, backoff_max=1.0), rounds)
+    finally:
+        server.should_exit = True
+        await serving
+
+    return {'rounds': rounds, 'latencyMs': latency_ms, 'errorRate': error_rate, 'before': before, 'after': after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='fake server latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of 429/503 responses')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.rounds, args.latency_ms, args.error_rate))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.rounds} rounds of fetch_all_news, latency={args.latency_ms}ms, error rate={args.error_rate}")
+    for name in ('before', 'after'):
+        r = results[name]
+        print(f"  {name:6} {r['roundMs']:>8}ms/round  {r['articles']:>5} articles  "
+              f"{r['requests']:>4} requests  {r['retries']:>3} retries  {r['wireBytes']:>9} bytes")
+
+
+if __name__ == '__main__':
+    main()
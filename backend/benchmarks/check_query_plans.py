@@ -0,0 +1,131 @@
+"""Check that verify_query_plans() flags collection scans and in-memory sorts.
+
+Without `--mongo-uri`, runs recorded explain() outputs (classic, $or,
+slot-based and sharded plans) through plan_stages() and
+verify_query_plans() and checks each is flagged as expected, including a
+plan whose explain() is unsupported. With `--mongo-uri`, creates the
+registered indexes in a scratch database on that mongod and verifies every
+registered query against it. Exits 1 if anything is not as expected.
+
+    python -m backend.benchmarks.check_query_plans
+    python -m backend.benchmarks.check_query_plans --mongo-uri mongodb://127.0.0.1:27017
+"""
+import sys
+import asyncio
+import argparse
+from typing import Dict, List
+from backend.services.indexes import QUERY_PLANS, ensure_indexes, plan_stages, verify_query_plans
+
+# name -> (explain() result, stages verify_query_plans should flag)
+EXPLAINS = {
+    'index scan with limit': ({'queryPlanner': {'winningPlan': {
+        'stage': 'LIMIT',
+        'inputStage': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'articleId_-1'}}
+    }}}, []),
+    'collection scan': ({'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN', 'direction': 'forward'}}}, ['COLLSCAN']),
+    'in-memory sort over a scan': ({'queryPlanner': {'winningPlan': {
+        'stage': 'SORT',
+        'inputStage': {'stage': 'COLLSCAN', 'direction': 'forward'}
+    }}}, ['COLLSCAN', 'SORT']),
+    '$or over two indexes': ({'queryPlanner': {'winningPlan': {
+        'stage': 'SUBPLAN',
+        'inputStage': {'stage': 'FETCH', 'inputStage': {'stage': 'OR', 'inputStages': [
+            {'stage': 'IXSCAN', 'indexName': 'sourceUrlKey_1'},
+            {'stage': 'IXSCAN', 'indexName': 'sourceUrl_1'}
+        ]}}
+    }}}, []),
+    'slot-based sort': ({'queryPlanner': {'winningPlan': {
+        'queryPlan': {'stage': 'SORT', 'inputStage': {'stage': 'IXSCAN', 'indexName': 'category_1'}},
+        'slotBasedPlan': {'slots': '...', 'stages': '...'}
+    }}}, ['SORT']),
+    'sharded collection scan': ({'queryPlanner': {'winningPlan': {
+        'stage': 'SINGLE_SHARD',
+        'shards': [{'shardName': 'shard0', 'winningPlan': {'stage': 'COLLSCAN', 'direction': 'forward'}}]
+    }}}, ['COLLSCAN'])
+}
+UNSUPPORTED = 'explain unsupported'
+
+
+class RecordedCursor:
+    """Just enough of a motor cursor to replay one recorded explain() result"""
+
+    def __init__(self, explain: Dict):
+        self._explain = explain
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def explain(self) -> Dict:
+        if self._explain is None:
+            raise AttributeError("'Cursor' object has no attribute 'explain'")
+        return self._explain
+
+
+class RecordedDatabase:
+    """Collections named after EXPLAINS entries, each answering explain() with its recording"""
+
+    def __getitem__(self, name: str):
+        explain = EXPLAINS[name][0] if name in EXPLAINS else None
+        return type('RecordedCollection', (), {'find': lambda self, query: RecordedCursor(explain)})()
+
+
+async def check_recorded() -> List[str]:
+    """Mismatches between the flagged and expected stages of every recording"""
+    failures = []
+    for name, (explain, expected) in EXPLAINS.items():
+        flagged = sorted({stage for stage in plan_stages(explain) if stage in ('COLLSCAN', 'SORT')})
+        if flagged != expected:
+            failures.append(f"plan_stages({name}): flagged {flagged}, expected {expected}")
+
+    plans = [{'name': name, 'collection': name, 'filter': {}} for name in [*EXPLAINS, UNSUPPORTED]]
+    results = {result['name']: result for result in await verify_query_plans(RecordedDatabase(), plans)}
+    for name, (_, expected) in EXPLAINS.items():
+        flagged = results[name]['problems'] if name in results else []
+        if flagged != expected:
+            failures.append(f"verify_query_plans({name}): flagged {flagged}, expected {expected}")
+    if not results.get(UNSUPPORTED, {}).get('skipped'):
+        failures.append(f"verify_query_plans({UNSUPPORTED}): not reported as skipped")
+    return failures
+
+
+async def check_mongod(mongo_uri: str, db_name: str) -> List[str]:
+    """Registered queries that are not index-backed on a real mongod"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(mongo_uri)
+    try:
+        db = client[db_name]
+        await ensure_indexes(db)
+        return [
+            f"{result['name']}: {'skipped: ' + result['skipped'] if result.get('skipped') else ', '.join(result['problems'])}"
+            for result in await verify_query_plans(db, QUERY_PLANS)
+        ]
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mongo-uri', help='verify the registered queries on this mongod instead')
+    parser.add_argument('--db', default='mahadeshnews_plan_check', help='scratch database (dropped afterwards)')
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        failures = asyncio.run(check_mongod(args.mongo_uri, args.db))
+        checked = f"{len(QUERY_PLANS)} registered queries on {args.mongo_uri}"
+    else:
+        failures = asyncio.run(check_recorded())
+        checked = f"{len(EXPLAINS) + 1} recorded explain results"
+
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    print(f"{len(failures)} problems in {checked}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
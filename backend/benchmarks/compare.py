@@ -0,0 +1,113 @@
+"""Compare two run_suite result files and flag regressions.
+
+Lines up every metric both files contain (throughput, latency
+percentiles, build times, byte counts) and prints the change
+from the base to the head run. A metric that got worse by more than
+`--threshold` is flagged; with `--fail-on-regression` the exit status is
+1 if any was. Runs made with different parameters are reported but still
+compared.
+
+    python -m backend.benchmarks.compare backend/benchmarks/results/3ade67d.json backend/benchmarks/results/de05c63.json --threshold 0.1
+"""
+import sys
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, Optional
+
+# Leaf names of compared metrics and which direction is better
+HIGHER_IS_BETTER = {'rps', 'articlesPerSecond', 'medianArticlesPerSecond'}
+LOWER_IS_BETTER = {'p50', 'p95', 'p99', 'mean', 'errors', 'medianSeconds', 'buildSeconds', 'indexSeconds'}
+# Leaf names of benchmark settings, reported when the two runs differ
+PARAMETERS = {
+    'articles', 'requests', 'concurrency', 'cold', 'mongo', 'rounds', 'queries', 'limit', 'orjson',
+    'newsapiLatencyMs', 'llmLatencyMs', 'llmMsPerArticle', 'malformedRate'
+}
+
+
+def flatten(value, prefix: str = '') -> Dict[str, object]:
+    """Dotted paths to the scalar values of a results file; lists (per-run details) are skipped"""
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+        return flat
+    if isinstance(value, list):
+        return {}
+    return {prefix: value}
+
+
+def direction(path: str) -> Optional[int]:
+    """1 if higher is better, -1 if lower is better, None if not compared"""
+    parts = path.split('.')
+    leaf, parent = parts[-1], parts[-2] if len(parts) > 1 else ''
+    if leaf in HIGHER_IS_BETTER:
+        return 1
+    if leaf in LOWER_IS_BETTER:
+        return -1
+    # bench_listing reports {'before': old code path, 'after': current code} per measure
+    if leaf == 'after' and parent.endswith(('Us', 'Bytes')):
+        return -1
+    return None
+
+
+def compare(base: Dict, head: Dict, threshold: float) -> Dict:
+    base_flat, head_flat = flatten(base.get('benchmarks', {})), flatten(head.get('benchmarks', {}))
+    rows = []
+    parameters = [
+        (key, base.get(key), head.get(key)) for key in ('python', 'platform') if base.get(key) != head.get(key)
+    ]
+    for path in sorted(base_flat.keys() & head_flat.keys()):
+        old, new = base_flat[path], head_flat[path]
+        if path.split('.')[-1] in PARAMETERS:
+            if old != new:
+                parameters.append((path, old, new))
+            continue
+        better = direction(path)
+        if better is None or isinstance(old, bool) or not isinstance(old, (int, float)) \
+                or not isinstance(new, (int, float)):
+            continue
+        change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+        rows.append({
+            'metric': path,
+            'base': old,
+            'head': new,
+            'change': change,
+            'regression': change * better < -threshold
+        })
+    return {'rows': rows, 'parameters': parameters}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base', type=Path)
+    parser.add_argument('head', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+
+    with open(args.base, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(args.head, encoding='utf-8') as f:
+        head = json.load(f)
+    result = compare(base, head, args.threshold)
+    regressions = [row for row in result['rows'] if row['regression']]
+
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print(f"base {base.get('commit')} ({base.get('timestamp')})  ->  head {head.get('commit')} ({head.get('timestamp')})")
+        for path, old, new in result['parameters']:
+            print(f"  parameter differs: {path}: {old} -> {new}")
+        for row in result['rows']:
+            flag = '  REGRESSION' if row['regression'] else ''
+            print(f"  {row['metric']:56} {row['base']:>10} {row['head']:>10} {row['change']:>+8.1%}{flag}")
+        print(f"{len(regressions)} of {len(result['rows'])} metrics regressed by more than {args.threshold:.0%}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Synthetic Hindi article corpus for the route and pipeline benchmarks.
+
+Generates stored-article documents shaped like the pipeline's output:
+Zipfian pseudo-Hindi text with real news terms (see bench_search), the
+site's categories and districts, one article every few minutes going back
+from now, long-tailed view counts and a share of breaking stories. Loads
+them into a local mongod, or into mongomock when no URI is given.
+
+    python -m backend.benchmarks.corpus --articles 100000 --mongo-uri mongodb://127.0.0.1:27017
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+from backend.benchmarks.bench_search import make_vocabulary
+from backend.services.gazetteer import DISTRICTS
+from backend.services.indexes import ensure_indexes
+
+CATEGORIES = ['स्थानीय', 'राजनीति', 'अपराध', 'सड़क हादसा', 'सरकारी योजना', 'खेल', 'मनोरंजन']
+# Local news dominates, as it does in what the scheduler stores
+CATEGORY_WEIGHTS = [6, 3, 2, 1, 1, 1, 1]
+IMAGE = 'https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=800'
+DEFAULT_DB_NAME = 'mahadeshnews_bench'
+
+
+def make_articles(
+    count: int,
+    seed: int = 5,
+    minutes_apart: float = 5,
+    vocabulary_size: int = 50000
+) -> Iterator[Dict]:
+    """Yield `count` article documents, articleId 1 being the oldest"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, rng)
+    cumulative = []
+    total = 0.0
+    for rank in range(1, len(vocabulary) + 1):
+        total += 1 / rank ** 1.07
+        cumulative.append(total)
+    districts = list(DISTRICTS)
+
+    def text(words: int) -> str:
+        return ' '.join(rng.choices(vocabulary, cum_weights=cumulative, k=words))
+
+    newest = datetime.utcnow().replace(microsecond=0)
+    for article_id in range(1, count + 1):
+        date = newest - timedelta(minutes=minutes_apart * (count - article_id))
+        priority = rng.choices([5, 7, 10], weights=[6, 3, 1])[0]
+        yield {
+            'articleId': article_id,
+            'title': text(10),
+            'summary': text(30),
+            'content': text(rng.randint(300, 500)),
+            'category': rng.choices(CATEGORIES, weights=CATEGORY_WEIGHTS)[0],
+            'district': rng.choice(districts) if rng.random() < 0.6 else None,
+            'image': IMAGE,
+            'date': date,
+            'author': 'महादेश न्यूज़ डेस्क',
+            'views': int(rng.paretovariate(1.2) * 20),
+            'sourceTitle': text(12),
+            'sourceUrl': f'https://example.com/story/{seed}/{article_id}',
+            'sourcePublishedAt': date.isoformat(),
+            'isBreaking': priority >= 9,
+            'priority': priority,
+            'clusterSize': 1,
+            'aiGenerated': True,
+            'createdAt': date,
+            'updatedAt': date
+        }
+
+
+def open_database(mongo_uri: Optional[str], db_name: str = DEFAULT_DB_NAME):
+    """A motor database on `mongo_uri`, or an in-memory mongomock one"""
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        return AsyncIOMotorClient(mongo_uri)[db_name]
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        print("Without --mongo-uri the benchmarks need mongomock-motor: pip install mongomock-motor", file=sys.stderr)
+        raise SystemExit(2)
+    return AsyncMongoMockClient()[db_name]
+
+
+async def load_corpus(db, count: int, seed: int = 5, batch_size: int = 1000) -> Dict:
+    """Replace the articles collection with a synthetic corpus of `count` articles"""
+    started = time.perf_counter()
+    await db.articles.drop()
+    await db.counters.delete_one({'_id': 'articleId'})
+    await db.trending_snapshots.drop()
+    await ensure_indexes(db)
+
+    batch = []
+    for article in make_articles(count, seed=seed):
+        batch.append(article)
+        if len(batch) >= batch_size:
+            await db.articles.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.articles.insert_many(batch, ordered=False)
+
+    return {'articles': count, 'loadSeconds': round(time.perf_counter() - started, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=5)
+    parser.add_argument('--mongo-uri', help='load into this mongod instead of an in-memory mongomock')
+    parser.add_argument('--db', default=DEFAULT_DB_NAME)
+    args = parser.parse_args()
+
+    if not args.mongo_uri:
+        print("No --mongo-uri: the corpus is built in memory and discarded (useful for timing only)")
+    db = open_database(args.mongo_uri, args.db)
+    results = asyncio.run(load_corpus(db, args.articles, args.seed))
+    print(f"Loaded {results['articles']} articles into {args.db} in {results['loadSeconds']}s")
+
+
+if __name__ == '__main__':
+    main()
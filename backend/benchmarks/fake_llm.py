@@ -0,0 +1,73 @@
+"""Local stand-in for LlmChat with configurable latency, reply size and failures.
+
+`make_chat_factory()` returns a class with LlmChat's constructor and
+`with_model`/`send_message` methods, to pass as `chat_factory` to
+AIRewriter or NewsPipeline. It answers single and batched rewrite prompts
+in the format the rewriter parses, sleeping `latency_ms` plus
+`ms_per_article` for each article in the prompt, and can raise 429s or
+drop sections of its reply at the given rates.
+"""
+import re
+import random
+import asyncio
+from typing import Dict
+from backend.benchmarks.bench_search import NEWS_TERMS
+
+TITLE_RE = re.compile(r'^Original Title: (.*)$', re.MULTILINE)
+ARTICLE_RE = re.compile(r'^\[\[ARTICLE (\d+)\]\]$', re.MULTILINE)
+
+
+def make_chat_factory(
+    latency_ms: float = 0.0,
+    ms_per_article: float = 0.0,
+    words: int = 400,
+    rate_limit_rate: float = 0.0,
+    malformed_rate: float = 0.0,
+    seed: int = 7
+):
+    rng = random.Random(seed)
+    stats: Dict[str, int] = {'requests': 0, 'articles': 0, 'rateLimited': 0, 'malformed': 0, 'replyChars': 0}
+
+    def rewrite(title: str) -> str:
+        content = ' '.join(rng.choice(NEWS_TERMS) for _ in range(words))
+        return f"HEADLINE: {title} पर बड़ी खबर\nSUMMARY: {title}\nCONTENT: {content}"
+
+    class FakeLlmChat:
+        def __init__(self, api_key=None, session_id=None, system_message=None):
+            self.session_id = session_id
+
+        def with_model(self, provider, model):
+            return self
+
+        async def send_message(self, message) -> str:
+            titles = TITLE_RE.findall(message.text)
+            numbers = ARTICLE_RE.findall(message.text)
+            stats['requests'] += 1
+            stats['articles'] += max(len(numbers), 1)
+            await asyncio.sleep((latency_ms + ms_per_article * max(len(numbers), 1)) / 1000)
+
+            if rate_limit_rate and rng.random() < rate_limit_rate:
+                stats['rateLimited'] += 1
+                raise Exception("Error code: 429 - rate limit exceeded")
+
+            if not numbers:
+                if malformed_rate and rng.random() < malformed_rate:
+                    stats['malformed'] += 1
+                    reply = "माफ़ कीजिए, यह न्यूज़ रीराइट नहीं हो सकी।"
+                else:
+                    reply = rewrite(titles[0] if titles else '')
+            else:
+                sections = []
+                for number, title in zip(numbers, titles):
+                    # A dropped section makes the pipeline rewrite that article on its own
+                    if malformed_rate and rng.random() < malformed_rate:
+                        stats['malformed'] += 1
+                        continue
+                    sections.append(f"=== ARTICLE {number} ===\n{rewrite(title)}\n=== END ARTICLE {number} ===")
+                reply = '\n\n'.join(sections)
+
+            stats['replyChars'] += len(reply)
+            return reply
+
+    FakeLlmChat.stats = stats
+    return FakeLlmChat
@@ -0,0 +1,130 @@
+"""Local stand-in for NewsAPI's /v2/everything endpoint.
+
+Serves a deterministic stream of articles per query (one every
+`--interval-minutes`, going back `--days`), honours `from`, `pageSize` and
+`page`, gzips responses, answers If-None-Match with 304s, and can inject
+429/503 failures and latency. Point the backend at it with
+NEWS_API_BASE_URL=http://127.0.0.1:8099/v2.
+
+    python -m backend.benchmarks.fake_newsapi --port 8099 --error-rate 0.1
+"""
+import json
+import random
+import asyncio
+import hashlib
+import argparse
+import uvicorn
+from datetime import datetime, timedelta, timezone
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.gzip import GZipMiddleware
+
+WORDS = ['maharashtra', 'government', 'jalna', 'police', 'farmers', 'scheme', 'accident', 'mumbai', 'rain',
+         'election', 'hospital', 'arrested', 'assembly', 'cricket', 'film', 'road', 'water', 'school', 'market']
+# Pseudo-words so that distinct stories don't look like near-duplicates of each other
+SYLLABLES = ['ka', 'ra', 'ma', 'shi', 'pur', 'na', 'de', 'van', 'gao', 'li', 'to', 'bha', 'sin', 'che', 'lo']
+_vocabulary_rng = random.Random(1)
+VOCABULARY = sorted({
+    ''.join(_vocabulary_rng.choice(SYLLABLES) for _ in range(_vocabulary_rng.randint(2, 4))) for _ in range(20000)
+})
+
+
+def make_article(query: str, index: int, published: datetime) -> dict:
+    rng = random.Random(f"{query}:{index}")
+    slug = hashlib.sha1(f"{query}:{index}".encode('utf-8')).hexdigest()[:12]
+    words = [rng.choice(WORDS) if rng.random() < 0.3 else rng.choice(VOCABULARY) for _ in range(60)]
+    return {
+        'source': {'id': None, 'name': rng.choice(['Times Desk', 'Daily Wire', 'Lokmat', 'NDTV'])},
+        'author': 'Staff Reporter',
+        'title': ' '.join(words[:10]).capitalize(),
+        'description': ' '.join(words[10:35]),
+        'url': f"https://example.com/{slug}",
+        'urlToImage': f"https://example.com/{slug}.jpg",
+        'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'content': ' '.join(words[35:]) + ' [+2140 chars]'
+    }
+
+
+def create_app(
+    interval_minutes: float = 20,
+    days: int = 3,
+    error_rate: float = 0.0,
+    latency_ms: float = 0.0,
+    api_key: str = None,
+    seed: int = 3
+) -> FastAPI:
+    app = FastAPI(title="Fake NewsAPI")
+    app.add_middleware(GZipMiddleware, minimum_size=500)
+    rng = random.Random(seed)
+    app.state.stats = {'requests': 0, 'notModified': 0, 'errors': 0}
+
+    @app.get("/v2/everything")
+    async def everything(request: Request, q: str = '', page: int = 1):
+        stats = app.state.stats
+        stats['requests'] += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        if api_key and request.headers.get('x-api-key') != api_key:
+            return Response(
+                json.dumps({'status': 'error', 'code': 'apiKeyInvalid', 'message': 'Invalid API key'}),
+                status_code=401, media_type='application/json'
+            )
+        if error_rate and rng.random() < error_rate:
+            stats['errors'] += 1
+            status = rng.choice([429, 503])
+            return Response(
+                json.dumps({'status': 'error', 'code': 'rateLimited', 'message': 'Slow down'}),
+                status_code=status, headers={'Retry-After': '1'}, media_type='application/json'
+            )
+
+        # NewsAPI uses camelCase names that aren't valid Python parameters
+        page_size = int(request.query_params.get('pageSize', 20))
+        since = request.query_params.get('from')
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        since = datetime.fromisoformat(since).replace(tzinfo=timezone.utc) if since else now - timedelta(days=days)
+
+        # Articles on a fixed per-query grid, newest first
+        step = timedelta(minutes=interval_minutes)
+        newest_index = int(now.timestamp() // step.total_seconds())
+        oldest_index = int(max(since, now - timedelta(days=days)).timestamp() // step.total_seconds())
+        indexes = [i for i in range(newest_index, oldest_index - 1, -1)
+                   if datetime.fromtimestamp(i * step.total_seconds(), timezone.utc) >= since]
+        selected = indexes[(page - 1) * page_size:page * page_size]
+
+        body = json.dumps({
+            'status': 'ok',
+            'totalResults': len(indexes),
+            'articles': [
+                make_article(q, i, datetime.fromtimestamp(i * step.total_seconds(), timezone.utc))
+                for i in selected
+            ]
+        }).encode('utf-8')
+
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if request.headers.get('if-none-match') == etag:
+            stats['notModified'] += 1
+            return Response(status_code=304, headers={'ETag': etag})
+        return Response(body, media_type='application/json', headers={'ETag': etag})
+
+    @app.get("/stats")
+    async def get_stats():
+        return app.state.stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--interval-minutes', type=float, default=20)
+    parser.add_argument('--days', type=int, default=3)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    app = create_app(args.interval_minutes, args.days, args.error_rate, args.latency_ms)
+    uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning')
+
+
+if __name__ == '__main__':
+    main()
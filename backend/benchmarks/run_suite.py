@@ -0,0 +1,94 @@
+"""Run the benchmark suite and save its results for the current commit.
+
+Runs the route, pipeline, search and listing benchmarks with fixed seeds
+and writes them, with the commit, whether the tree had local changes, the
+Python version and the parameters used, to
+backend/benchmarks/results/<commit>.json. Compare two commits' results
+with compare.py:
+
+    python -m backend.benchmarks.run_suite --articles 10000
+    python -m backend.benchmarks.compare backend/benchmarks/results/3ade67d.json backend/benchmarks/results/de05c63.json
+"""
+import sys
+import json
+import asyncio
+import argparse
+import platform
+import subprocess
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict
+from backend.benchmarks import bench_listing, bench_pipeline, bench_routes, bench_search
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def git_revision() -> Dict:
+    def git(*args) -> str:
+        return subprocess.run(
+            ['git', *args], capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+
+    try:
+        return {'commit': git('rev-parse', '--short', 'HEAD'), 'dirty': bool(git('status', '--porcelain'))}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': 'unknown', 'dirty': None}
+
+
+def run(args) -> Dict:
+    results = {
+        **git_revision(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': {}
+    }
+    benchmarks = results['benchmarks']
+
+    print(f"routes: {args.articles} articles, {args.requests} requests per route", file=sys.stderr)
+    benchmarks['routes'] = asyncio.run(bench_routes.run(
+        args.articles, args.requests, args.concurrency, cold=args.cold, mongo_uri=args.mongo_uri
+    ))
+
+    print(f"pipeline: {args.rounds} jobs", file=sys.stderr)
+    benchmarks['pipeline'] = asyncio.run(bench_pipeline.run(
+        args.rounds,
+        newsapi_latency_ms=args.newsapi_latency_ms,
+        llm_latency_ms=args.llm_latency_ms,
+        mongo_uri=args.mongo_uri
+    ))
+
+    print(f"search: {args.search_articles} articles", file=sys.stderr)
+    benchmarks['search'] = bench_search.run(args.search_articles, queries=500, vocabulary_size=50000)
+
+    print("listing serialization", file=sys.stderr)
+    benchmarks['listing'] = bench_listing.run(limit=20, rounds=1000)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--articles', type=int, default=10000, help='route benchmark corpus size')
+    parser.add_argument('--requests', type=int, default=500, help='measured requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--cold', action='store_true', help='clear the response cache before every request')
+    parser.add_argument('--rounds', type=int, default=3, help='pipeline jobs')
+    parser.add_argument('--newsapi-latency-ms', type=float, default=20.0)
+    parser.add_argument('--llm-latency-ms', type=float, default=200.0)
+    parser.add_argument('--search-articles', type=int, default=50000)
+    parser.add_argument('--mongo-uri', help='use this mongod instead of an in-memory mongomock')
+    parser.add_argument('--output', type=Path, help='results file (default: results/<commit>.json)')
+    args = parser.parse_args()
+
+    results = run(args)
+    results['parameters'] = {key: value for key, value in vars(args).items() if key not in ('output', 'mongo_uri')}
+
+    output = args.output or RESULTS_DIR / f"{results['commit']}{'-dirty' if results['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -17,9 +17,11 @@ class Article(BaseModel):
     views: int = 0
     sourceTitle: Optional[str] = None
     sourceUrl: Optional[str] = None
+    sourceUrlKey: Optional[str] = None  # normalized sourceUrl, the dedupe key
     sourcePublishedAt: Optional[datetime] = None
     isBreaking: bool = False
     priority: int = 5  # 1-10, based on category
+    clusterSize: int = 1  # outlets that carried the story in its fetch run
     aiGenerated: bool = True
     createdAt: datetime = Field(default_factory=datetime.utcnow)
     updatedAt: datetime = Field(default_factory=datetime.utcnow)
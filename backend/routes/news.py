@@ -1,9 +1,18 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
 from typing import Optional, List
 import os
+import json
+import time
+import base64
 from datetime import datetime
 import logging
+from backend.services.response_cache import news_cache
+from backend.services.view_counter import ViewCounter
+from backend.services.trending import TrendingIndex
+from backend.services.search_index import SearchIndex
+from backend.services.pubsub import ArticleBroker
 
 logger = logging.getLogger(__name__)
 
@@ -11,117 +20,415 @@ router = APIRouter(prefix="/news", tags=["news"])
 
 # Database will be injected
 db = None
+view_counter = None
+trending = None
+search_index = None
+broker = ArticleBroker()
+
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+STREAM_BACKFILL_LIMIT = int(os.environ.get('STREAM_BACKFILL_LIMIT', 100))
+STREAM_MAX_SUBSCRIBERS = int(os.environ.get('STREAM_MAX_SUBSCRIBERS', 5000))
 
 def set_db(database):
-    global db
+    global db, view_counter, trending, search_index
     db = database
+    view_counter = ViewCounter(database)
+    trending = TrendingIndex(database)
+    search_index = SearchIndex(database)
+
+
+async def on_articles_committed(article_docs: list):
+    """Refresh read-side state after the scheduler stores new articles"""
+    news_cache.invalidate()
+    for article in article_docs:
+        trending.add_article(article)
+        search_index.add(article)
+    broker.publish([_serialize_listing(article) for article in article_docs])
+
+# Listing totals per category: category -> (total, cache generation, expiry)
+_total_counts = {}
+
+# Fields each endpoint reads, so Mongo never ships the 300-500 word content to listings
+LISTING_PROJECTION = {
+    '_id': 0, 'articleId': 1, 'title': 1, 'summary': 1, 'category': 1, 'district': 1,
+    'image': 1, 'date': 1, 'author': 1, 'views': 1
+}
+ARTICLE_PROJECTION = {**LISTING_PROJECTION, 'content': 1, 'sourceUrl': 1}
+BREAKING_PROJECTION = {'_id': 0, 'title': 1}
+
+
+def _format_date(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _serialize_listing(article: dict) -> dict:
+    """Listing item built straight from a LISTING_PROJECTION document"""
+    return {
+        'id': article['articleId'],
+        'title': article['title'],
+        'summary': article['summary'],
+        'category': article['category'],
+        'district': article.get('district'),
+        'image': article['image'],
+        'date': _format_date(article['date']),
+        'author': article['author'],
+        'views': article['views']
+    }
 
 
 @router.get("/all")
 async def get_all_news(
+    request: Request,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
-    category: Optional[str] = None
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = Query(None, alias='includeTotal')
 ):
-    """Get all news with pagination and optional category filter"""
+    """Get all news with pagination and optional category filter.
+    
+    Pass the `nextCursor` from a previous response as `cursor` for keyset
+    pagination, which costs the same at any depth; `page` keeps working for
+    older clients. The total count is included in page mode and only on
+    request (`includeTotal=true`) in cursor mode.
+    """
     try:
-        # Build query
-        query = {}
-        if category:
-            query['category'] = category
-        
-        # Get total count
-        total = await db.articles.count_documents(query)
-        
-        # Get articles
-        skip = (page - 1) * limit
-        articles = await db.articles.find(query).sort('date', -1).skip(skip).limit(limit).to_list(length=limit)
+        position = _decode_cursor(cursor) if cursor else None
+        if include_total is None:
+            include_total = position is None
         
-        # Format response
-        formatted_articles = []
-        for article in articles:
-            formatted_articles.append({
-                'id': article['articleId'],
-                'title': article['title'],
-                'summary': article['summary'],
-                'category': article['category'],
-                'district': article.get('district'),
-                'image': article['image'],
-                'date': article['date'].isoformat() if isinstance(article['date'], datetime) else article['date'],
-                'author': article['author'],
-                'views': article['views']
-            })
-        
-        return {
-            'success': True,
-            'data': {
-                'articles': formatted_articles,
-                'total': total,
-                'page': page,
-                'pages': (total + limit - 1) // limit
-            }
-        }
+        key = news_cache.make_key(
+            'all', page=page, limit=limit, category=category, cursor=cursor, total=include_total
+        )
+        cached = await news_cache.get_or_build(
+            key, lambda: _build_news_page(page, limit, category, position, include_total)
+        )
+        return news_cache.respond(request, cached)
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching all news: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _encode_cursor(article: dict) -> str:
+    """Opaque cursor pointing just after `article` in (date, articleId) order"""
+    date = _format_date(article['date'])
+    raw = json.dumps({'d': date, 'i': article['articleId']}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        position = json.loads(raw)
+        return datetime.fromisoformat(position['d']), int(position['i'])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _count_articles(query: dict, category: Optional[str]) -> int:
+    """Article count per category, reused until new articles are committed"""
+    cached = _total_counts.get(category)
+    if cached and cached[1] == news_cache.generation and cached[2] > time.monotonic():
+        return cached[0]
+    
+    total = await db.articles.count_documents(query)
+    _total_counts[category] = (total, news_cache.generation, time.monotonic() + news_cache.ttl)
+    return total
+
+
+async def _build_news_page(
+    page: int,
+    limit: int,
+    category: Optional[str],
+    position: Optional[tuple] = None,
+    include_total: bool = True
+) -> dict:
+    """Query and format one page of the news listing"""
+    # Build query
+    query = {}
+    if category:
+        query['category'] = category
+    
+    count_query = dict(query)
+    if position:
+        # Keyset: everything strictly after the cursor in (date desc, articleId desc) order
+        date, article_id = position
+        query['$or'] = [
+            {'date': {'$lt': date}},
+            {'date': date, 'articleId': {'$lt': article_id}}
+        ]
+    
+    # Get articles, fetching one extra to know whether another page follows
+    cursor = db.articles.find(query, LISTING_PROJECTION).sort([('date', -1), ('articleId', -1)])
+    if not position:
+        cursor = cursor.skip((page - 1) * limit)
+    articles = await cursor.limit(limit + 1).to_list(length=limit + 1)
+    
+    has_more = len(articles) > limit
+    articles = articles[:limit]
+    
+    data = {
+        'articles': [_serialize_listing(article) for article in articles],
+        'nextCursor': _encode_cursor(articles[-1]) if has_more and articles else None
+    }
+    if not position:
+        data['page'] = page
+    if include_total:
+        total = await _count_articles(count_query, category)
+        data['total'] = total
+        data['pages'] = (total + limit - 1) // limit
+    
+    return {
+        'success': True,
+        'data': data
+    }
+
+
 @router.get("/breaking")
-async def get_breaking_news():
+async def get_breaking_news(request: Request):
     """Get breaking news ticker items"""
     try:
-        # Get top 5 breaking news or high priority articles
-        articles = await db.articles.find({
-            '$or': [
-                {'isBreaking': True},
-                {'priority': {'$gte': 9}}
-            ]
-        }).sort('date', -1).limit(10).to_list(length=10)
-        
-        # Format as ticker items
-        ticker_items = [article['title'] for article in articles]
-        
-        # If less than 5, add some regular high-priority news
-        if len(ticker_items) < 5:
-            additional = await db.articles.find().sort('date', -1).limit(10 - len(ticker_items)).to_list(length=10)
-            ticker_items.extend([a['title'] for a in additional])
-        
-        return {
-            'success': True,
-            'data': ticker_items[:10]
-        }
+        cached = await news_cache.get_or_build(news_cache.make_key('breaking'), _build_breaking_news)
+        return news_cache.respond(request, cached)
     
     except Exception as e:
         logger.error(f"Error fetching breaking news: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _build_breaking_news() -> dict:
+    """Query and format the breaking news ticker"""
+    # Get top 5 breaking news or high priority articles
+    articles = await db.articles.find({
+        '$or': [
+            {'isBreaking': True},
+            {'priority': {'$gte': 9}}
+        ]
+    }, BREAKING_PROJECTION).sort('date', -1).limit(10).to_list(length=10)
+    
+    # Format as ticker items
+    ticker_items = [article['title'] for article in articles]
+    
+    # If less than 5, add some regular high-priority news
+    if len(ticker_items) < 5:
+        additional = await db.articles.find({}, BREAKING_PROJECTION).sort('date', -1).limit(10 - len(ticker_items)).to_list(length=10)
+        ticker_items.extend([a['title'] for a in additional])
+    
+    return {
+        'success': True,
+        'data': ticker_items[:10]
+    }
+
+
+@router.get("/trending")
+async def get_trending_news(request: Request, limit: int = Query(10, ge=1, le=50)):
+    """Most-read articles, ranked by decayed views, priority and recency"""
+    try:
+        cached = await news_cache.get_or_build(
+            news_cache.make_key('trending', limit=limit),
+            lambda: _build_trending(limit)
+        )
+        return news_cache.respond(request, cached)
+    
+    except Exception as e:
+        logger.error(f"Error fetching trending news: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _build_trending(limit: int) -> dict:
+    """Format the current top of the trending index"""
+    article_ids = trending.top(limit)
+    articles = await db.articles.find(
+        {'articleId': {'$in': article_ids}},
+        LISTING_PROJECTION
+    ).to_list(length=limit)
+    
+    by_id = {article['articleId']: article for article in articles}
+    return {
+        'success': True,
+        'data': [_serialize_listing(by_id[article_id]) for article_id in article_ids if article_id in by_id]
+    }
+
+
+@router.get("/search")
+async def search_news(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Full-text search over article titles, summaries and content"""
+    try:
+        await search_index.refresh()
+        
+        # Keyed on the index generation: articles caught up from other processes change results
+        cached = await news_cache.get_or_build(
+            news_cache.make_key('search', q=q.strip(), page=page, limit=limit, gen=search_index.generation),
+            lambda: _build_search_results(q, page, limit)
+        )
+        return news_cache.respond(request, cached)
+    
+    except Exception as e:
+        logger.error(f"Error searching news for {q!r}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _build_search_results(q: str, page: int, limit: int) -> dict:
+    """Rank matches in the search index and load their listing fields"""
+    results = search_index.search(q, offset=(page - 1) * limit, limit=limit)
+    article_ids = results['ids']
+    
+    articles = await db.articles.find(
+        {'articleId': {'$in': article_ids}},
+        LISTING_PROJECTION
+    ).to_list(length=len(article_ids))
+    by_id = {article['articleId']: article for article in articles}
+    
+    total = results['total']
+    return {
+        'success': True,
+        'data': {
+            'articles': [_serialize_listing(by_id[article_id]) for article_id in article_ids if article_id in by_id],
+            'total': total,
+            'page': page,
+            'pages': (total + limit - 1) // limit
+        }
+    }
+
+
+@router.get("/stream")
+async def stream_news(
+    request: Request,
+    format: str = Query('sse', pattern='^(sse|ndjson)$'),
+    after: Optional[int] = Query(None, ge=0),
+    category: Optional[str] = None
+):
+    """Push newly published articles as Server-Sent Events or NDJSON.
+
+    Each article is sent as its listing item, with its articleId as the SSE
+    event id. A reconnecting client resumes with `after` (or the
+    Last-Event-ID header); the gap is replayed from the broker's buffer, or
+    from Mongo (most recent STREAM_BACKFILL_LIMIT articles) once the buffer
+    no longer reaches back that far. Idle connections get a heartbeat every
+    STREAM_HEARTBEAT_SECONDS: an SSE comment, or an empty NDJSON line.
+    """
+    if broker.subscribers >= STREAM_MAX_SUBSCRIBERS:
+        raise HTTPException(status_code=503, detail="Too many stream subscribers")
+
+    last_event_id = request.headers.get('last-event-id')
+    if after is None and last_event_id:
+        try:
+            after = int(last_event_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Last-Event-ID")
+
+    return StreamingResponse(
+        _stream_articles(format, after, category),
+        media_type='text/event-stream' if format == 'sse' else 'application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def _stream_frame(format: str, article_id: int, data: bytes) -> bytes:
+    if format == 'sse':
+        return b'id: %d\nevent: article\ndata: %s\n\n' % (article_id, data)
+    return data + b'\n'
+
+
+async def _stream_backfill(after: int, category: Optional[str]) -> List[dict]:
+    """Most recent articles after `after`, oldest first"""
+    query = {'articleId': {'$gt': after}}
+    if category:
+        query['category'] = category
+    articles = await db.articles.find(query, LISTING_PROJECTION).sort('articleId', -1).limit(
+        STREAM_BACKFILL_LIMIT
+    ).to_list(length=STREAM_BACKFILL_LIMIT)
+    return [_serialize_listing(article) for article in reversed(articles)]
+
+
+async def _stream_articles(format: str, after: Optional[int], category: Optional[str]):
+    broker.subscribers += 1
+    heartbeat = b': heartbeat\n\n' if format == 'sse' else b'\n'
+    # Articles already sent from a Mongo backfill, skipped when they reach us live too
+    backfilled = set()
+    last_id = after or 0
+
+    try:
+        if format == 'sse':
+            yield b'retry: 5000\n\n'
+
+        seq = broker.next_seq
+        if after is not None:
+            resume = broker.seq_after(after)
+            if resume is not None:
+                seq = resume
+            else:
+                for article in await _stream_backfill(after, category):
+                    backfilled.add(article['id'])
+                    last_id = max(last_id, article['id'])
+                    yield _stream_frame(format, article['id'], news_cache.serialize(article))
+
+        while True:
+            if not await broker.wait(seq, STREAM_HEARTBEAT_SECONDS):
+                yield heartbeat
+                continue
+
+            events, lagged = broker.read(seq)
+            if lagged:
+                # Fell further behind than the buffer holds; replay from Mongo
+                logger.warning(f"Stream subscriber lagged behind the broker buffer, backfilling after {last_id}")
+                for article in await _stream_backfill(last_id, category):
+                    if article['id'] not in backfilled:
+                        backfilled.add(article['id'])
+                        last_id = max(last_id, article['id'])
+                        yield _stream_frame(format, article['id'], news_cache.serialize(article))
+
+            for event in events:
+                seq = event.seq + 1
+                if event.article_id in backfilled or (after is not None and event.article_id <= after):
+                    continue
+                if category and event.category != category:
+                    continue
+                last_id = max(last_id, event.article_id)
+                yield _stream_frame(format, event.article_id, event.data)
+
+    except Exception as e:
+        logger.error(f"Error streaming news: {str(e)}")
+    finally:
+        broker.subscribers -= 1
+
+
 @router.get("/{article_id}")
 async def get_article(article_id: int):
     """Get single article by ID"""
     try:
-        article = await db.articles.find_one({'articleId': article_id})
+        article = await db.articles.find_one({'articleId': article_id}, ARTICLE_PROJECTION)
         
         if not article:
             raise HTTPException(status_code=404, detail="Article not found")
         
-        return {
-            'success': True,
-            'data': {
-                'id': article['articleId'],
-                'title': article['title'],
-                'summary': article['summary'],
-                'content': article['content'],
-                'category': article['category'],
-                'district': article.get('district'),
-                'image': article['image'],
-                'date': article['date'].isoformat() if isinstance(article['date'], datetime) else article['date'],
-                'author': article['author'],
-                'views': article['views'],
-                'sourceUrl': article.get('sourceUrl')
-            }
-        }
+        return Response(
+            content=news_cache.serialize({
+                'success': True,
+                'data': {
+                    'id': article['articleId'],
+                    'title': article['title'],
+                    'summary': article['summary'],
+                    'content': article['content'],
+                    'category': article['category'],
+                    'district': article.get('district'),
+                    'image': article['image'],
+                    'date': _format_date(article['date']),
+                    'author': article['author'],
+                    'views': article['views'],
+                    'sourceUrl': article.get('sourceUrl')
+                }
+            }),
+            media_type='application/json'
+        )
     
     except HTTPException:
         raise
@@ -132,22 +439,22 @@ async def get_article(article_id: int):
 
 @router.post("/increment-view/{article_id}")
 async def increment_view(article_id: int):
-    """Increment view count for an article"""
+    """Increment view count for an article.
+    
+    Views are aggregated in memory and written in periodic bulk flushes, so
+    the returned count is an estimate.
+    """
     try:
-        result = await db.articles.update_one(
-            {'articleId': article_id},
-            {'$inc': {'views': 1}}
-        )
+        views = await view_counter.increment(article_id)
         
-        if result.matched_count == 0:
+        if views is None:
             raise HTTPException(status_code=404, detail="Article not found")
         
-        # Get updated views
-        article = await db.articles.find_one({'articleId': article_id})
+        trending.record_view(article_id)
         
         return {
             'success': True,
-            'views': article['views']
+            'views': views
         }
     
     except HTTPException:
@@ -159,9 +466,19 @@ async def increment_view(article_id: int):
 
 @router.get("/category/{category}")
 async def get_news_by_category(
+    request: Request,
     category: str,
     page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = Query(None, alias='includeTotal')
 ):
     """Get news by category"""
-    return await get_all_news(page=page, limit=limit, category=category)
+    return await get_all_news(
+        request,
+        page=page,
+        limit=limit,
+        category=category,
+        cursor=cursor,
+        include_total=include_total
+    )
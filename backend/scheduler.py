@@ -0,0 +1,223 @@
+"""One-shot news fetch for cron: fetch, dedupe, rewrite and store once, then exit.
+
+Imports only the pipeline (no FastAPI app or APScheduler), takes the same
+leader lock as the API's schedulers and skips the run if another replica
+leads or a run already started within FETCH_INTERVAL_HOURS (unless that
+run failed or its process died).
+
+    python -m backend.scheduler                        # MONGO_URI / DB_NAME
+    python -m backend.scheduler --dry-run              # recorded fixtures, in-memory DB, no LLM calls
+    python -m backend.scheduler --record fetched.json  # also save what was fetched, for later dry runs
+
+Exit status: 0 if the run completed or was not due, 1 if it failed,
+2 on a configuration error.
+"""
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+from datetime import timedelta
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_CONFIG = 2
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / 'fixtures' / 'fetched_news.json'
+
+logger = logging.getLogger('backend.scheduler')
+
+
+class FixtureNewsFetcher:
+    """Stands in for NewsFetcher, replaying fetch_all_news() output saved with --record"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.last_run_stats = {}
+
+    async def fetch_all_news(self):
+        with open(self.path, encoding='utf-8') as f:
+            news = json.load(f)
+        self.last_run_stats = {
+            'requests': 0,
+            'articles': sum(len(articles) for articles in news.values()),
+            'queries': {},
+            'feeds': {}
+        }
+        return news
+
+    async def close(self):
+        pass
+
+
+class RecordingNewsFetcher:
+    """Wraps a NewsFetcher and saves each fetch_all_news() result as a fixture"""
+
+    def __init__(self, fetcher, path: Path):
+        self.fetcher = fetcher
+        self.path = path
+
+    def __getattr__(self, name):
+        return getattr(self.fetcher, name)
+
+    async def fetch_all_news(self):
+        news = await self.fetcher.fetch_all_news()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(news, f, ensure_ascii=False, indent=2)
+        logger.info(f"Recorded {sum(len(a) for a in news.values())} fetched articles to {self.path}")
+        return news
+
+
+class OfflineChat:
+    """LlmChat stand-in for dry runs: answers rewrite prompts from the source titles"""
+
+    def __init__(self, api_key=None, session_id=None, system_message=None):
+        pass
+
+    def with_model(self, provider, model):
+        return self
+
+    async def send_message(self, message) -> str:
+        titles = re.findall(r'^Original Title: (.*)$', message.text, re.MULTILINE)
+        numbers = re.findall(r'^\[\[ARTICLE (\d+)\]\]$', message.text, re.MULTILINE)
+        if not numbers:
+            return self._rewrite(titles[0] if titles else '')
+        return '\n\n'.join(
+            f"=== ARTICLE {number} ===\n{self._rewrite(title)}\n=== END ARTICLE {number} ==="
+            for number, title in zip(numbers, titles)
+        )
+
+    @staticmethod
+    def _rewrite(title: str) -> str:
+        return f"HEADLINE: [dry run] {title}\nSUMMARY: {title}\nCONTENT: {title}"
+
+
+def _print_report(result: dict, timings: dict):
+    print(f"Job {result['jobId']}: {result['status']}, {result.get('articlesProcessed', 0)} articles stored")
+    if result.get('error'):
+        print(f"  error in {result.get('failedStage')}: {result['error']}")
+    queue = result.get('queue', {})
+    rewrites = result.get('rewrites', {})
+    print(f"  queue: {queue.get('enqueued', 0)} enqueued, {queue.get('resumed', 0)} resumed, "
+          f"{queue.get('failed', 0)} failed; LLM requests: {rewrites.get('requests', 0)}")
+    llm = result.get('llm', {})
+    print(f"  LLM: {llm.get('avgLatencyMs', 0)} ms avg, ~{llm.get('promptTokens', 0)} prompt / "
+          f"~{llm.get('completionTokens', 0)} completion tokens, {llm.get('parseFailures', 0)} parse failures")
+    for stage, ms in timings.items():
+        print(f"  {stage:<10} {ms:>10.1f} ms")
+
+
+async def run(args) -> int:
+    started = time.perf_counter()
+    timings = {}
+
+    if args.dry_run:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            print("--dry-run needs mongomock-motor: pip install mongomock-motor", file=sys.stderr)
+            return EXIT_CONFIG
+        if not args.fixtures.exists():
+            print(f"Fixture file not found: {args.fixtures}", file=sys.stderr)
+            return EXIT_CONFIG
+        # Dry runs never reach NewsAPI or the LLM provider
+        os.environ.setdefault('NEWS_API_KEY', 'dry-run')
+        os.environ.setdefault('EMERGENT_LLM_KEY', 'dry-run')
+        client = AsyncMongoMockClient()
+        db = client['mahadeshnews_dry_run']
+    else:
+        mongo_url = os.environ.get('MONGO_URI')
+        db_name = os.environ.get('DB_NAME')
+        if not mongo_url or not db_name:
+            print("MONGO_URI and DB_NAME must be set (or use --dry-run)", file=sys.stderr)
+            return EXIT_CONFIG
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from backend.services.metrics import MongoCommandMetrics
+        client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
+        db = client[db_name]
+
+    from backend.services.pipeline import NewsPipeline, LOCK_NAME
+    from backend.services.leader_lock import LeaderLock
+    from backend.services.indexes import ensure_indexes
+    timings['imports'] = (time.perf_counter() - started) * 1000
+
+    try:
+        if args.dry_run:
+            pipeline = NewsPipeline(db, news_fetcher=FixtureNewsFetcher(args.fixtures), chat_factory=OfflineChat)
+        else:
+            pipeline = NewsPipeline(db)
+            if args.record:
+                pipeline.news_fetcher = RecordingNewsFetcher(pipeline.news_fetcher, args.record)
+    except ValueError as e:
+        print(f"Configuration error: {str(e)}", file=sys.stderr)
+        return EXIT_CONFIG
+
+    lock = LeaderLock(db, LOCK_NAME, owner=pipeline.worker_id)
+    keep_alive = None
+    try:
+        setup_started = time.perf_counter()
+        await ensure_indexes(db)
+        if not await lock.acquire():
+            print("Skipped: another scheduler holds the leader lock")
+            return EXIT_OK
+        keep_alive = asyncio.create_task(lock.keep_alive())
+        job_id = pipeline.new_job_id()
+        claimed = args.force or await lock.claim_run(
+            timedelta(hours=args.interval_hours),
+            run_id=job_id,
+            ended_early=pipeline.run_ended_early
+        )
+        if not claimed:
+            print(f"Skipped: a run already started within the last {args.interval_hours} hours")
+            return EXIT_OK
+        timings['setup'] = (time.perf_counter() - setup_started) * 1000
+
+        result = await pipeline.run(fence=lock, job_id=job_id)
+    finally:
+        if keep_alive:
+            keep_alive.cancel()
+        await lock.release()
+        await pipeline.close()
+        client.close()
+
+    timings.update(result.get('timings', {}))
+    timings['total'] = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps({**result, 'timings': timings}, ensure_ascii=False, indent=2, default=str))
+    else:
+        _print_report(result, timings)
+    return EXIT_OK if result['status'] == 'completed' else EXIT_FAILED
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true',
+                        help='replay fixtures into an in-memory database with offline rewrites')
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURES,
+                        help='fetch_all_news() output to replay with --dry-run')
+    parser.add_argument('--record', type=Path, help='save the fetched articles to this file')
+    parser.add_argument('--force', action='store_true', help='run even if a run started within the interval')
+    parser.add_argument('--interval-hours', type=float,
+                        default=float(os.environ.get('FETCH_INTERVAL_HOURS', 6)),
+                        help='minimum time between runs across all schedulers')
+    parser.add_argument('--json', action='store_true', help='print the job result as JSON')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, Request, Response
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
@@ -10,6 +10,9 @@ import uuid
 from datetime import datetime, timezone
 from backend.routes import news
 from backend.services.scheduler import NewsScheduler
+from backend.services.indexes import ensure_indexes, verify_query_plans, VERIFY_QUERY_PLANS
+from backend.services.pubsub import STREAM_CHANGE_STREAM
+from backend.services.metrics import metrics, current_route, MetricsMiddleware, MongoCommandMetrics, CONTENT_TYPE
 
 
 # Configure logging
@@ -29,14 +32,19 @@ if not mongo_url:
     logger.error("FATAL ERROR: MONGO_URI environment variable is not set!")
     raise EnvironmentError("MONGO_URI environment variable is required and not set!")
 
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[MongoCommandMetrics()])
 db = client[db_name]
 
 # Create the main app without a prefix
 app = FastAPI(title="Mahadeshnews API", version="1.0.0")
 
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+async def track_route(request: Request):
+    """Attribute the request's Mongo commands to its route template"""
+    route = request.scope.get('route')
+    current_route.set(getattr(route, 'path', request.url.path))
+
+# Create a router with the /api prefix; its Mongo calls are timed per route
+api_router = APIRouter(prefix="/api", dependencies=[Depends(track_route)])
 
 # Scheduler instance
 scheduler = None
@@ -82,6 +90,11 @@ async def get_status_checks():
     
     return status_checks
 
+@api_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
 # Setup news routes
 news.set_db(db)
 api_router.include_router(news.router)
@@ -96,20 +109,32 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 async def startup_event():
     global scheduler
     logger.info("Starting Mahadeshnews backend...")
     
-    # Create indexes
-    await db.articles.create_index("articleId", unique=True)
-    await db.articles.create_index("category")
-    await db.articles.create_index("date")
-    await db.articles.create_index("sourceUrl")
+    # Create indexes and check that every route query is served by one
+    await ensure_indexes(db)
+    if VERIFY_QUERY_PLANS:
+        await verify_query_plans(db)
+    
+    # Start write-behind view counting and the trending index
+    news.view_counter.start()
+    await news.trending.load()
+    news.trending.start()
+    
+    # Build the search index in the background
+    news.search_index.start()
+    
+    # Also push articles stored by other processes to /news/stream subscribers
+    if STREAM_CHANGE_STREAM:
+        news.broker.watch(db, news._serialize_listing)
     
     # Start scheduler
-    scheduler = NewsScheduler(db)
+    scheduler = NewsScheduler(db, on_commit=[news.on_articles_committed])
     scheduler.start()
     logger.info("News scheduler started")
 
@@ -117,6 +142,9 @@ async def startup_event():
 async def shutdown_db_client():
     global scheduler
     if scheduler:
-        scheduler.stop()
+        await scheduler.stop()
+    await news.view_counter.stop()
+    await news.trending.stop()
+    await news.broker.stop()
     client.close()
     logger.info("Mahadeshnews backend stopped")
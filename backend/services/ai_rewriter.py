@@ -1,22 +1,82 @@
 import os
+import re
+import time
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 from dotenv import load_dotenv
+from backend.services.rewrite_cache import RewriteCache
+from backend.services.gazetteer import detect_district
+from backend.services.metrics import metrics
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 
+class RateLimitError(Exception):
+    """Raised when the LLM provider rejects a request for exceeding its quota"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# '=== ARTICLE 3 ===' (also tolerating markdown emphasis and 'लेख 3') opens a batch section
+BATCH_SECTION_RE = re.compile(r'^[\s*#]*=+\s*(?:ARTICLE|लेख)\s*(\d+)\s*=+[\s*]*$', re.MULTILINE | re.IGNORECASE)
+BATCH_END_RE = re.compile(r'^[\s*#]*=+\s*END\b.*$', re.MULTILINE | re.IGNORECASE)
+
+
+LLM_REQUEST_SECONDS = metrics.histogram(
+    'llm_request_duration_seconds', 'LLM rewrite request latency', ('mode', 'outcome')
+)
+LLM_TOKENS = metrics.counter(
+    'llm_tokens_total', 'Estimated LLM tokens (about 2 characters per token)', ('direction',)
+)
+LLM_TOKENS_PER_REWRITE = metrics.histogram(
+    'llm_tokens_per_rewrite', 'Estimated prompt + completion tokens per rewritten article', ('mode',),
+    buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000)
+)
+REWRITE_PARSE = metrics.counter(
+    'rewrite_parse_total', 'Rewrites parsed from LLM responses, by result', ('mode', 'result')
+)
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """Best-effort check for provider rate-limit errors (HTTP 429)"""
+    if getattr(error, 'status_code', None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in ('429', 'rate limit', 'ratelimit', 'rate_limit'))
+
+
 class AIRewriter:
     """Service to rewrite news articles using AI in Aaj Tak style"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[RewriteCache] = None, chat_factory=None):
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
         if not self.api_key:
             raise ValueError("EMERGENT_LLM_KEY not found in environment")
         
         self.model = os.environ.get('AI_MODEL', 'gpt-5.1')
+        self.expected_output_tokens = int(os.environ.get('AI_EXPECTED_OUTPUT_TOKENS', 1500))
+        self.cache = cache
+        # Builds the chat client (LlmChat's signature); dry runs and benchmarks pass an offline one
+        self.chat_factory = chat_factory or LlmChat
+        
+        # Short articles are rewritten several per request so the system prompt is sent once per batch
+        self.batch_size = int(os.environ.get('AI_BATCH_SIZE', 4))
+        self.batch_max_chars = int(os.environ.get('AI_BATCH_MAX_CHARS', 1500))
+        
+        # Running totals; the pipeline diffs them into each job's summary
+        self.stats = {
+            'requests': 0,
+            'errors': 0,
+            'seconds': 0.0,
+            'promptTokens': 0,
+            'completionTokens': 0,
+            'parsed': 0,
+            'parseFailures': 0
+        }
         
         # System message for Aaj Tak style rewriting
         self.system_message = """तुम एक प्रोफेशनल हिंदी न्यूज़ राइटर हो जो आज तक न्यूज़ चैनल की स्टाइल में न्यूज़ लिखता है।
@@ -34,23 +94,28 @@ class AIRewriter:
 4. हिंदी भाषा में ही आउटपुट दो
 5. केवल न्यूज़ कंटेंट दो, कोई extra comments नहीं"""
     
-    async def rewrite_article(self, source_article: Dict) -> Dict:
+    async def cached_rewrite(self, source_article: Dict) -> Optional[Dict]:
+        """Return a previous rewrite of the same story without calling the LLM"""
+        if not self.cache:
+            return None
+        
+        parsed = await self.cache.get(
+            self._cache_key(source_article),
+            cost=self.estimate_tokens(source_article)
+        )
+        return self._build_result(source_article, parsed) if parsed else None
+    
+    async def rewrite_article(self, source_article: Dict, check_cache: bool = True) -> Dict:
         """Rewrite article in Aaj Tak style"""
         try:
-            # Extract source content
-            source_title = source_article.get('sourceTitle', '')
-            source_desc = source_article.get('sourceDescription', '')
-            source_content = source_article.get('sourceContent', '')
-            category = source_article.get('category', '')
+            if check_cache:
+                cached = await self.cached_rewrite(source_article)
+                if cached:
+                    return cached
             
-            # Create prompt
             prompt = f"""नीचे दी गई न्यूज़ को आज तक स्टाइल में रीराइट करो:
 
-Original Title: {source_title}
-Description: {source_desc}
-Content: {source_content}
-
-Category: {category}
+{self._source_block(source_article)}
 
 रीराइट करते समय:
 1. एक नया, कैची हेडलाइन बनाओ (1 लाइन)
@@ -62,51 +127,206 @@ HEADLINE: [headline यहाँ]
 SUMMARY: [summary यहाँ]
 CONTENT: [full article यहाँ]"""
             
-            # Initialize chat
-            chat = LlmChat(
-                api_key=self.api_key,
-                session_id=f"rewrite_{source_article.get('sourceUrl', 'default')}",
-                system_message=self.system_message
-            )
-            
-            # Use OpenAI GPT-5.1
-            chat.with_model("openai", self.model)
-            
-            # Send message
-            user_message = UserMessage(text=prompt)
-            response = await chat.send_message(user_message)
+            response = await self._send(f"rewrite_{source_article.get('sourceUrl', 'default')}", prompt, 'single')
             
             # Parse response
             parsed = self._parse_response(response)
+            self._record_parse('single', [parsed], prompt, response)
             
             if not parsed:
                 logger.error("Failed to parse AI response")
                 return None
             
-            # Detect district if local news
-            district = None
-            if category == 'स्थानीय':
-                district = self._detect_district(parsed['headline'], parsed['summary'])
+            if self.cache:
+                await self.cache.put(self._cache_key(source_article), parsed, model=self.model)
             
-            return {
-                'title': parsed['headline'],
-                'summary': parsed['summary'],
-                'content': parsed['content'],
-                'category': category,
-                'district': district,
-                'image': source_article.get('sourceImage', ''),
-                'sourceTitle': source_title,
-                'sourceUrl': source_article.get('sourceUrl', ''),
-                'sourcePublishedAt': source_article.get('sourcePublishedAt', ''),
-                'priority': source_article.get('priority', 5)
-            }
+            return self._build_result(source_article, parsed)
             
+        except RateLimitError:
+            raise
         except Exception as e:
             logger.error(f"Error rewriting article: {str(e)}")
             return None
     
-    def _parse_response(self, response: str) -> Optional[Dict]:
-        """Parse AI response into structured format"""
+    def is_batchable(self, source_article: Dict) -> bool:
+        """Whether an article is short enough to share a request with others"""
+        return self.batch_size > 1 and self._source_chars(source_article) <= self.batch_max_chars
+    
+    async def rewrite_batch(self, source_articles: List[Dict]) -> List[Optional[Dict]]:
+        """Rewrite several articles in one request.
+        
+        Returns one entry per input, in order; entries the response has no
+        complete section for are None so the caller can rewrite them singly.
+        The cache is not consulted here, only filled.
+        """
+        blocks = '\n\n'.join(
+            f"[[ARTICLE {number}]]\n{self._source_block(source_article)}"
+            for number, source_article in enumerate(source_articles, 1)
+        )
+        prompt = f"""नीचे {len(source_articles)} अलग-अलग न्यूज़ हैं। हर न्यूज़ को अलग से आज तक स्टाइल में रीराइट करो।
+एक न्यूज़ के फैक्ट्स दूसरी न्यूज़ में मत मिलाओ।
+
+{blocks}
+
+हर न्यूज़ के लिए:
+1. एक नया, कैची हेडलाइन बनाओ (1 लाइन)
+2. एक छोटी सारांश लिखो (2 लाइन)
+3. पूरा आर्टिकल लिखो (300-500 शब्द)
+
+हर न्यूज़ का जवाब उसी नंबर के साथ, ठीक इसी Format में दो:
+=== ARTICLE 1 ===
+HEADLINE: [headline यहाँ]
+SUMMARY: [summary यहाँ]
+CONTENT: [full article यहाँ]
+=== END ARTICLE 1 ==="""
+        
+        try:
+            response = await self._send(
+                f"rewrite_batch_{source_articles[0].get('sourceUrl', 'default')}", prompt, 'batch'
+            )
+        except RateLimitError:
+            raise
+        except Exception as e:
+            logger.error(f"Error rewriting batch of {len(source_articles)} articles: {str(e)}")
+            return [None] * len(source_articles)
+        
+        sections = self._parse_batch_response(response, len(source_articles))
+        self._record_parse('batch', sections, prompt, response)
+        results = []
+        for source_article, parsed in zip(source_articles, sections):
+            if not parsed:
+                results.append(None)
+                continue
+            if self.cache:
+                await self.cache.put(self._cache_key(source_article), parsed, model=self.model)
+            results.append(self._build_result(source_article, parsed))
+        
+        parsed_count = sum(1 for result in results if result)
+        if parsed_count < len(source_articles):
+            logger.warning(f"Batch rewrite parsed {parsed_count} of {len(source_articles)} articles")
+        return results
+    
+    async def _send(self, session_id: str, prompt: str, mode: str = 'single') -> str:
+        """Send one prompt in a fresh chat, translating provider rate limits"""
+        chat = self.chat_factory(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=self.system_message
+        )
+        chat.with_model("openai", self.model)
+        
+        prompt_tokens = (len(self.system_message) + len(prompt)) // 2
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = await chat.send_message(UserMessage(text=prompt))
+            outcome = 'ok'
+        except Exception as e:
+            if _is_rate_limit(e):
+                outcome = 'rate_limited'
+                raise RateLimitError(str(e), getattr(e, 'retry_after', None)) from e
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            LLM_REQUEST_SECONDS.observe(elapsed, mode=mode, outcome=outcome)
+            self.stats['requests'] += 1
+            self.stats['seconds'] += elapsed
+            if outcome != 'ok':
+                self.stats['errors'] += 1
+        
+        completion_tokens = len(response or '') // 2
+        LLM_TOKENS.inc(prompt_tokens, direction='prompt')
+        LLM_TOKENS.inc(completion_tokens, direction='completion')
+        self.stats['promptTokens'] += prompt_tokens
+        self.stats['completionTokens'] += completion_tokens
+        return response
+    
+    def _record_parse(self, mode: str, sections: List[Optional[Dict]], prompt: str, response: str):
+        """Count parsed and unparseable rewrites from one response"""
+        parsed = sum(1 for section in sections if section)
+        failed = len(sections) - parsed
+        REWRITE_PARSE.inc(parsed, mode=mode, result='ok')
+        REWRITE_PARSE.inc(failed, mode=mode, result='failed')
+        self.stats['parsed'] += parsed
+        self.stats['parseFailures'] += failed
+        # A batch request's tokens are shared by every article it rewrote
+        if parsed:
+            tokens = (len(self.system_message) + len(prompt) + len(response or '')) // 2
+            LLM_TOKENS_PER_REWRITE.observe(tokens / parsed, mode=mode)
+    
+    def _source_block(self, source_article: Dict) -> str:
+        return f"""Original Title: {source_article.get('sourceTitle', '')}
+Description: {source_article.get('sourceDescription', '')}
+Content: {source_article.get('sourceContent', '')}
+
+Category: {source_article.get('category', '')}"""
+    
+    def _build_result(self, source_article: Dict, parsed: Dict) -> Dict:
+        """Combine a parsed rewrite with the source article's metadata"""
+        category = source_article.get('category', '')
+        
+        # Detect district if local news
+        district = None
+        if category == 'स्थानीय':
+            district = self._detect_district(parsed['headline'], parsed['summary'])
+        
+        return {
+            'title': parsed['headline'],
+            'summary': parsed['summary'],
+            'content': parsed['content'],
+            'category': category,
+            'district': district,
+            'image': source_article.get('sourceImage', ''),
+            'sourceTitle': source_article.get('sourceTitle', ''),
+            'sourceUrl': source_article.get('sourceUrl', ''),
+            'sourcePublishedAt': source_article.get('sourcePublishedAt', ''),
+            'priority': source_article.get('priority', 5)
+        }
+    
+    def _cache_key(self, source_article: Dict) -> str:
+        return RewriteCache.make_key(source_article, self.model, self.system_message)
+    
+    def _source_chars(self, source_article: Dict) -> int:
+        return sum(
+            len(source_article.get(field) or '')
+            for field in ('sourceTitle', 'sourceDescription', 'sourceContent')
+        )
+    
+    def estimate_tokens(self, source_article: Dict) -> int:
+        """Rough prompt + completion token estimate used for rate limiting"""
+        prompt_chars = len(self.system_message) + self._source_chars(source_article)
+        # Devanagari runs at roughly 2 characters per token; the reply is a
+        # 300-500 word article
+        return prompt_chars // 2 + self.expected_output_tokens
+    
+    def estimate_batch_tokens(self, source_articles: List[Dict]) -> int:
+        """Token estimate for one batch request: the system prompt counts once"""
+        prompt_chars = len(self.system_message) + sum(self._source_chars(a) for a in source_articles)
+        return prompt_chars // 2 + self.expected_output_tokens * len(source_articles)
+    
+    def _parse_batch_response(self, response: str, count: int) -> List[Optional[Dict]]:
+        """Split a batch response into per-article rewrites by their ARTICLE numbers.
+        
+        Sections are matched by number, not position, so a reordered reply
+        still maps back correctly; missing, duplicate, out-of-range or
+        incomplete sections come back as None.
+        """
+        sections: List[Optional[Dict]] = [None] * count
+        markers = list(BATCH_SECTION_RE.finditer(response or ''))
+        for index, marker in enumerate(markers):
+            number = int(marker.group(1))
+            if not 1 <= number <= count or sections[number - 1] is not None:
+                continue
+            end = markers[index + 1].start() if index + 1 < len(markers) else len(response)
+            body = response[marker.end():end]
+            closing = BATCH_END_RE.search(body)
+            if closing:
+                body = body[:closing.start()]
+            sections[number - 1] = self._parse_response(body, strict=True)
+        return sections
+    
+    def _parse_response(self, response: str, strict: bool = False) -> Optional[Dict]:
+        """Parse AI response into structured format; `strict` requires all three markers"""
         try:
             lines = response.strip().split('\n')
             
@@ -137,6 +357,8 @@ CONTENT: [full article यहाँ]"""
                         content += ' ' + line
             
             if not headline or not summary or not content:
+                if strict:
+                    return None
                 # Fallback parsing
                 parts = response.split('\n\n')
                 if len(parts) >= 3:
@@ -158,17 +380,4 @@ CONTENT: [full article यहाँ]"""
     
     def _detect_district(self, title: str, summary: str) -> Optional[str]:
         """Detect district from rewritten content"""
-        content = f"{title} {summary}".lower()
-        
-        districts = {
-            'जलना': ['jalna', 'जलना'],
-            'औरंगाबाद': ['aurangabad', 'औरंगाबाद', 'sambhajinagar', 'संभाजीनगर'],
-            'मराठवाड़ा': ['marathwada', 'मराठवाड़ा'],
-            'परभणी': ['parbhani', 'परभणी']
-        }
-        
-        for district, keywords in districts.items():
-            if any(keyword in content for keyword in keywords):
-                return district
-        
-        return None
+        return detect_district(title, summary)
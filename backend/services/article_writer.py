@@ -0,0 +1,188 @@
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from backend.models.article import Article
+from backend.services.id_allocator import ArticleIdAllocator
+from backend.services.dedupe import source_key
+
+logger = logging.getLogger(__name__)
+
+# Per-document outcomes of a flush, by sourceUrlKey
+INSERTED = 'inserted'
+PRESENT = 'present'
+FAILED = 'failed'
+
+
+class ArticleWriter:
+    """Buffers rewritten article documents and stores them in bulk.
+
+    The buffer is flushed when it reaches `max_batch` documents or when its
+    oldest document is `max_age` seconds old. Each flush reserves a block of
+    article IDs and writes one unordered `bulk_write` of upserts keyed on
+    `sourceUrlKey`, so a story stored meanwhile by another run is skipped rather
+    than duplicated. Per-document failures are pushed onto the job's
+    `writeErrors` list in `fetch_jobs`.
+
+    `outcomes` maps each flushed document's sourceUrlKey to INSERTED,
+    PRESENT (stored earlier) or FAILED, so callers can tell which of the
+    documents they added are actually in Mongo. A document whose flush
+    raised before the write has no outcome. `on_flush` receives the
+    sourceUrlKeys of each flush's documents once their outcomes are set.
+    """
+
+    def __init__(
+        self,
+        db,
+        id_allocator: ArticleIdAllocator,
+        job_id: Optional[str] = None,
+        max_batch: Optional[int] = None,
+        max_age: Optional[float] = None,
+        on_commit: Optional[Callable[[List[Dict]], Awaitable[None]]] = None,
+        on_flush: Optional[Callable[[List[str]], Awaitable[None]]] = None
+    ):
+        self.db = db
+        self.id_allocator = id_allocator
+        self.job_id = job_id
+        self.max_batch = max_batch or int(os.environ.get('WRITE_BATCH_SIZE', 20))
+        self.max_age = max_age or float(os.environ.get('WRITE_MAX_AGE_SECONDS', 5))
+        self.on_commit = on_commit
+        self.on_flush = on_flush
+
+        self.inserted_count = 0
+        self.skipped_count = 0
+        self.error_count = 0
+        self.outcomes: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+
+        self._buffer: List[Dict] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, article_doc: Dict):
+        """Queue a document (without articleId) for the next flush"""
+        self._buffer.append(article_doc)
+
+        if len(self._buffer) >= self.max_batch:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after(self.max_age))
+
+    async def _flush_after(self, delay: float):
+        await asyncio.sleep(delay)
+        self._timer = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing article buffer: {str(e)}")
+
+    async def flush(self) -> int:
+        """Write everything buffered so far; returns the number of new articles"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            docs, self._buffer = self._buffer, []
+            if not docs:
+                return 0
+
+            ids = await self.id_allocator.reserve(len(docs))
+            # Stamped at write time: read-side catch-ups page on createdAt, not articleId
+            stored_at = datetime.utcnow()
+            valid, errors = [], []
+            for doc, article_id in zip(docs, ids):
+                doc['articleId'] = article_id
+                doc['sourceUrlKey'] = source_key(doc)
+                doc['createdAt'] = stored_at
+                try:
+                    Article(**doc)
+                    valid.append(doc)
+                except ValidationError as e:
+                    errors.append(self._error_entry(doc, 'validation', str(e)))
+
+            inserted = []
+            if valid:
+                inserted, write_errors = await self._bulk_upsert(valid)
+                errors.extend(write_errors)
+
+            skipped = len(docs) - len(inserted) - len(errors)
+            for doc in valid:
+                self.outcomes[doc['sourceUrlKey']] = PRESENT
+            for doc in inserted:
+                self.outcomes[doc['sourceUrlKey']] = INSERTED
+            for error in errors:
+                self.outcomes[error['sourceUrlKey']] = FAILED
+                self.errors[error['sourceUrlKey']] = f"{error['code']}: {error['error']}"
+            self.inserted_count += len(inserted)
+            self.skipped_count += skipped
+            self.error_count += len(errors)
+
+            for error in errors:
+                logger.error(f"Failed to store article {error['sourceUrl']}: {error['error']}")
+            logger.info(
+                f"Stored {len(inserted)} articles ({skipped} already present, {len(errors)} failed)"
+            )
+
+            await self._record(len(inserted), skipped, errors)
+
+        if inserted and self.on_commit:
+            await self.on_commit(inserted)
+        if self.on_flush:
+            await self.on_flush([doc['sourceUrlKey'] for doc in docs])
+
+        return len(inserted)
+
+    async def close(self) -> int:
+        """Flush the remaining buffer"""
+        return await self.flush()
+
+    async def _bulk_upsert(self, docs: List[Dict]):
+        """Insert documents whose sourceUrlKey is not stored yet, in one round-trip"""
+        operations = [
+            UpdateOne({'sourceUrlKey': doc['sourceUrlKey']}, {'$setOnInsert': doc}, upsert=True)
+            for doc in docs
+        ]
+
+        try:
+            result = await self.db.articles.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids or {}
+            write_errors = []
+        except BulkWriteError as e:
+            upserted = {entry['index']: entry['_id'] for entry in e.details.get('upserted', [])}
+            write_errors = [
+                self._error_entry(docs[entry['index']], entry.get('code'), entry.get('errmsg', ''))
+                for entry in e.details.get('writeErrors', [])
+            ]
+        except PyMongoError as e:
+            return [], [self._error_entry(doc, 'write', str(e)) for doc in docs]
+
+        return [docs[index] for index in sorted(upserted)], write_errors
+
+    @staticmethod
+    def _error_entry(doc: Dict, code, message: str) -> Dict:
+        return {
+            'articleId': doc.get('articleId'),
+            'sourceUrl': doc.get('sourceUrl'),
+            'sourceUrlKey': doc.get('sourceUrlKey'),
+            'code': code,
+            'error': message[:500]
+        }
+
+    async def _record(self, inserted: int, skipped: int, errors: List[Dict]):
+        """Accumulate flush results on the fetch_jobs record"""
+        if not self.job_id:
+            return
+
+        update = {'$inc': {'articlesProcessed': inserted, 'articlesSkipped': skipped}}
+        if errors:
+            update['$push'] = {'writeErrors': {'$each': errors}}
+
+        try:
+            await self.db.fetch_jobs.update_one({'jobId': self.job_id}, update)
+        except PyMongoError as e:
+            logger.error(f"Error recording write results for job {self.job_id}: {str(e)}")
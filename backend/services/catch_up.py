@@ -0,0 +1,41 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleCatchUp:
+    """Finds articles stored since the last check, by any process.
+
+    Article IDs are reserved before the write, so a block reserved early
+    can land after a higher one and paging on articleId would skip it.
+    This pages on createdAt instead, which ArticleWriter stamps when it
+    writes, and re-reads an overlap window (CATCH_UP_OVERLAP_SECONDS,
+    default 120) to cover clock skew between processes and writes still in
+    flight. Articles in the overlap come back again, so callers must
+    ignore ones they already have.
+    """
+
+    def __init__(self, db, projection: Dict, overlap_seconds: Optional[float] = None):
+        self.db = db
+        self.projection = projection
+        self.overlap = timedelta(seconds=overlap_seconds or float(os.environ.get('CATCH_UP_OVERLAP_SECONDS', 120)))
+        self.checked_at: Optional[datetime] = None
+
+    def mark(self, at: Optional[datetime] = None):
+        """Start catching up from `at` (e.g. when an initial load began)"""
+        self.checked_at = at or datetime.utcnow()
+
+    async def fetch(self, batch_size: int = 500) -> AsyncIterator[Dict]:
+        """Articles stored since the last completed fetch, plus the overlap window"""
+        now = datetime.utcnow()
+        since = (self.checked_at or now) - self.overlap
+        cursor = self.db.articles.find(
+            {'createdAt': {'$gte': since}},
+            self.projection
+        ).batch_size(batch_size)
+        async for article in cursor:
+            yield article
+        self.checked_at = now
@@ -0,0 +1,136 @@
+import logging
+from typing import Dict, List
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only carry campaign/referrer tracking
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'igshid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'referrer', 'cmpid', 'ocid', 'ito', 'smid',
+    'amp', 'amp_js_v', 'usqp', 'outputtype', 'share'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'at_', 'itm_')
+
+# Hosts that proxy a publisher's AMP page: /c/s/<host>/<path> and /amp/s/<host>/<path>
+AMP_CACHE_HOSTS = ('cdn.ampproject.org', 'google.com')
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of an article URL used for duplicate detection.
+
+    Drops the fragment, tracking parameters and AMP variants (AMP cache hosts,
+    `amp.` subdomains, `/amp` path segments and `.amp.html` suffixes), folds
+    http/https and `www.`, and sorts the remaining query parameters.
+    """
+    if not url:
+        return ''
+
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    path = parts.path
+
+    # Unwrap AMP cache URLs into the publisher URL they mirror
+    if any(host == suffix or host.endswith('.' + suffix) for suffix in AMP_CACHE_HOSTS):
+        segments = path.split('/')
+        for marker in ('c', 'amp'):
+            if marker in segments:
+                rest = segments[segments.index(marker) + 1:]
+                if rest and rest[0] == 's':
+                    rest = rest[1:]
+                if rest and '.' in rest[0]:
+                    return normalize_url('https://' + '/'.join(unquote(r) for r in rest))
+
+    for prefix in ('www.', 'amp.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+
+    segments = [s for s in path.split('/') if s and s.lower() != 'amp']
+    path = '/' + '/'.join(segments)
+    for suffix, replacement in (('.amp.html', '.html'), ('.amp.htm', '.htm'), ('.amp', '')):
+        if path.lower().endswith(suffix):
+            path = path[:-len(suffix)] + replacement
+            break
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
+
+def source_key(article: Dict) -> str:
+    """An article's dedupe key: its `sourceUrlKey`, or its normalized `sourceUrl`"""
+    return article.get('sourceUrlKey') or normalize_url(article.get('sourceUrl') or '')
+
+
+class ArticleDeduper:
+    """Pre-rewrite dedupe of fetched articles by normalized source URL"""
+
+    def __init__(self, db, lookup_chunk_size: int = 1000):
+        self.db = db
+        self.lookup_chunk_size = lookup_chunk_size
+
+    async def filter_new(self, all_news: Dict[str, List[Dict]]) -> Dict:
+        """Flatten a fetch result into the articles not yet stored.
+
+        Duplicates inside the batch keep the highest-priority copy; the
+        remaining URLs are checked against stored articles with one `$in`
+        query per chunk. Surviving articles keep their original `sourceUrl`
+        (the link shown to readers) and get the normalized URL as
+        `sourceUrlKey`. Returns the articles plus counts for the job record.
+        """
+        fetched = 0
+        batch = {}
+        raw_urls = {}
+
+        for articles in all_news.values():
+            for source_article in articles:
+                fetched += 1
+                raw_url = source_article.get('sourceUrl') or ''
+                url = normalize_url(raw_url)
+                if not url:
+                    logger.warning(f"Skipping article without URL: {source_article.get('sourceTitle', '')}")
+                    continue
+
+                current = batch.get(url)
+                if current is None or source_article.get('priority', 5) > current.get('priority', 5):
+                    batch[url] = {**source_article, 'sourceUrlKey': url}
+                raw_urls.setdefault(url, set()).add(raw_url)
+
+        existing = await self._existing_urls(batch, raw_urls)
+        unseen = [article for url, article in batch.items() if url not in existing]
+
+        stats = {
+            'fetched': fetched,
+            'batchDuplicates': fetched - len(batch),
+            'existing': len(existing),
+            'unseen': len(unseen)
+        }
+        logger.info(
+            f"Dedupe: {fetched} fetched, {stats['batchDuplicates']} repeated in batch, "
+            f"{stats['existing']} already stored, {len(unseen)} new"
+        )
+        return {'articles': unseen, 'stats': stats}
+
+    async def _existing_urls(self, batch: Dict[str, Dict], raw_urls: Dict[str, set]) -> set:
+        """Normalized URLs from the batch that are already in the articles collection"""
+        # Older documents have no sourceUrlKey and store either the raw or the normalized URL
+        candidates = set(batch)
+        for urls in raw_urls.values():
+            candidates.update(urls)
+        candidates = list(candidates)
+
+        existing = set()
+        for start in range(0, len(candidates), self.lookup_chunk_size):
+            chunk = candidates[start:start + self.lookup_chunk_size]
+            cursor = self.db.articles.find(
+                {'$or': [{'sourceUrlKey': {'$in': chunk}}, {'sourceUrl': {'$in': chunk}}]},
+                {'_id': 0, 'sourceUrl': 1, 'sourceUrlKey': 1}
+            )
+            async for doc in cursor:
+                existing.add(source_key(doc))
+
+        return existing & set(batch)
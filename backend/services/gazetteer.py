@@ -0,0 +1,328 @@
+import unicodedata
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# District label -> (aliases of the district itself, talukas/cities/localities in it).
+# Labels are what gets stored in `articles.district`. Aliases cover Latin and
+# Devanagari (Hindi and Marathi) spellings; names that are also common words
+# or places elsewhere (e.g. कल्याण, रायगढ़, Badlapur, Wani) are left out.
+DISTRICTS: Dict[str, Tuple[List[str], List[str]]] = {
+    'अहमदनगर': (
+        ['ahmednagar', 'ahmadnagar', 'ahilyanagar', 'अहमदनगर', 'अहिल्यानगर'],
+        ['shirdi', 'शिर्डी', 'sangamner', 'संगमनेर', 'kopargaon', 'कोपरगांव', 'कोपरगाव',
+         'shrirampur', 'श्रीरामपुर', 'श्रीरामपूर', 'rahuri', 'राहुरी', 'shevgaon', 'शेवगांव']
+    ),
+    'अकोला': (
+        ['akola', 'अकोला'],
+        ['akot', 'अकोट', 'murtizapur', 'मूर्तिजापुर', 'balapur', 'बालापुर']
+    ),
+    'अमरावती': (
+        ['amravati', 'अमरावती'],
+        ['achalpur', 'अचलपुर', 'paratwada', 'परतवाड़ा', 'chikhaldara', 'चिखलदरा', 'morshi', 'मोर्शी']
+    ),
+    'औरंगाबाद': (
+        ['aurangabad', 'औरंगाबाद', 'sambhajinagar', 'chhatrapati sambhajinagar', 'संभाजीनगर',
+         'छत्रपति संभाजीनगर'],
+        ['paithan', 'पैठण', 'पैठन', 'vaijapur', 'वैजापुर', 'sillod', 'सिल्लोड', 'khuldabad', 'खुलताबाद',
+         'ellora', 'एलोरा', 'verul', 'वेरूल', 'waluj', 'वालूज']
+    ),
+    'बीड': (
+        ['beed', 'बीड'],
+        ['parli', 'परली', 'ambajogai', 'अंबाजोगाई', 'majalgaon', 'माजलगांव', 'georai', 'गेवराई', 'kaij']
+    ),
+    'भंडारा': (
+        ['bhandara', 'भंडारा'],
+        ['tumsar', 'तुमसर', 'sakoli', 'साकोली', 'pauni', 'पवनी']
+    ),
+    'बुलढाणा': (
+        ['buldhana', 'buldana', 'बुलढाणा', 'बुलडाणा'],
+        ['khamgaon', 'खामगांव', 'shegaon', 'शेगांव', 'mehkar', 'मेहकर', 'lonar', 'लोणार', 'लोनार']
+    ),
+    'चंद्रपुर': (
+        ['chandrapur', 'चंद्रपुर', 'चंद्रपूर'],
+        ['ballarpur', 'बल्लारपुर', 'warora', 'वरोरा', 'brahmapuri', 'ब्रह्मपुरी', 'chimur', 'चिमूर', 'tadoba', 'ताडोबा']
+    ),
+    'धुले': (
+        ['dhule', 'धुले', 'धुळे'],
+        ['shirpur', 'शिरपुर', 'sakri', 'साक्री', 'dondaicha', 'दोंडाईचा']
+    ),
+    'गढ़चिरौली': (
+        ['gadchiroli', 'गढ़चिरौली', 'गडचिरोली'],
+        ['aheri', 'अहेरी', 'desaiganj', 'देसाईगंज', 'wadsa', 'वडसा', 'bhamragad', 'भामरागड']
+    ),
+    'गोंदिया': (
+        ['gondia', 'gondiya', 'गोंदिया'],
+        ['tirora', 'तिरोड़ा', 'तिरोडा', 'amgaon', 'आमगांव']
+    ),
+    'हिंगोली': (
+        ['hingoli', 'हिंगोली'],
+        ['vasmat', 'basmat', 'वसमत', 'kalamnuri', 'कलमनुरी', 'sengaon', 'सेनगांव']
+    ),
+    'जलगांव': (
+        ['jalgaon', 'जलगांव', 'जळगाव', 'जलगाव'],
+        ['bhusawal', 'भुसावल', 'भुसावळ', 'chalisgaon', 'चालीसगांव', 'amalner', 'अमलनेर', 'pachora', 'पाचोरा',
+         'chopda', 'चोपड़ा']
+    ),
+    'जालना': (
+        ['jalna', 'जालना'],
+        ['ambad', 'अंबड', 'अंबड़', 'bhokardan', 'भोकरदन', 'partur', 'परतूर', 'ghansawangi', 'घनसावंगी',
+         'badnapur', 'बदनापुर', 'mantha', 'मंठा', 'jafrabad', 'जाफराबाद']
+    ),
+    'कोल्हापुर': (
+        ['kolhapur', 'कोल्हापुर', 'कोल्हापूर'],
+        ['ichalkaranji', 'इचलकरंजी', 'kagal', 'कागल', 'gadhinglaj', 'गडहिंग्लज', 'panhala', 'पन्हाला']
+    ),
+    'लातूर': (
+        ['latur', 'लातूर'],
+        ['udgir', 'उदगीर', 'ausa', 'औसा', 'nilanga', 'निलंगा', 'ahmedpur', 'अहमदपुर']
+    ),
+    'मुंबई': (
+        ['mumbai', 'bombay', 'मुंबई', 'मुम्बई', 'बंबई', 'बॉम्बे'],
+        ['colaba', 'कोलाबा', 'dadar', 'दादर', 'worli', 'वरली', 'byculla', 'भायखला', 'mahim', 'माहिम',
+         'churchgate', 'चर्चगेट', 'marine drive', 'मरीन ड्राइव']
+    ),
+    'मुंबई उपनगर': (
+        ['mumbai suburban', 'मुंबई उपनगर'],
+        ['andheri', 'अंधेरी', 'borivali', 'बोरीवली', 'bandra', 'बांद्रा', 'kurla', 'कुर्ला', 'ghatkopar', 'घाटकोपर',
+         'goregaon', 'गोरेगांव', 'malad', 'मलाड', 'kandivali', 'कांदिवली', 'mulund', 'मुलुंड', 'powai', 'पवई',
+         'chembur', 'चेंबूर', 'juhu', 'जुहू']
+    ),
+    'नागपुर': (
+        ['nagpur', 'नागपुर', 'नागपूर'],
+        ['kamptee', 'kamthi', 'कामठी', 'umred', 'उमरेड', 'ramtek', 'रामटेक', 'katol', 'काटोल', 'hingna', 'हिंगणा']
+    ),
+    'नांदेड़': (
+        ['nanded', 'नांदेड़', 'नांदेड'],
+        ['deglur', 'देगलूर', 'mukhed', 'मुखेड', 'kinwat', 'किनवट', 'hadgaon', 'हदगांव', 'biloli', 'बिलोली']
+    ),
+    'नंदुरबार': (
+        ['nandurbar', 'नंदुरबार'],
+        ['shahada', 'शहादा', 'navapur', 'नवापुर', 'taloda', 'तलोदा', 'akkalkuwa', 'अक्कलकुवा']
+    ),
+    'नासिक': (
+        ['nashik', 'nasik', 'नासिक', 'नाशिक'],
+        ['malegaon', 'मालेगांव', 'मालेगाव', 'sinnar', 'सिन्नर', 'igatpuri', 'इगतपुरी', 'trimbakeshwar',
+         'त्र्यंबकेश्वर', 'niphad', 'निफाड', 'yeola', 'येवला', 'manmad', 'मनमाड']
+    ),
+    'उस्मानाबाद': (
+        ['osmanabad', 'dharashiv', 'उस्मानाबाद', 'धाराशिव'],
+        ['tuljapur', 'तुलजापुर', 'umarga', 'omerga', 'उमरगा', 'paranda', 'परांडा', 'kalamb', 'कळंब']
+    ),
+    'पालघर': (
+        ['palghar', 'पालघर'],
+        ['vasai', 'वसई', 'virar', 'विरार', 'dahanu', 'डहाणू', 'दहानू', 'boisar', 'बोईसर', 'jawhar', 'जव्हार']
+    ),
+    'परभणी': (
+        ['parbhani', 'परभणी'],
+        ['gangakhed', 'गंगाखेड', 'pathri', 'पाथरी', 'selu', 'सेलू', 'jintur', 'जिंतूर', 'sonpeth', 'सोनपेठ']
+    ),
+    'पुणे': (
+        ['pune', 'poona', 'पुणे', 'पूना'],
+        ['pimpri', 'पिंपरी', 'chinchwad', 'चिंचवड', 'baramati', 'बारामती', 'junnar', 'जुन्नर', 'lonavala',
+         'lonavla', 'लोनावला', 'shirur', 'शिरूर', 'daund', 'दौंड', 'indapur', 'इंदापुर', 'hinjewadi', 'हिंजवडी']
+    ),
+    'रायगड': (
+        ['raigad', 'रायगड'],
+        ['alibag', 'alibaug', 'अलीबाग', 'panvel', 'पनवेल', 'khopoli', 'खोपोली', 'mahad', 'महाड', 'uran', 'उरण',
+         'matheran', 'माथेरान', 'shrivardhan', 'श्रीवर्धन']
+    ),
+    'रत्नागिरी': (
+        ['ratnagiri', 'रत्नागिरी'],
+        ['chiplun', 'चिपलून', 'चिपळूण', 'dapoli', 'दापोली', 'sangameshwar', 'संगमेश्वर', 'guhagar', 'गुहागर']
+    ),
+    'सांगली': (
+        ['sangli', 'सांगली'],
+        ['miraj', 'मिरज', 'tasgaon', 'तासगांव', 'kavathe mahankal', 'कवठेमहांकाल', 'palus', 'पलूस']
+    ),
+    'सातारा': (
+        ['satara', 'सातारा'],
+        ['karad', 'कराड', 'mahabaleshwar', 'महाबलेश्वर', 'phaltan', 'फलटण', 'फलटन', 'panchgani', 'पाचगणी']
+    ),
+    'सिंधुदुर्ग': (
+        ['sindhudurg', 'सिंधुदुर्ग'],
+        ['kudal', 'कुडाल', 'sawantwadi', 'सावंतवाडी', 'malvan', 'मालवण', 'मालवन', 'kankavli', 'कणकवली', 'vengurla',
+         'वेंगुर्ला']
+    ),
+    'सोलापुर': (
+        ['solapur', 'sholapur', 'सोलापुर', 'सोलापूर'],
+        ['pandharpur', 'पंढरपुर', 'पंढरपूर', 'barshi', 'बार्शी', 'akkalkot', 'अक्कलकोट', 'mohol', 'मोहोल']
+    ),
+    'ठाणे': (
+        ['thane', 'ठाणे'],
+        ['dombivli', 'dombivali', 'डोंबिवली', 'bhiwandi', 'भिवंडी', 'ulhasnagar', 'उल्हासनगर', 'ambernath',
+         'अंबरनाथ', 'navi mumbai', 'नवी मुंबई', 'vashi', 'वाशी', 'airoli', 'ऐरोली', 'mira bhayandar',
+         'mira-bhayandar', 'मीरा-भायंदर', 'मीरा भायंदर', 'shahapur', 'शहापुर']
+    ),
+    'वर्धा': (
+        ['wardha', 'वर्धा'],
+        ['hinganghat', 'हिंगणघाट', 'arvi', 'आर्वी', 'sevagram', 'सेवाग्राम', 'pulgaon', 'पुलगांव']
+    ),
+    'वाशिम': (
+        ['washim', 'वाशिम'],
+        ['karanja', 'कारंजा', 'risod', 'रिसोड', 'mangrulpir', 'मंगरूलपीर', 'malegaon jahangir']
+    ),
+    'यवतमाल': (
+        ['yavatmal', 'yeotmal', 'यवतमाल'],
+        ['pusad', 'पुसद', 'umarkhed', 'उमरखेड', 'darwha', 'दारव्हा', 'digras', 'दिग्रस', 'pandharkawada',
+         'पांढरकवडा']
+    )
+}
+
+# Regions are reported only when no district or place in them is named
+REGIONS: Dict[str, List[str]] = {
+    'मराठवाड़ा': ['marathwada', 'मराठवाड़ा', 'मराठवाडा'],
+    'विदर्भ': ['vidarbha', 'विदर्भ'],
+    'कोंकण': ['konkan', 'कोंकण', 'कोकण'],
+    'खानदेश': ['khandesh', 'खानदेश']
+}
+
+# Demonym suffixes allowed straight after a name ('मुंबईकर', 'Punekars')
+ALLOWED_SUFFIXES = ('कर', 'करों', 'वासी', 'वासियों', 'kar', 'kars')
+
+
+class LocationMatch:
+    """One place name found in a text"""
+
+    __slots__ = ('name', 'kind', 'alias', 'start', 'end')
+
+    def __init__(self, name: str, kind: str, alias: str, start: int, end: int):
+        self.name = name      # district (or region) label
+        self.kind = kind      # 'district', 'place' or 'region'
+        self.alias = alias
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"LocationMatch({self.name!r}, {self.kind!r}, {self.alias!r}, {self.start}, {self.end})"
+
+
+def normalize(text: str) -> str:
+    """NFC, lower-case, no nukta, chandrabindu as anusvara"""
+    # NFC keeps nukta letters decomposed (ड़ -> ड + ़), so dropping the nukta folds them
+    return unicodedata.normalize('NFC', text or '').lower().translate(_FOLD)
+
+
+_FOLD = {0x093C: None, 0x0901: '\u0902'}
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or unicodedata.category(char) in ('Mn', 'Mc')
+
+
+class _Automaton:
+    """Aho-Corasick automaton over normalized aliases"""
+
+    def __init__(self, patterns: Dict[str, Tuple[str, str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, str, str]]] = [[]]
+
+        for alias, (name, kind) in patterns.items():
+            state = 0
+            for char in alias:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append((len(alias), name, kind, alias))
+
+        # Breadth-first failure links; each state also emits its fallback's matches
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def matches(self, text: str):
+        """Every (start, end, name, kind, alias) occurrence, overlapping ones included"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, name, kind, alias in out[state]:
+                yield index - length + 1, index + 1, name, kind, alias
+
+
+def _build() -> _Automaton:
+    patterns = {}
+    for name, (aliases, places) in DISTRICTS.items():
+        for place in places:
+            patterns[normalize(place)] = (name, 'place')
+        for alias in aliases:
+            patterns[normalize(alias)] = (name, 'district')
+    for name, aliases in REGIONS.items():
+        for alias in aliases:
+            patterns.setdefault(normalize(alias), (name, 'region'))
+    return _Automaton(patterns)
+
+
+_AUTOMATON = _build()
+
+
+def _bounded(text: str, start: int, end: int) -> bool:
+    """Whether text[start:end] is a whole word (allowing a demonym suffix)"""
+    if start > 0 and _is_word_char(text[start - 1]):
+        return False
+    if end == len(text) or not _is_word_char(text[end]):
+        return True
+    for suffix in ALLOWED_SUFFIXES:
+        if text.startswith(suffix, end):
+            after = end + len(suffix)
+            if after == len(text) or not _is_word_char(text[after]):
+                return True
+    return False
+
+
+def find_locations(*texts: str) -> List[LocationMatch]:
+    """Every Maharashtra place named in `texts`, in one pass.
+
+    Overlapping names resolve to the leftmost, then longest ('Navi Mumbai'
+    is Thane, not Mumbai). Positions refer to the normalized, joined text.
+    """
+    text = normalize(' \n '.join(t for t in texts if t))
+    candidates = sorted(
+        (m for m in _AUTOMATON.matches(text) if _bounded(text, m[0], m[1])),
+        key=lambda m: (m[0], -(m[1] - m[0]))
+    )
+
+    found = []
+    taken_until = 0
+    for start, end, name, kind, alias in candidates:
+        if start < taken_until:
+            continue
+        found.append(LocationMatch(name, kind, alias, start, end))
+        taken_until = end
+    return found
+
+
+def detect_district(*texts: str) -> Optional[str]:
+    """The district `texts` are about: the one named most often, earliest on a tie.
+
+    Falls back to a region (e.g. 'मराठवाड़ा') if no district or place in
+    one is named.
+    """
+    counts: Dict[str, int] = {}
+    first_seen: Dict[str, int] = {}
+    region = None
+
+    for match in find_locations(*texts):
+        if match.kind == 'region':
+            region = region or match.name
+            continue
+        counts[match.name] = counts.get(match.name, 0) + 1
+        first_seen.setdefault(match.name, match.start)
+
+    if not counts:
+        return region
+    return min(counts, key=lambda name: (-counts[name], first_seen[name]))
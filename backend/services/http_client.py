@@ -0,0 +1,219 @@
+import os
+import json
+import random
+import asyncio
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """An upstream request that failed for good (after any retries)"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class UpstreamResponse:
+    """Body of a successful upstream GET, possibly replayed after a 304"""
+
+    __slots__ = ('status_code', 'content', 'headers', 'not_modified')
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict, not_modified: bool = False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.not_modified = not_modified
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class UpstreamClient:
+    """Shared HTTP client for everything the backend fetches from upstream.
+
+    One pooled `httpx.AsyncClient` keeps connections (and TLS sessions)
+    alive across queries and runs, and asks for gzip. Requests are limited
+    per host, retried with jittered exponential backoff on 429/5xx and
+    transport errors (honouring Retry-After), and made conditional with the
+    last ETag / Last-Modified seen for the same URL; a 304 replays the
+    remembered body. `stream()` hands bodies over incrementally instead and
+    remembers nothing.
+    """
+
+    def __init__(
+        self,
+        per_host_limit: Optional[int] = None,
+        max_connections: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        validator_cache_size: int = 256,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.per_host_limit = per_host_limit or int(os.environ.get('HTTP_PER_HOST_CONCURRENCY', 6))
+        self.max_attempts = max_attempts or int(os.environ.get('HTTP_MAX_ATTEMPTS', 4))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.validator_cache_size = validator_cache_size
+
+        max_connections = max_connections or int(os.environ.get('HTTP_MAX_CONNECTIONS', 20))
+        self._client = httpx.AsyncClient(
+            timeout=timeout or float(os.environ.get('HTTP_TIMEOUT_SECONDS', 20)),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=120
+            ),
+            headers={'Accept-Encoding': 'gzip, deflate', 'User-Agent': 'mahadeshnews/1.0'},
+            follow_redirects=True,
+            transport=transport
+        )
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        # URL -> (etag, last_modified, body)
+        self._validators: OrderedDict = OrderedDict()
+
+        self.stats = {'requests': 0, 'retries': 0, 'notModified': 0, 'bytes': 0}
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        conditional: bool = True
+    ) -> UpstreamResponse:
+        """GET `url`, retrying transient failures; raises UpstreamError otherwise"""
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+        request_headers = dict(headers or {})
+
+        cached = self._validators.get(url) if conditional else None
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+        async with self._host_limit(url):
+            response = await self._send(url, request_headers)
+
+        if response.status_code == 304 and cached:
+            self.stats['notModified'] += 1
+            self._validators.move_to_end(url)
+            return UpstreamResponse(200, cached[2], dict(response.headers), not_modified=True)
+
+        if response.status_code >= 400:
+            raise UpstreamError(
+                f"GET {urlsplit(url).path} returned {response.status_code}: {response.text[:200]}",
+                response.status_code
+            )
+
+        if conditional and (response.headers.get('etag') or response.headers.get('last-modified')):
+            self._remember(url, response)
+        return UpstreamResponse(response.status_code, response.content, dict(response.headers))
+
+    async def get_json(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None):
+        return (await self.get(url, params=params, headers=headers)).json()
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: Optional[Dict] = None) -> AsyncIterator[httpx.Response]:
+        """GET `url` and yield the open response, to be read with `aiter_bytes()`.
+
+        Retries like get() until the body starts. Nothing is buffered or
+        remembered, so conditional headers are the caller's to send, and a
+        304 is yielded as is. Raises UpstreamError on other 4xx/5xx.
+        """
+        async with self._host_limit(url):
+            response = await self._send(url, dict(headers or {}), stream=True)
+            try:
+                if response.status_code == 304:
+                    self.stats['notModified'] += 1
+                elif response.status_code >= 400:
+                    await response.aread()
+                    raise UpstreamError(
+                        f"GET {urlsplit(url).path} returned {response.status_code}: {response.text[:200]}",
+                        response.status_code
+                    )
+                yield response
+            finally:
+                await response.aclose()
+                self.stats['bytes'] += response.num_bytes_downloaded
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return limit
+
+    async def _send(self, url: str, headers: Dict, stream: bool = False) -> httpx.Response:
+        for attempt in range(1, self.max_attempts + 1):
+            retry_after = None
+            try:
+                self.stats['requests'] += 1
+                request = self._client.build_request('GET', url, headers=headers)
+                response = await self._client.send(request, stream=stream)
+                if not stream:
+                    self.stats['bytes'] += int(response.headers.get('content-length') or len(response.content))
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt == self.max_attempts:
+                    return response
+                retry_after = self._retry_after(response.headers.get('retry-after'))
+                reason = f"status {response.status_code}"
+                if stream:
+                    await response.aclose()
+            except httpx.TransportError as e:
+                if attempt == self.max_attempts:
+                    raise UpstreamError(f"GET {urlsplit(url).path} failed: {e!r}")
+                reason = repr(e)
+
+            # Full jitter, but never sooner than the server asked
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, min(retry_after, self.backoff_max))
+            self.stats['retries'] += 1
+            logger.warning(
+                f"Upstream GET {urlsplit(url).netloc}{urlsplit(url).path} failed ({reason}), "
+                f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        """Retry-After as seconds; it may be a number or an HTTP date"""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+    def _remember(self, url: str, response: httpx.Response):
+        self._validators[url] = (
+            response.headers.get('etag'),
+            response.headers.get('last-modified'),
+            response.content
+        )
+        self._validators.move_to_end(url)
+        while len(self._validators) > self.validator_cache_size:
+            self._validators.popitem(last=False)
+
+    async def aclose(self):
+        await self._client.aclose()
@@ -0,0 +1,58 @@
+import logging
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleIdAllocator:
+    """Allocates article IDs from a counters document with an atomic `$inc`.
+
+    Every process (the API's scheduler and the cron job alike) draws from the
+    same `counters` document, so IDs never collide on the unique `articleId`
+    index. `reserve` hands out a contiguous block for a whole batch in one
+    round-trip.
+    """
+
+    def __init__(self, db, counter_name: str = 'articleId'):
+        self.db = db
+        self.counter_name = counter_name
+        self._seeded = False
+
+    async def _ensure_seeded(self):
+        """Start the counter above the highest articleId already stored"""
+        if self._seeded:
+            return
+
+        last_article = await self.db.articles.find_one(
+            {},
+            {'_id': 0, 'articleId': 1},
+            sort=[('articleId', -1)]
+        )
+        last_id = last_article['articleId'] if last_article else 0
+
+        # $max never moves the counter backwards, so concurrent seeding is safe
+        await self.db.counters.update_one(
+            {'_id': self.counter_name},
+            {'$max': {'seq': last_id}},
+            upsert=True
+        )
+        self._seeded = True
+
+    async def reserve(self, count: int) -> range:
+        """Reserve `count` consecutive IDs"""
+        if count <= 0:
+            return range(0)
+
+        await self._ensure_seeded()
+        counter = await self.db.counters.find_one_and_update(
+            {'_id': self.counter_name},
+            {'$inc': {'seq': count}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        end = counter['seq']
+        return range(end - count + 1, end + 1)
+
+    async def next_id(self) -> int:
+        """Reserve a single ID"""
+        return (await self.reserve(1))[0]
@@ -0,0 +1,273 @@
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List
+from pymongo.errors import OperationFailure, PyMongoError
+from backend.services.rewrite_cache import CACHE_TTL_SECONDS
+from backend.services.near_dupes import WINDOW_HOURS as NEAR_DUP_WINDOW_HOURS
+from backend.services.work_queue import ITEM_TTL_SECONDS as WORK_ITEM_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Set VERIFY_QUERY_PLANS=false to skip the explain() pass at startup
+VERIFY_QUERY_PLANS = os.environ.get('VERIFY_QUERY_PLANS', 'true').lower() not in ('0', 'false', 'no')
+
+# Every index the app relies on, with the queries it serves
+INDEXES = [
+    {
+        'collection': 'articles',
+        'keys': [('articleId', 1)],
+        'options': {'unique': True},
+        'serves': 'GET /news/{id}, /news/trending, /news/search, view counter flushes, search index load, stream backfill, ID allocation seed'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('date', -1), ('articleId', -1)],
+        'serves': 'GET /news/all (page and cursor), /news/breaking fallback, trending seed'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('category', 1), ('date', -1), ('articleId', -1)],
+        'serves': 'GET /news/category/{category}, /news/all?category=, category totals'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('isBreaking', 1), ('date', -1)],
+        'serves': 'GET /news/breaking ($or isBreaking branch)'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('date', -1), ('priority', 1)],
+        'serves': 'GET /news/breaking ($or priority branch, sort before range)'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('createdAt', 1)],
+        'serves': 'trending and search catch-up of articles stored by other processes'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('sourceUrlKey', 1)],
+        'options': {'unique': True, 'partialFilterExpression': {'sourceUrlKey': {'$type': 'string'}}},
+        'serves': 'pre-rewrite dedupe, writer upserts'
+    },
+    {
+        'collection': 'articles',
+        'keys': [('sourceUrl', 1)],
+        'serves': 'pre-rewrite dedupe of articles stored before sourceUrlKey'
+    },
+    {
+        'collection': 'fetch_jobs',
+        'keys': [('jobId', 1)],
+        'options': {'unique': True},
+        'serves': 'job status updates'
+    },
+    {
+        'collection': 'fetch_jobs',
+        'keys': [('status', 1), ('heartbeatAt', 1)],
+        'serves': 'interrupted job recovery'
+    },
+    {
+        'collection': 'work_items',
+        'keys': [('state', 1), ('priority', -1), ('createdAt', 1)],
+        'serves': 'work item claims (pending, and expired leases), sweep'
+    },
+    {
+        'collection': 'work_items',
+        'keys': [('finishedAt', 1)],
+        'options': {'expireAfterSeconds': WORK_ITEM_TTL_SECONDS},
+        'serves': 'finished work item expiry'
+    },
+    {
+        'collection': 'rewrite_cache',
+        'keys': [('createdAt', 1)],
+        'options': {'expireAfterSeconds': CACHE_TTL_SECONDS},
+        'serves': 'rewrite cache expiry'
+    },
+    {
+        'collection': 'story_signatures',
+        'keys': [('createdAt', 1)],
+        'options': {'expireAfterSeconds': int(NEAR_DUP_WINDOW_HOURS * 3600)},
+        'serves': 'near-duplicate window load, signature expiry'
+    }
+]
+
+_SAMPLE_DATE = datetime(2024, 1, 1)
+
+# Representative shapes of the hot queries, checked with explain() at startup
+QUERY_PLANS = [
+    {
+        'name': 'news/all first page',
+        'collection': 'articles',
+        'filter': {},
+        'sort': [('date', -1), ('articleId', -1)],
+        'limit': 21
+    },
+    {
+        'name': 'news/all cursor page',
+        'collection': 'articles',
+        'filter': {'$or': [
+            {'date': {'$lt': _SAMPLE_DATE}},
+            {'date': _SAMPLE_DATE, 'articleId': {'$lt': 1}}
+        ]},
+        'sort': [('date', -1), ('articleId', -1)],
+        'limit': 21
+    },
+    {
+        'name': 'news/category page',
+        'collection': 'articles',
+        'filter': {'category': 'अपराध'},
+        'sort': [('date', -1), ('articleId', -1)],
+        'limit': 21
+    },
+    {
+        'name': 'news/category cursor page',
+        'collection': 'articles',
+        'filter': {'category': 'अपराध', '$or': [
+            {'date': {'$lt': _SAMPLE_DATE}},
+            {'date': _SAMPLE_DATE, 'articleId': {'$lt': 1}}
+        ]},
+        'sort': [('date', -1), ('articleId', -1)],
+        'limit': 21
+    },
+    {
+        'name': 'news/breaking',
+        'collection': 'articles',
+        'filter': {'$or': [{'isBreaking': True}, {'priority': {'$gte': 9}}]},
+        'sort': [('date', -1)],
+        'limit': 10
+    },
+    {
+        'name': 'news/breaking fallback',
+        'collection': 'articles',
+        'filter': {},
+        'sort': [('date', -1)],
+        'limit': 10
+    },
+    {
+        'name': 'news/{id}',
+        'collection': 'articles',
+        'filter': {'articleId': 1}
+    },
+    {
+        'name': 'news/trending',
+        'collection': 'articles',
+        'filter': {'articleId': {'$in': [1, 2, 3]}}
+    },
+    {
+        'name': 'search index load',
+        'collection': 'articles',
+        'filter': {'articleId': {'$gt': 1}},
+        'sort': [('articleId', 1)]
+    },
+    {
+        'name': 'trending and search catch-up',
+        'collection': 'articles',
+        'filter': {'createdAt': {'$gte': _SAMPLE_DATE}}
+    },
+    {
+        'name': 'news/stream backfill',
+        'collection': 'articles',
+        'filter': {'articleId': {'$gt': 1}},
+        'sort': [('articleId', -1)],
+        'limit': 100
+    },
+    {
+        'name': 'dedupe sourceUrlKey lookup',
+        'collection': 'articles',
+        'filter': {'$or': [
+            {'sourceUrlKey': {'$in': ['https://example.com/a', 'https://example.com/b']}},
+            {'sourceUrl': {'$in': ['https://example.com/a', 'http://www.example.com/b?utm_source=x']}}
+        ]}
+    },
+    {
+        'name': 'fetch_jobs by jobId',
+        'collection': 'fetch_jobs',
+        'filter': {'jobId': 'sample'}
+    },
+    {
+        'name': 'interrupted fetch_jobs',
+        'collection': 'fetch_jobs',
+        'filter': {'status': 'running', 'heartbeatAt': {'$lt': _SAMPLE_DATE}}
+    },
+    {
+        'name': 'work item claim',
+        'collection': 'work_items',
+        'filter': {'state': 'pending', 'attempts': {'$lt': 3}},
+        'sort': [('priority', -1), ('createdAt', 1)],
+        'limit': 1
+    }
+]
+
+
+async def ensure_indexes(db, indexes: List[Dict] = INDEXES):
+    """Create every registered index; existing ones are left as they are"""
+    for spec in indexes:
+        try:
+            await db[spec['collection']].create_index(spec['keys'], **spec.get('options', {}))
+        except OperationFailure as e:
+            # Usually an existing index with the same keys but different options
+            logger.warning(f"Could not create index {spec['keys']} on {spec['collection']}: {str(e)}")
+
+
+def plan_stages(explain: Dict) -> List[str]:
+    """Stage names in the winning plan of an explain() result"""
+    planner = explain.get('queryPlanner', explain)
+    stages = []
+    pending = [planner.get('winningPlan', {})]
+
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if 'stage' in node:
+            stages.append(node['stage'])
+        # Classic plans nest inputStage(s); SBE plans wrap them in queryPlan; sharded in shards
+        for key in ('inputStage', 'queryPlan', 'winningPlan'):
+            if key in node:
+                pending.append(node[key])
+        for key in ('inputStages', 'shards'):
+            pending.extend(node.get(key, []))
+
+    return stages
+
+
+async def verify_query_plans(db, plans: List[Dict] = QUERY_PLANS) -> List[Dict]:
+    """Explain each registered query and warn about collection scans and in-memory sorts.
+
+    Returns the plans that need attention, each with the offending stages.
+    Plans that could not be explained (mongomock has no explain()) are
+    returned too, with `skipped` set, since they were not verified.
+    """
+    problems = []
+    skipped = []
+    checked = 0
+
+    for plan in plans:
+        cursor = db[plan['collection']].find(plan['filter'])
+        if plan.get('sort'):
+            cursor = cursor.sort(plan['sort'])
+        if plan.get('limit'):
+            cursor = cursor.limit(plan['limit'])
+
+        try:
+            explain = await cursor.explain()
+        except (PyMongoError, NotImplementedError, AttributeError) as e:
+            skipped.append({'name': plan['name'], 'stages': [], 'problems': [], 'skipped': str(e) or type(e).__name__})
+            continue
+
+        checked += 1
+        stages = plan_stages(explain)
+        bad = sorted({stage for stage in stages if stage in ('COLLSCAN', 'SORT')})
+        if bad:
+            logger.warning(f"Query plan for {plan['name']} uses {', '.join(bad)}: {' <- '.join(stages)}")
+            problems.append({'name': plan['name'], 'stages': stages, 'problems': bad})
+
+    if skipped:
+        logger.warning(
+            f"Could not verify {len(skipped)} of {len(plans)} query plans "
+            f"({', '.join(plan['name'] for plan in skipped)}): {skipped[0]['skipped']}"
+        )
+    if checked and not problems:
+        logger.info(f"Verified {checked} query plans: all index-backed")
+    return problems + skipped
@@ -0,0 +1,174 @@
+import os
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class LockLostError(Exception):
+    """Raised when work guarded by a LeaderLock finds the lock held by someone else"""
+
+
+class LeaderLock:
+    """Lease-based leader lock stored in the `locks` collection.
+
+    The holder's lease lasts `ttl_seconds` and must be renewed (every
+    `heartbeat_seconds`, a third of the TTL by default); if the holder dies
+    the lease runs out and the next `acquire()` by another replica takes
+    over. Every takeover increments the lock's fencing `token`, so work
+    started under an old token can be told apart: `verify()` checks the
+    token is still current before a guarded write.
+
+    Expiry is compared against each replica's own clock, so the TTL should
+    be well above any expected clock skew.
+    """
+
+    def __init__(
+        self,
+        db,
+        name: str,
+        owner: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None
+    ):
+        self.db = db
+        self.name = name
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl = timedelta(seconds=ttl_seconds or float(os.environ.get('LEADER_LOCK_TTL_SECONDS', 60)))
+        self.heartbeat_seconds = heartbeat_seconds or self.ttl.total_seconds() / 3
+        self.token: Optional[int] = None
+
+    @property
+    def is_held(self) -> bool:
+        return self.token is not None
+
+    async def acquire(self) -> bool:
+        """Take the lock if it is free or expired, or renew it if already held"""
+        if self.token is not None:
+            if await self.renew():
+                return True
+
+        now = datetime.utcnow()
+        try:
+            lock = await self.db.locks.find_one_and_update(
+                {'_id': self.name, 'expiresAt': {'$lt': now}},
+                {
+                    '$set': {'owner': self.owner, 'acquiredAt': now, 'expiresAt': now + self.ttl},
+                    '$inc': {'token': 1}
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # The lock exists and its lease is still running
+            return False
+        except PyMongoError as e:
+            logger.error(f"Error acquiring lock {self.name}: {str(e)}")
+            return False
+
+        self.token = lock['token']
+        logger.info(f"Acquired lock {self.name} as {self.owner} (token {self.token})")
+        return True
+
+    async def renew(self) -> bool:
+        """Extend the lease; False (and the lock forgotten) if it was lost"""
+        if self.token is None:
+            return False
+
+        try:
+            result = await self.db.locks.update_one(
+                {'_id': self.name, 'owner': self.owner, 'token': self.token},
+                {'$set': {'expiresAt': datetime.utcnow() + self.ttl}}
+            )
+        except PyMongoError as e:
+            # Keep the token: the lease may still be valid, and verify() guards the writes
+            logger.error(f"Error renewing lock {self.name}: {str(e)}")
+            return True
+
+        if result.matched_count == 0:
+            logger.warning(f"Lost lock {self.name} (token {self.token})")
+            self.token = None
+            return False
+        return True
+
+    async def keep_alive(self):
+        """Renew the lease every heartbeat until it is lost (run as a task)"""
+        while self.token is not None:
+            await asyncio.sleep(self.heartbeat_seconds)
+            await self.renew()
+
+    async def verify(self) -> bool:
+        """Whether this holder's token is still the current, unexpired one"""
+        if self.token is None:
+            return False
+        lock = await self.db.locks.find_one({'_id': self.name})
+        return bool(
+            lock
+            and lock.get('owner') == self.owner
+            and lock.get('token') == self.token
+            and lock.get('expiresAt') > datetime.utcnow()
+        )
+
+    async def ensure(self):
+        """Raise LockLostError unless the lock is still held"""
+        if not await self.verify():
+            self.token = None
+            raise LockLostError(f"Lock {self.name} is no longer held by {self.owner}")
+
+    async def release(self):
+        """Give the lock up so another replica can take over immediately"""
+        if self.token is None:
+            return
+        try:
+            await self.db.locks.update_one(
+                {'_id': self.name, 'owner': self.owner, 'token': self.token},
+                {'$set': {'expiresAt': datetime.utcnow()}}
+            )
+        except PyMongoError as e:
+            logger.error(f"Error releasing lock {self.name}: {str(e)}")
+        self.token = None
+
+    async def claim_run(
+        self,
+        interval: timedelta,
+        slack: float = 0.1,
+        run_id: Optional[str] = None,
+        ended_early: Optional[Callable[[Dict], Awaitable[bool]]] = None
+    ) -> bool:
+        """Claim the next run of a job that should happen once per `interval`.
+
+        Succeeds if no replica has started a run in the last `interval`
+        (less `slack` of it, so timer drift cannot skip a run), or if
+        `ended_early`, given the last claim (with its `runId`), reports that
+        its run stopped without finishing, so a leader that died mid-run
+        does not cost a whole interval.
+        """
+        now = datetime.utcnow()
+        key = f"{self.name}:lastRun"
+        claim = {'$set': {'startedAt': now, 'owner': self.owner, 'token': self.token, 'runId': run_id}}
+        try:
+            await self.db.locks.find_one_and_update(
+                {'_id': key, 'startedAt': {'$lte': now - interval * (1 - slack)}},
+                claim,
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            if ended_early is None:
+                return False
+
+        last = await self.db.locks.find_one({'_id': key})
+        if not last or not await ended_early(last):
+            return False
+        # Only the replica that swaps out the claim it inspected gets the rerun
+        result = await self.db.locks.update_one({'_id': key, 'startedAt': last['startedAt']}, claim)
+        if result.modified_count == 0:
+            return False
+        logger.warning(f"Claimed a rerun of {self.name}: run {last.get('runId')} did not finish")
+        return True
@@ -0,0 +1,252 @@
+import os
+import random
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+from backend.services.search_index import tokenize
+from backend.services.dedupe import source_key
+
+logger = logging.getLogger(__name__)
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+# How long a published story suppresses near-duplicates of itself
+WINDOW_HOURS = float(os.environ.get('NEAR_DUP_WINDOW_HOURS', 48))
+
+
+# Function words that differ between outlets' phrasings of the same story
+ENGLISH_STOPWORDS = {
+    'as', 'after', 'be', 'been', 'has', 'have', 'had', 'it', 'its', 'this', 'that', 'were', 'when',
+    'said', 'says', 'according', 'over', 'into', 'amid', 'new'
+}
+
+
+def _stem(token: str) -> str:
+    """Light English stemming ('killed', 'overturns' -> 'kill', 'overturn'); Hindi is stemmed by tokenize"""
+    if not token.isascii() or len(token) <= 4:
+        return token
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def story_features(source_article: Dict) -> set:
+    """Normalized, stemmed words of a source article's title and description"""
+    text = f"{source_article.get('sourceTitle') or ''} {source_article.get('sourceDescription') or ''}"
+    return {_stem(token) for token in tokenize(text) if token not in ENGLISH_STOPWORDS}
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of recent stories for near-duplicate clustering.
+
+    Each story is reduced to a MinHash signature of the words of its title
+    and description. The signature is split into `bands` bands; stories
+    sharing any band bucket are candidates and count as the same story when
+    their estimated Jaccard similarity reaches `threshold`. With 32 bands of
+    2 rows, a pair at the default 0.5 threshold becomes a candidate with
+    probability ~0.9999, so the band step loses almost nothing and the
+    threshold alone decides.
+
+    `cluster()` groups a fetch batch: the best member of each cluster (highest
+    priority, then most text) is the only one sent to the rewriter, and the
+    number of outlets covering it raises its priority. Stories matching one
+    published in the last `window_hours` are dropped. Signatures of stored
+    stories are kept in `story_signatures` (TTL-expired) so the cron job and
+    restarts see the same window.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        threshold: Optional[float] = None,
+        window_hours: Optional[float] = None,
+        num_perm: int = 64,
+        bands: int = 32,
+        max_boost: Optional[int] = None,
+        seed: int = 1
+    ):
+        self.db = db
+        self.threshold = threshold or float(os.environ.get('NEAR_DUP_THRESHOLD', 0.5))
+        self.window = timedelta(hours=window_hours or WINDOW_HOURS)
+        self.max_boost = max_boost if max_boost is not None else int(os.environ.get('NEAR_DUP_MAX_BOOST', 3))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets: Dict[Tuple, List[str]] = {}
+        self._stories: Dict[str, Tuple[Tuple[int, ...], datetime]] = {}  # sourceUrlKey -> (signature, seen at)
+        self._pending: Dict[str, Tuple[int, ...]] = {}  # sourceUrlKey -> signature, until stored
+
+    def signature(self, features: set) -> Tuple[int, ...]:
+        if not features:
+            return ()
+        hashes = [
+            int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+            for feature in features
+        ]
+        return tuple(
+            min((a * h + b) % MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        )
+
+    def similarity(self, first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        if not first or not second:
+            return 0.0
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def _band_keys(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (band, signature[start:start + self.rows])
+
+    def _best_match(self, signature: Tuple[int, ...], candidates_of) -> Tuple[Optional[str], float]:
+        best, best_score = None, 0.0
+        seen = set()
+        for key in self._band_keys(signature):
+            for candidate in candidates_of(key):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                score = self.similarity(signature, self._signature_of(candidate))
+                if score > best_score:
+                    best, best_score = candidate, score
+        return (best, best_score) if best_score >= self.threshold else (None, best_score)
+
+    def _signature_of(self, key: str) -> Tuple[int, ...]:
+        story = self._stories.get(key)
+        return story[0] if story else self._pending.get(key, ())
+
+    def _insert(self, url: str, signature: Tuple[int, ...], seen_at: datetime):
+        self._stories[url] = (signature, seen_at)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(url)
+
+    def _expire(self, now: datetime):
+        cutoff = now - self.window
+        expired = {url for url, (_, seen_at) in self._stories.items() if seen_at < cutoff}
+        if not expired:
+            return
+        for url in expired:
+            del self._stories[url]
+        for key in list(self._buckets):
+            urls = [url for url in self._buckets[key] if url not in expired]
+            if urls:
+                self._buckets[key] = urls
+            else:
+                del self._buckets[key]
+
+    def cluster(self, articles: List[Dict]) -> Dict:
+        """Reduce a batch to one representative per story.
+
+        Returns the representatives (with `clusterSize` and a boosted
+        `priority`) plus counts for the job record.
+        """
+        now = datetime.utcnow()
+        self._expire(now)
+
+        # Best copy first, so it becomes its cluster's representative
+        ordered = sorted(
+            articles,
+            key=lambda a: (
+                a.get('priority', 5),
+                len(a.get('sourceDescription') or '') + len(a.get('sourceContent') or '')
+            ),
+            reverse=True
+        )
+
+        clusters: Dict[str, Dict] = {}
+        batch_buckets: Dict[Tuple, List[str]] = {}
+        recent = 0
+
+        for article in ordered:
+            signature = self.signature(story_features(article))
+            if not signature:
+                clusters[source_key(article)] = {'article': article, 'size': 1}
+                continue
+
+            match, _ = self._best_match(signature, lambda key: self._buckets.get(key, ()))
+            if match:
+                recent += 1
+                continue
+
+            match, _ = self._best_match(signature, lambda key: batch_buckets.get(key, ()))
+            if match:
+                clusters[match]['size'] += 1
+                continue
+
+            url = source_key(article)
+            clusters[url] = {'article': article, 'size': 1}
+            self._pending[url] = signature
+            for key in self._band_keys(signature):
+                batch_buckets.setdefault(key, []).append(url)
+
+        representatives = []
+        for cluster in clusters.values():
+            boost = min(cluster['size'] - 1, self.max_boost)
+            article = cluster['article']
+            representatives.append({
+                **article,
+                'clusterSize': cluster['size'],
+                'priority': min(10, article.get('priority', 5) + boost)
+            })
+
+        stats = {
+            'clusters': len(representatives),
+            'merged': len(articles) - len(representatives) - recent,
+            'recentDuplicates': recent,
+            'multiSource': sum(1 for c in clusters.values() if c['size'] > 1)
+        }
+        logger.info(
+            f"Near-duplicates: {len(articles)} articles -> {stats['clusters']} stories "
+            f"({stats['merged']} merged, {recent} already published)"
+        )
+        return {'articles': representatives, 'stats': stats}
+
+    async def load(self):
+        """Index the signatures of stories stored within the window"""
+        if self.db is None:
+            return
+        since = datetime.utcnow() - self.window
+        try:
+            cursor = self.db.story_signatures.find({'createdAt': {'$gte': since}})
+            async for doc in cursor:
+                if doc['_id'] not in self._stories:
+                    self._insert(doc['_id'], tuple(doc['signature']), doc['createdAt'])
+        except PyMongoError as e:
+            logger.error(f"Error loading story signatures: {str(e)}")
+
+    async def on_articles_committed(self, article_docs: List[Dict]):
+        """Move stored representatives from pending into the index and persist them"""
+        now = datetime.utcnow()
+        operations = []
+        for doc in article_docs:
+            url = source_key(doc)
+            signature = self._pending.pop(url, None)
+            if not signature:
+                continue
+            self._insert(url, signature, now)
+            operations.append(UpdateOne(
+                {'_id': url},
+                {'$set': {'signature': list(signature), 'createdAt': now}},
+                upsert=True
+            ))
+
+        if operations and self.db is not None:
+            try:
+                await self.db.story_signatures.bulk_write(operations, ordered=False)
+            except PyMongoError as e:
+                logger.error(f"Error saving {len(operations)} story signatures: {str(e)}")
+
+    def discard_pending(self):
+        """Forget signatures of representatives that were never stored"""
+        self._pending = {}
@@ -1,22 +1,56 @@
 import os
+import time
+import asyncio
 import logging
 from typing import List, Dict, Optional
-from newsapi import NewsApiClient
 from datetime import datetime, timedelta
 import random
+from backend.services.http_client import UpstreamClient, UpstreamError
+from backend.services.watermarks import WatermarkStore, parse_published_at
+from backend.services.sources import SourceAdapter, load_feed_sources
+from backend.services.gazetteer import detect_district
+from backend.services.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+NEWSAPI_REQUEST_SECONDS = metrics.histogram(
+    'newsapi_request_duration_seconds', 'NewsAPI /everything latency by category query', ('query', 'outcome')
+)
+
 
 class NewsFetcher:
     """Service to fetch news from NewsAPI"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        watermarks: Optional[WatermarkStore] = None,
+        http_client: Optional[UpstreamClient] = None,
+        sources: Optional[List[SourceAdapter]] = None
+    ):
         self.api_key = os.environ.get('NEWS_API_KEY')
         if not self.api_key:
             raise ValueError("NEWS_API_KEY not found in environment")
         
-        self.newsapi = NewsApiClient(api_key=self.api_key)
+        # NEWS_API_BASE_URL can point at a local fake NewsAPI for testing
+        self.base_url = os.environ.get('NEWS_API_BASE_URL', 'https://newsapi.org/v2').rstrip('/')
+        
+        # Queries share one pooled client, capped at FETCH_CONCURRENCY in flight
+        self.max_concurrency = int(os.environ.get('FETCH_CONCURRENCY', 8))
+        self.request_timeout = float(os.environ.get('FETCH_TIMEOUT_SECONDS', 20))
+        # Pages a query may follow when more new articles matched than one page held
+        self.max_pages = int(os.environ.get('FETCH_MAX_PAGES', 3))
+        self.http = http_client or UpstreamClient(
+            per_host_limit=self.max_concurrency,
+            timeout=self.request_timeout
+        )
+        
+        # With a watermark store, each query only asks for articles newer than
+        # the last run saw; without one it fetches its full lookback window
+        self.watermarks = watermarks
+        self.last_run_stats = {}
+        
+        # Extra sources (RSS/Atom feeds from RSS_FEEDS) fetched alongside NewsAPI
+        self.sources = sources if sources is not None else load_feed_sources(self.http, watermarks)
         
         # Category mappings with priorities
         self.category_config = {
@@ -64,17 +98,9 @@ class NewsFetcher:
             keywords = config.get('keywords', category)
             
             # Fetch from NewsAPI
-            from_date = (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d')
-            
-            response = self.newsapi.get_everything(
-                q=keywords,
-                from_param=from_date,
-                language='en',
-                sort_by='publishedAt',
-                page_size=limit
+            articles = await self._fetch_query(
+                f"category:{category}", keywords, lookback=timedelta(days=2), limit=limit
             )
-            
-            articles = response.get('articles', [])
             logger.info(f"Fetched {len(articles)} articles for category: {category}")
             
             return self._format_articles(articles, category, config.get('priority', 5))
@@ -88,19 +114,18 @@ class NewsFetcher:
         try:
             districts = ['jalna', 'aurangabad', 'marathwada', 'जालना', 'औरंगाबाद', 'मराठवाड़ा']
             
+            # Focus on main districts, queried concurrently
+            responses = await asyncio.gather(*[
+                self._fetch_query(f"district:{district}", district, lookback=timedelta(days=1), limit=10)
+                for district in districts[:3]
+            ], return_exceptions=True)
+            
             articles = []
-            for district in districts[:3]:  # Focus on main districts
-                from_date = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-                
-                response = self.newsapi.get_everything(
-                    q=district,
-                    from_param=from_date,
-                    language='en',
-                    sort_by='publishedAt',
-                    page_size=10
-                )
-                
-                articles.extend(response.get('articles', []))
+            for district, response in zip(districts[:3], responses):
+                if isinstance(response, BaseException):
+                    logger.error(f"Error fetching Maharashtra news for {district}: {response!r}")
+                    continue
+                articles.extend(response)
             
             logger.info(f"Fetched {len(articles)} Maharashtra-specific articles")
         
@@ -111,22 +136,142 @@ class NewsFetcher:
             return []
     
     async def fetch_all_news(self) -> Dict[str, List[Dict]]:
-        """Fetch news for all categories"""
-        all_news = {}
+        """Fetch news for all categories concurrently"""
+        started = time.monotonic()
+        self.last_run_stats = {'requests': 0, 'articles': 0, 'queries': {}, 'feeds': {}}
         
-        # Fetch Maharashtra news first (3X priority)
-        maharashtra_news = await self.fetch_maharashtra_news()
-        all_news['स्थानीय'] = maharashtra_news
+        # Maharashtra news (3X priority), every other category and every feed, in parallel
+        categories = [c for c in self.category_config if c != 'स्थानीय']
+        results = await asyncio.gather(
+            self.fetch_maharashtra_news(),
+            *[
+                self.fetch_news_by_category(category, self.category_config[category].get('limit', 10))
+                for category in categories
+            ],
+            *[self.fetch_source(source) for source in self.sources]
+        )
         
-        # Fetch other categories
-        for category, config in self.category_config.items():
-            if category != 'स्थानीय':
-                articles = await self.fetch_news_by_category(category, config.get('limit', 10))
-                all_news[category] = articles
+        all_news = {'स्थानीय': results[0]}
+        all_news.update(zip(categories, results[1:len(categories) + 1]))
+        for source, articles in zip(self.sources, results[len(categories) + 1:]):
+            all_news.setdefault(source.category, []).extend(articles)
         
-        logger.info(f"Total categories fetched: {len(all_news)}")
+        self.last_run_stats['articles'] = sum(len(articles) for articles in all_news.values())
+        logger.info(
+            f"Total categories fetched: {len(all_news)} in {time.monotonic() - started:.2f}s "
+            f"using {self.last_run_stats['requests']} NewsAPI requests"
+        )
         return all_news
     
+    async def fetch_source(self, source: SourceAdapter) -> List[Dict]:
+        """Fetch one extra source, recording its outcome in the run stats"""
+        try:
+            articles = await source.fetch()
+            self.last_run_stats.setdefault('feeds', {})[source.name] = getattr(source, 'last_stats', {})
+            return articles
+        except Exception as e:
+            logger.error(f"Error fetching source {source.name}: {str(e)}")
+            self.last_run_stats.setdefault('feeds', {})[source.name] = {'error': str(e)[:200]}
+            return []
+    
+    async def _fetch_query(self, key: str, q: str, lookback: timedelta, limit: int) -> List[Dict]:
+        """Run one /everything query from its watermark, recording what it returned"""
+        now = datetime.utcnow()
+        if self.watermarks:
+            since = self.watermarks.since(key, lookback, now)
+            page_size = self.watermarks.page_size(key, limit, now)
+        else:
+            since, page_size = now - lookback, limit
+        
+        stats = self.last_run_stats.setdefault('queries', {})
+        started = time.perf_counter()
+        response = await self._get_page(key, q, since, page_size, page=1)
+        articles = response.get('articles', [])
+        total_results = response.get('totalResults', len(articles))
+        
+        # Results are newest first, so a short page leaves a gap behind the
+        # watermark: follow further pages until the window is covered
+        page, last_page = 1, articles
+        while len(articles) < total_results and len(last_page) >= page_size and page < self.max_pages:
+            page += 1
+            try:
+                last_page = (await self._get_page(key, q, since, page_size, page)).get('articles', [])
+            except UpstreamError as e:
+                # e.g. NewsAPI's maximumResultsReached on the developer plan
+                logger.warning(f"Stopped paging {key} at page {page}: {str(e)}")
+                break
+            articles.extend(last_page)
+        truncated = len(articles) < total_results
+        
+        stats[key] = {
+            'from': since.replace(microsecond=0).isoformat(),
+            'pageSize': page_size,
+            'pages': page,
+            'returned': len(articles),
+            'totalResults': total_results,
+            'truncated': truncated,
+            'ms': round((time.perf_counter() - started) * 1000)
+        }
+        if truncated:
+            logger.warning(
+                f"{key}: fetched {len(articles)} of {total_results} new articles in {page} pages; "
+                f"keeping its watermark so the next run covers the rest"
+            )
+        if self.watermarks:
+            newest = max(filter(None, (parse_published_at(a.get('publishedAt')) for a in articles)), default=None)
+            self.watermarks.observe(key, newest, total_results, now, complete=not truncated)
+        
+        return articles
+    
+    async def _get_page(self, key: str, q: str, since: datetime, page_size: int, page: int) -> Dict:
+        """Request one page of a query, counting and timing it"""
+        self.last_run_stats['requests'] = self.last_run_stats.get('requests', 0) + 1
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = await self._get_everything(
+                q=q,
+                from_param=since.replace(microsecond=0),
+                language='en',
+                sort_by='publishedAt',
+                page_size=page_size,
+                page=page
+            )
+            outcome = 'ok'
+            return response
+        finally:
+            NEWSAPI_REQUEST_SECONDS.observe(time.perf_counter() - started, query=key, outcome=outcome)
+    
+    async def _get_everything(
+        self,
+        q: str,
+        from_param: datetime,
+        language: str,
+        sort_by: str,
+        page_size: int,
+        page: int = 1
+    ) -> Dict:
+        """Run a NewsAPI /everything query"""
+        response = await self.http.get_json(
+            f"{self.base_url}/everything",
+            params={
+                'q': q,
+                'from': from_param.strftime('%Y-%m-%dT%H:%M:%S'),
+                'language': language,
+                'sortBy': sort_by,
+                'pageSize': page_size,
+                'page': page
+            },
+            headers={'X-Api-Key': self.api_key}
+        )
+        if response.get('status') != 'ok':
+            raise UpstreamError(f"NewsAPI error {response.get('code')}: {response.get('message')}")
+        return response
+    
+    async def close(self):
+        """Close pooled upstream connections"""
+        await self.http.aclose()
+    
     def _format_articles(self, articles: List[Dict], category: str, priority: int) -> List[Dict]:
         """Format articles from NewsAPI response"""
         formatted = []
@@ -153,17 +298,4 @@ class NewsFetcher:
     
     def _detect_district(self, title: str, description: str) -> Optional[str]:
         """Detect district from article content"""
-        content = f"{title} {description}".lower()
-        
-        districts = {
-            'जालना': ['jalna', 'जालना'],
-            'औरंगाबाद': ['aurangabad', 'औरंगाबाद', 'sambhajinagar', 'संभाजीनगर'],
-            'मराठवाड़ा': ['marathwada', 'मराठवाड़ा'],
-            'परभणी': ['parbhani', 'परभणी']
-        }
-        
-        for district, keywords in districts.items():
-            if any(keyword in content for keyword in keywords):
-                return district
-        
-        return None
+        return detect_district(title, description)
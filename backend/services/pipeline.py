@@ -0,0 +1,572 @@
+import os
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from pymongo.errors import PyMongoError
+from backend.services.news_fetcher import NewsFetcher
+from backend.services.ai_rewriter import AIRewriter, RateLimitError
+from backend.services.rate_limiter import RateLimiter
+from backend.services.dedupe import ArticleDeduper
+from backend.services.id_allocator import ArticleIdAllocator
+from backend.services.article_writer import ArticleWriter, INSERTED, PRESENT
+from backend.services.rewrite_cache import RewriteCache
+from backend.services.watermarks import WatermarkStore
+from backend.services.near_dupes import NearDuplicateIndex
+from backend.services.work_queue import WorkQueue
+from backend.services.leader_lock import LeaderLock, LockLostError
+from backend.services.metrics import metrics, current_route
+
+logger = logging.getLogger(__name__)
+
+# Leader lock shared by every scheduler replica and the cron runner
+LOCK_NAME = 'news_fetch'
+
+PIPELINE_STAGE_SECONDS = metrics.histogram(
+    'pipeline_stage_duration_seconds', 'Time spent in each stage of a fetch job', ('stage',)
+)
+PIPELINE_RUNS = metrics.counter('pipeline_runs_total', 'Fetch jobs by final status', ('status',))
+ARTICLES_STORED = metrics.counter('pipeline_articles_stored_total', 'Rewritten articles stored')
+
+
+class NewsPipeline:
+    """One fetch -> dedupe -> rewrite -> store run, resumable after a crash.
+
+    Fetched, deduplicated and clustered source articles are enqueued as
+    `work_items` (see WorkQueue) before any LLM call. A pool of rewrite
+    workers then claims items under a lease, checkpoints each rewrite on
+    its item and hands it to the batched ArticleWriter. Because claims are
+    not scoped to a job, a run also picks up items a crashed or concurrent
+    run left unfinished; only the rewrites that were in flight are lost.
+
+    Every run keeps a heartbeat on its `fetch_jobs` record. A `running`
+    job whose heartbeat has gone stale is marked `interrupted` by the next
+    run, which resumes its items.
+
+    A run given a `fence` (the scheduler's LeaderLock) checks that its
+    fencing token is still current before each step that writes shared
+    state, and stops with LockLostError once another replica has taken over.
+    """
+
+    def __init__(self, db, on_commit=None, news_fetcher=None, chat_factory=None):
+        self.db = db
+        # Async callbacks receiving each batch of newly stored article documents
+        self.on_commit = list(on_commit or [])
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self.watermarks = WatermarkStore(db)
+        # A fetcher or chat factory can be swapped in for dry runs and benchmarks
+        self.news_fetcher = news_fetcher or NewsFetcher(watermarks=self.watermarks)
+        self.rewrite_cache = RewriteCache(db)
+        metrics.counter(
+            'rewrite_cache_lookups_total', 'Rewrite cache lookups by result', ('result',),
+            function=lambda: {
+                ('memory_hit',): self.rewrite_cache.stats['memoryHits'],
+                ('store_hit',): self.rewrite_cache.stats['storeHits'],
+                ('miss',): self.rewrite_cache.stats['misses']
+            }
+        )
+        self.ai_rewriter = AIRewriter(cache=self.rewrite_cache, chat_factory=chat_factory)
+        self.deduper = ArticleDeduper(db)
+        self.near_dupes = NearDuplicateIndex(db)
+        self.id_allocator = ArticleIdAllocator(db)
+        self.work_queue = WorkQueue(db)
+
+        # Rewrite worker pool, throttled to the LLM provider's quota
+        self.rewrite_concurrency = int(os.environ.get('AI_CONCURRENCY', 4))
+        self.max_rewrite_attempts = int(os.environ.get('AI_MAX_ATTEMPTS', 4))
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=int(os.environ.get('AI_REQUESTS_PER_MINUTE', 60)),
+            tokens_per_minute=int(os.environ.get('AI_TOKENS_PER_MINUTE', 200000))
+        )
+        self.heartbeat_seconds = self.work_queue.lease.total_seconds() / 3
+
+        self.rewrite_stats = self._empty_rewrite_stats()
+        self.queue_stats = self._empty_queue_stats()
+        # Work item keys whose article failed to store and has not been stored since
+        self.unstored: Set[str] = set()
+        self.fence: Optional[LeaderLock] = None
+
+        # Milliseconds spent in each stage of the current run
+        self.timings: Dict[str, float] = {}
+        self._stage: Optional[str] = None
+        self._stage_started = 0.0
+
+    @staticmethod
+    def _empty_rewrite_stats() -> Dict:
+        return {'requests': 0, 'batches': 0, 'batchedArticles': 0, 'fallbacks': 0}
+
+    @staticmethod
+    def _empty_queue_stats() -> Dict:
+        return {'enqueued': 0, 'resumed': 0, 'checkpointed': 0, 'released': 0, 'failed': 0}
+
+    async def close(self):
+        await self.news_fetcher.close()
+
+    @staticmethod
+    def new_job_id() -> str:
+        return str(uuid.uuid4())
+
+    async def run(self, fence: Optional[LeaderLock] = None, job_id: Optional[str] = None) -> Dict:
+        """Run every stage once; returns the final fetch_jobs fields"""
+        job_id = job_id or self.new_job_id()
+        logger.info(f"Starting news fetch job: {job_id}")
+
+        # Create job record
+        job_data = {
+            'jobId': job_id,
+            'status': 'running',
+            'stage': 'fetch',
+            'worker': self.worker_id,
+            'articlesProcessed': 0,
+            'startTime': datetime.utcnow(),
+            'heartbeatAt': datetime.utcnow(),
+            'fencingToken': fence.token if fence else None
+        }
+        await self.db.fetch_jobs.insert_one(job_data)
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        cache_stats_before = dict(self.rewrite_cache.stats)
+        llm_stats_before = dict(self.ai_rewriter.stats)
+        # Mongo latency for this run is reported under its own route label
+        current_route.set('pipeline')
+        self.fence = fence
+        self.rewrite_stats = self._empty_rewrite_stats()
+        self.queue_stats = self._empty_queue_stats()
+        self.unstored = set()
+        self.timings = {}
+        self._stage, self._stage_started = 'fetch', time.perf_counter()
+
+        try:
+            interrupted = await self._recover_interrupted_jobs(job_id)
+            await self.work_queue.sweep()
+
+            # Fetch news from all categories, starting from each query's watermark
+            await self.watermarks.load()
+            all_news = await self.news_fetcher.fetch_all_news()
+
+            # Drop stories we already have before paying for a rewrite
+            await self._set_stage(job_id, 'dedupe')
+            deduped = await self.deduper.filter_new(all_news)
+
+            # Rewrite one article per story, not one per outlet carrying it
+            await self.near_dupes.load()
+            clustered = self.near_dupes.cluster(deduped['articles'])
+
+            # Persist the work before spending anything on it
+            await self._set_stage(job_id, 'enqueue')
+            await self._check_fence()
+            self.queue_stats['enqueued'] = await self.work_queue.enqueue(
+                job_id, clustered['articles'], batchable=self.ai_rewriter.is_batchable
+            )
+            await self.db.fetch_jobs.update_one(
+                {'jobId': job_id},
+                {'$set': {
+                    'dedupe': deduped['stats'],
+                    'nearDuplicates': clustered['stats'],
+                    'fetch': self._fetch_summary(deduped['stats']),
+                    'resumedJobs': interrupted
+                }}
+            )
+
+            # Rewrite with a bounded pool of workers, storing through a batched writer;
+            # each flush settles its items so they finish well inside their leases
+            await self._set_stage(job_id, 'rewrite')
+            stored: Dict[str, Dict] = {}
+            writer = ArticleWriter(
+                self.db,
+                self.id_allocator,
+                job_id=job_id,
+                on_commit=self._on_articles_committed,
+                on_flush=lambda keys: self._settle_stored(stored, writer, keys)
+            )
+            try:
+                await asyncio.gather(*[
+                    self._rewrite_worker(job_id, writer, stored)
+                    for _ in range(max(self.rewrite_concurrency, 1))
+                ])
+            finally:
+                await self._set_stage(job_id, 'store')
+                await writer.close()
+                # Items whose flush raised before writing were never settled
+                await self._settle_stored(stored, writer)
+                self.near_dupes.discard_pending()
+            unstored = len(self.unstored)
+            total_processed = writer.inserted_count
+
+            # Only now is everything up to the new watermarks stored
+            await self._set_stage(job_id, 'commit')
+            await self._check_fence()
+            await self.watermarks.commit()
+
+            cache_stats = self.rewrite_cache.snapshot_stats(since=cache_stats_before)
+            logger.info(
+                f"Rewrite cache: {cache_stats['memoryHits'] + cache_stats['storeHits']} hits, "
+                f"{cache_stats['misses']} misses, {cache_stats['evictions']} evictions, "
+                f"~{cache_stats['tokensSaved']} tokens saved"
+            )
+
+            # Update job status; articles the writer could not store fail the job
+            self._end_stage()
+            status = 'failed' if unstored or writer.error_count else 'completed'
+            result = {
+                'status': status,
+                'stage': 'done',
+                'articlesProcessed': total_processed,
+                'rewriteCache': cache_stats,
+                'rewrites': self.rewrite_stats,
+                'llm': self._llm_summary(llm_stats_before),
+                'queue': self.queue_stats,
+                'timings': self.timings,
+                'endTime': datetime.utcnow()
+            }
+            if status == 'failed':
+                result['error'] = f"{unstored} articles could not be stored ({writer.error_count} write errors)"
+                result['failedStage'] = 'store'
+            await self.db.fetch_jobs.update_one({'jobId': job_id}, {'$set': result})
+            PIPELINE_RUNS.inc(status=status)
+            ARTICLES_STORED.inc(total_processed)
+
+            if status == 'failed':
+                logger.error(
+                    f"Job {job_id} stored {total_processed} articles but {result['error']}; "
+                    f"their items went back to the queue"
+                )
+            else:
+                logger.info(
+                    f"Job {job_id} completed. Processed {total_processed} articles "
+                    f"({self.queue_stats['resumed']} resumed from earlier runs)."
+                )
+            return {'jobId': job_id, **result}
+
+        except Exception as e:
+            logger.error(f"Error in fetch job {job_id}: {str(e)}")
+            self.watermarks.discard()
+
+            # Update job with error; its unfinished items stay queued for the next run
+            failed_stage = self._stage
+            self._end_stage()
+            result = {
+                'status': 'failed',
+                'error': str(e),
+                'failedStage': failed_stage,
+                'rewrites': self.rewrite_stats,
+                'llm': self._llm_summary(llm_stats_before),
+                'queue': self.queue_stats,
+                'timings': self.timings,
+                'endTime': datetime.utcnow()
+            }
+            await self.db.fetch_jobs.update_one({'jobId': job_id}, {'$set': result})
+            PIPELINE_RUNS.inc(status='failed')
+            return {'jobId': job_id, **result}
+
+        finally:
+            heartbeat.cancel()
+
+    async def _check_fence(self):
+        """Raise LockLostError if this run's leader lock has been taken over"""
+        if self.fence is not None:
+            await self.fence.ensure()
+
+    def _end_stage(self):
+        """Add the time since the current stage began to its timing"""
+        if self._stage is not None:
+            elapsed = time.perf_counter() - self._stage_started
+            self.timings[self._stage] = round(self.timings.get(self._stage, 0.0) + elapsed * 1000, 1)
+            PIPELINE_STAGE_SECONDS.observe(elapsed, stage=self._stage)
+        self._stage = None
+
+    async def _set_stage(self, job_id: str, stage: str):
+        self._end_stage()
+        self._stage, self._stage_started = stage, time.perf_counter()
+        try:
+            await self.db.fetch_jobs.update_one({'jobId': job_id}, {'$set': {'stage': stage}})
+        except PyMongoError as e:
+            logger.error(f"Error recording stage {stage} for job {job_id}: {str(e)}")
+
+    async def _heartbeat(self, job_id: str):
+        """Keep the job record fresh so other runs can tell it is still alive"""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.db.fetch_jobs.update_one(
+                    {'jobId': job_id},
+                    {'$set': {'heartbeatAt': datetime.utcnow()}}
+                )
+            except PyMongoError as e:
+                logger.error(f"Error updating heartbeat for job {job_id}: {str(e)}")
+
+    async def run_ended_early(self, claim: Dict) -> bool:
+        """Whether the run recorded by a LeaderLock.claim_run() claim stopped without finishing.
+
+        True if its job failed or was interrupted, is `running` with a stale
+        heartbeat, or was never recorded although the claim is a lease old.
+        """
+        job_id = claim.get('runId')
+        if not job_id:
+            # Claimed before claims named their job
+            return False
+        cutoff = datetime.utcnow() - self.work_queue.lease
+        job = await self.db.fetch_jobs.find_one(
+            {'jobId': job_id}, {'status': 1, 'heartbeatAt': 1, 'startTime': 1}
+        )
+        if job is None:
+            return claim.get('startedAt') is not None and claim['startedAt'] < cutoff
+        if job.get('status') in ('failed', 'interrupted'):
+            return True
+        return job.get('status') == 'running' and (job.get('heartbeatAt') or job['startTime']) < cutoff
+
+    async def _recover_interrupted_jobs(self, job_id: str) -> List[str]:
+        """Mark `running` jobs with a stale heartbeat as interrupted; returns their IDs"""
+        cutoff = datetime.utcnow() - self.work_queue.lease
+        query = {
+            'status': 'running',
+            'jobId': {'$ne': job_id},
+            '$or': [
+                {'heartbeatAt': {'$lt': cutoff}},
+                # Jobs recorded before heartbeats existed
+                {'heartbeatAt': {'$exists': False}, 'startTime': {'$lt': cutoff}}
+            ]
+        }
+        stale = [doc['jobId'] async for doc in self.db.fetch_jobs.find(query, {'jobId': 1})]
+        if not stale:
+            return []
+
+        await self.db.fetch_jobs.update_many(
+            {'jobId': {'$in': stale}, 'status': 'running'},
+            {'$set': {'status': 'interrupted', 'resumedBy': job_id, 'endTime': datetime.utcnow()}}
+        )
+        logger.warning(f"Marked {len(stale)} stale jobs interrupted; resuming their unfinished items")
+        return stale
+
+    def _llm_summary(self, since: Dict) -> Dict:
+        """LLM usage by this run: requests, latency, estimated tokens and parse failures"""
+        stats = {key: value - since.get(key, 0) for key, value in self.ai_rewriter.stats.items()}
+        requests = stats['requests']
+        parses = stats['parsed'] + stats['parseFailures']
+        stats['seconds'] = round(stats['seconds'], 3)
+        stats['avgLatencyMs'] = round(stats['seconds'] * 1000 / requests) if requests else 0
+        stats['parseFailureRate'] = round(stats['parseFailures'] / parses, 4) if parses else 0.0
+        return stats
+
+    def _fetch_summary(self, dedupe_stats: dict) -> dict:
+        """NewsAPI quota used by this run and how much of what it fetched was already known"""
+        run_stats = self.news_fetcher.last_run_stats
+        fetched = dedupe_stats.get('fetched', 0)
+        duplicates = fetched - dedupe_stats.get('unseen', 0)
+        queries = run_stats.get('queries', {})
+        return {
+            'requests': run_stats.get('requests', 0),
+            'newsapiMs': sum(query.get('ms', 0) for query in queries.values()),
+            'articles': fetched,
+            'duplicates': duplicates,
+            'duplicateRatio': round(duplicates / fetched, 3) if fetched else 0.0,
+            'queries': queries,
+            'feeds': run_stats.get('feeds', {})
+        }
+
+    async def _on_articles_committed(self, article_docs: list):
+        """Called by the writer after each flush that stored new articles"""
+        await self.near_dupes.on_articles_committed(article_docs)
+        for callback in self.on_commit:
+            try:
+                await callback(article_docs)
+            except Exception as e:
+                logger.error(f"Error in commit callback: {str(e)}")
+
+    async def _settle_stored(
+        self,
+        stored: Dict[str, Dict],
+        writer: ArticleWriter,
+        keys: Optional[List[str]] = None
+    ):
+        """Complete items whose article the writer stored or found stored; release the rest.
+
+        Runs after each writer flush for the keys it wrote, and once more at
+        the end of the run for everything left in `stored`. Items whose write
+        failed (or never happened) go back to `rewritten` with their
+        checkpoint, so they are stored again without another LLM call.
+        """
+        settled = {key: stored.pop(key) for key in (list(stored) if keys is None else keys) if key in stored}
+        done = [key for key in settled if writer.outcomes.get(key) in (INSERTED, PRESENT)]
+        await self.work_queue.complete(done)
+        self.unstored.difference_update(done)
+
+        for key, item in settled.items():
+            if key in done:
+                continue
+            self.unstored.add(key)
+            error = writer.errors.get(key, 'article was not written')
+            try:
+                failed = await self.work_queue.release_checkpoint(item, self.worker_id, f"store failed: {error}")
+            except PyMongoError as e:
+                logger.error(f"Error releasing work item {key}: {str(e)}")
+                continue
+            self.queue_stats['failed' if failed else 'released'] += 1
+
+    async def _claim(self) -> List[Dict]:
+        """Claim the next item, plus batch partners when it is a short article needing a rewrite"""
+        items = await self.work_queue.claim(self.worker_id)
+        if not items:
+            return []
+        first = items[0]
+        if first.get('batchable') and not first.get('rewritten') and self.ai_rewriter.batch_size > 1:
+            items += await self.work_queue.claim(
+                self.worker_id,
+                limit=self.ai_rewriter.batch_size - 1,
+                batchable_only=True
+            )
+        return items
+
+    async def _rewrite_worker(self, job_id: str, writer: ArticleWriter, stored: Dict[str, Dict]):
+        """Claim and process work items until none are left"""
+        while True:
+            try:
+                # A deposed leader stops claiming; its claimed items go back when their leases expire
+                await self._check_fence()
+                items = await self._claim()
+            except LockLostError as e:
+                logger.warning(f"Stopping rewrite worker: {str(e)}")
+                return
+            except PyMongoError as e:
+                logger.error(f"Error claiming work items: {str(e)}")
+                return
+            if not items:
+                return
+
+            self.queue_stats['resumed'] += sum(1 for item in items if item.get('jobId') != job_id)
+            try:
+                await self._process_items(items, writer, stored)
+            except Exception as e:
+                logger.error(f"Error processing individual article: {str(e)}")
+
+    async def _process_items(self, items: List[Dict], writer: ArticleWriter, stored: Dict[str, Dict]):
+        """Rewrite claimed items that need it, checkpoint them and queue them for storage"""
+        fresh = [item for item in items if not item.get('rewritten')]
+        if fresh:
+            sources = [item['article'] for item in fresh]
+            if len(sources) == 1:
+                rewrites = [await self._rewrite(sources[0])]
+            else:
+                rewrites = await self._rewrite_batch(sources)
+
+            for item, rewritten in zip(fresh, rewrites):
+                if rewritten:
+                    await self.work_queue.checkpoint(item['_id'], self.worker_id, rewritten)
+                    item['rewritten'] = rewritten
+                    self.queue_stats['checkpointed'] += 1
+                else:
+                    failed = await self.work_queue.release(item, self.worker_id, 'rewrite failed')
+                    self.queue_stats['failed' if failed else 'released'] += 1
+
+        for item in items:
+            if item.get('rewritten'):
+                # Tracked before add(), which may flush (and settle) straight away
+                stored[item['_id']] = item
+                if not await self._store_rewrite(item['article'], item['rewritten'], writer):
+                    stored.pop(item['_id'], None)
+
+    async def _rewrite(self, source_article: dict, check_cache: bool = True):
+        """Rewrite one article within the rate limit, backing off when throttled.
+
+        `check_cache=False` skips the cache lookup for callers that already missed.
+        """
+        # Cache hits never touch the provider, so they skip the limiter too
+        if check_cache:
+            cached = await self.ai_rewriter.cached_rewrite(source_article)
+            if cached:
+                return cached
+
+        tokens = self.ai_rewriter.estimate_tokens(source_article)
+
+        for attempt in range(1, self.max_rewrite_attempts + 1):
+            await self.rate_limiter.acquire(tokens)
+            self.rewrite_stats['requests'] += 1
+            try:
+                rewritten = await self.ai_rewriter.rewrite_article(source_article, check_cache=False)
+            except RateLimitError as e:
+                logger.warning(
+                    f"Rate limited rewriting article (attempt {attempt}/{self.max_rewrite_attempts}): {str(e)}"
+                )
+                self.rate_limiter.on_rate_limited(e.retry_after)
+                continue
+
+            self.rate_limiter.on_success()
+            return rewritten
+
+        return None
+
+    async def _rewrite_batch(self, batch: list) -> list:
+        """Rewrite a group of short articles in one request where possible.
+
+        Cache hits are served first; the rest share one LLM request, and any
+        article the batch reply did not cover is rewritten on its own.
+        """
+        results = [await self.ai_rewriter.cached_rewrite(source_article) for source_article in batch]
+        misses = [index for index, result in enumerate(results) if not result]
+
+        if len(misses) > 1:
+            pending = [batch[index] for index in misses]
+            tokens = self.ai_rewriter.estimate_batch_tokens(pending)
+            for attempt in range(1, self.max_rewrite_attempts + 1):
+                await self.rate_limiter.acquire(tokens)
+                self.rewrite_stats['requests'] += 1
+                try:
+                    rewritten = await self.ai_rewriter.rewrite_batch(pending)
+                except RateLimitError as e:
+                    logger.warning(
+                        f"Rate limited rewriting batch (attempt {attempt}/{self.max_rewrite_attempts}): {str(e)}"
+                    )
+                    self.rate_limiter.on_rate_limited(e.retry_after)
+                    continue
+
+                self.rate_limiter.on_success()
+                self.rewrite_stats['batches'] += 1
+                for index, result in zip(misses, rewritten):
+                    results[index] = result
+                    if result:
+                        self.rewrite_stats['batchedArticles'] += 1
+                break
+
+        for index, source_article in enumerate(batch):
+            if not results[index]:
+                if len(misses) > 1:
+                    self.rewrite_stats['fallbacks'] += 1
+                # Every article here already missed the cache above
+                results[index] = await self._rewrite(source_article, check_cache=False)
+        return results
+
+    async def _store_rewrite(self, source_article: dict, rewritten, writer: ArticleWriter) -> bool:
+        """Queue a rewritten article for storage"""
+        if not rewritten:
+            logger.warning(f"Failed to rewrite article: {source_article.get('sourceTitle', '')}")
+            return False
+
+        # Prepare article document; the writer assigns articleId on flush
+        article_doc = {
+            'title': rewritten['title'],
+            'summary': rewritten['summary'],
+            'content': rewritten['content'],
+            'category': rewritten['category'],
+            'district': rewritten.get('district'),
+            'image': rewritten['image'] or 'https://images.unsplash.com/photo-1504711434969-e33886168f5c?w=800',
+            'date': datetime.utcnow(),
+            'author': 'महादेश न्यूज़ डेस्क',
+            'views': 0,
+            'sourceTitle': rewritten['sourceTitle'],
+            'sourceUrl': rewritten['sourceUrl'],
+            'sourceUrlKey': source_article.get('sourceUrlKey'),
+            'sourcePublishedAt': rewritten.get('sourcePublishedAt') or None,
+            'isBreaking': rewritten.get('priority', 5) >= 9,
+            'priority': rewritten.get('priority', 5),
+            'clusterSize': source_article.get('clusterSize', 1),
+            'aiGenerated': True,
+            'createdAt': datetime.utcnow(),
+            'updatedAt': datetime.utcnow()
+        }
+
+        await writer.add(article_doc)
+        logger.info(f"Rewrote article: {rewritten['title'][:50]}...")
+        return True
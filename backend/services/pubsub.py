@@ -0,0 +1,143 @@
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from pymongo.errors import PyMongoError
+from backend.services.response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Change streams need a replica set (Atlas always has one)
+STREAM_CHANGE_STREAM = os.environ.get('STREAM_CHANGE_STREAM', 'false').lower() in ('1', 'true', 'yes')
+
+
+class StreamEvent:
+    """A published article, serialized once for every subscriber"""
+
+    __slots__ = ('seq', 'article_id', 'category', 'data')
+
+    def __init__(self, seq: int, article_id: int, category: Optional[str], data: bytes):
+        self.seq = seq
+        self.article_id = article_id
+        self.category = category
+        self.data = data
+
+
+class ArticleBroker:
+    """In-process fan-out of newly published articles to stream subscribers.
+
+    Published articles are serialized once and appended to a bounded ring
+    buffer under a broker sequence number. Subscribers keep their own read
+    position and all wait on one shared event that is set (and replaced) on
+    every publish, so a new article costs one serialization and one wake-up
+    per subscriber, never a query per client.
+
+    Articles arrive from the local scheduler via `publish()` and, when
+    `watch()` is running, from a Mongo change stream on `articles` so that
+    articles stored by other processes (e.g. the cron job) reach this
+    process's subscribers too. Both paths can deliver the same article;
+    duplicates are dropped by articleId.
+    """
+
+    def __init__(self, buffer_size: Optional[int] = None):
+        self.buffer_size = buffer_size or int(os.environ.get('STREAM_BUFFER_SIZE', 1000))
+
+        self._events: deque = deque()
+        self._recent_ids = set()
+        self._next_seq = 0
+        self._published = asyncio.Event()
+        self._watch_task: Optional[asyncio.Task] = None
+
+        self.subscribers = 0
+
+    @property
+    def next_seq(self) -> int:
+        """Sequence number the next published event will get"""
+        return self._next_seq
+
+    def publish(self, articles: List[Dict]) -> int:
+        """Append listing items (with 'id' and 'category') and wake subscribers"""
+        added = 0
+        for article in sorted(articles, key=lambda a: a['id']):
+            if article['id'] in self._recent_ids:
+                continue
+            self._events.append(StreamEvent(
+                self._next_seq, article['id'], article.get('category'), ResponseCache.serialize(article)
+            ))
+            self._recent_ids.add(article['id'])
+            self._next_seq += 1
+            added += 1
+
+        while len(self._events) > self.buffer_size:
+            self._recent_ids.discard(self._events.popleft().article_id)
+
+        if added:
+            published, self._published = self._published, asyncio.Event()
+            published.set()
+        return added
+
+    def read(self, seq: int) -> Tuple[List[StreamEvent], bool]:
+        """Events from `seq` on, and whether some were already evicted"""
+        if not self._events:
+            return [], False
+        first = self._events[0].seq
+        lagged = seq < first
+        start = max(seq - first, 0)
+        return [self._events[i] for i in range(start, len(self._events))], lagged
+
+    def seq_after(self, article_id: int) -> Optional[int]:
+        """Sequence to resume from for a client that has seen `article_id`.
+
+        None if the buffer no longer reaches back that far, in which case the
+        caller has to backfill from Mongo.
+        """
+        if not self._events or self._events[0].article_id > article_id + 1:
+            return None
+        for event in self._events:
+            if event.article_id > article_id:
+                return event.seq
+        return self._next_seq
+
+    async def wait(self, seq: int, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for an event at or after `seq`"""
+        if seq < self._next_seq:
+            return True
+        try:
+            await asyncio.wait_for(self._published.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def watch(self, db, serialize):
+        """Tail inserts into `articles` from a change stream (replica sets only)"""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch(db, serialize))
+
+    async def _watch(self, db, serialize):
+        pipeline = [{'$match': {'operationType': 'insert'}}]
+        resume_token = None
+        while True:
+            try:
+                async with db.articles.watch(pipeline, resume_after=resume_token) as stream:
+                    logger.info("Article change stream opened")
+                    async for change in stream:
+                        resume_token = stream.resume_token
+                        self.publish([serialize(change['fullDocument'])])
+            except asyncio.CancelledError:
+                raise
+            except PyMongoError as e:
+                logger.error(f"Article change stream failed, retrying in 5s: {str(e)}")
+                await asyncio.sleep(5)
+            except Exception as e:
+                logger.error(f"Error publishing change stream event: {str(e)}")
+                await asyncio.sleep(5)
+
+    async def stop(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
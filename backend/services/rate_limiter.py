@@ -0,0 +1,92 @@
+import time
+import random
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Bucket holding up to `capacity` units, refilled continuously at `rate` units/second"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, rate: float):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+    def delay_for(self, amount: float, scale: float = 1.0) -> float:
+        """Seconds until `amount` units are available at the scaled refill rate"""
+        rate = self.rate * scale
+        self._refill(rate)
+        # A single request larger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / rate
+
+    def consume(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for the LLM provider.
+
+    Callers wait in FIFO order until both buckets can cover the request. When the
+    provider reports a rate limit the refill rate is halved and all callers pause
+    for an exponentially growing, jittered delay; every success restores a little
+    of the rate (AIMD), so throughput settles just under the real provider quota.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        min_scale: float = 0.1,
+        max_backoff: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60.0)
+        self.min_scale = min_scale
+        self.max_backoff = max_backoff
+
+        self.scale = 1.0
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1):
+        """Wait until one request carrying `tokens` tokens fits in the budget"""
+        async with self._lock:
+            while True:
+                wait = max(
+                    self._paused_until - time.monotonic(),
+                    self.requests.delay_for(1, self.scale),
+                    self.tokens.delay_for(tokens, self.scale)
+                )
+                if wait <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    return
+                await asyncio.sleep(wait)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Back off after the provider rejected a request"""
+        self.scale = max(self.min_scale, self.scale / 2)
+        self._backoff = min(self.max_backoff, self._backoff * 2 or 1.0)
+        delay = retry_after if retry_after else self._backoff * random.uniform(0.5, 1.5)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logger.warning(
+            f"LLM rate limited; pausing {delay:.1f}s, rate scaled to {self.scale:.0%}"
+        )
+
+    def on_success(self):
+        """Recover rate gradually after successful requests"""
+        self.scale = min(1.0, self.scale + 0.05)
+        self._backoff = max(0.0, self._backoff / 2 if self._backoff > 1.0 else 0.0)
@@ -0,0 +1,161 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import Request, Response
+from backend.services.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder produces the same JSON
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse:
+    """Pre-serialized JSON body with its validators"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, body: bytes, last_modified: datetime, expires_at: float):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """In-process TTL/LRU cache of serialized API responses.
+
+    Listing responses only change when the scheduler commits new articles, so
+    they are built once per key and served as bytes until the entry expires or
+    `invalidate()` is called. Concurrent misses for the same key share a single
+    build. `respond()` answers conditional requests with 304s.
+
+    Each entry's Last-Modified is the time its build started, so it never
+    predates the data it was built from. That keeps If-Modified-Since honest
+    across replicas, whose caches are invalidated independently.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.ttl = ttl or float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 120))
+        self.max_entries = max_entries or int(os.environ.get('RESPONSE_CACHE_SIZE', 512))
+
+        self._entries: OrderedDict = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    @property
+    def generation(self) -> int:
+        """Incremented on every invalidation"""
+        return self._generation
+
+    @staticmethod
+    def make_key(route: str, **params) -> str:
+        query = '&'.join(f"{name}={params[name]}" for name in sorted(params) if params[name] is not None)
+        return f"{route}?{query}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def get_or_build(self, key: str, build: Callable[[], Awaitable[Dict]]) -> CachedResponse:
+        """Cached entry for `key`, building it from `build()` on a miss"""
+        entry = self.get(key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry
+
+        self.stats['misses'] += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._build(key, build))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        # Shield so one disconnecting client doesn't cancel the build for the rest
+        return await asyncio.shield(pending)
+
+    async def _build(self, key: str, build: Callable[[], Awaitable[Dict]]) -> CachedResponse:
+        generation = self._generation
+        # Taken before the query runs; HTTP dates have whole-second precision
+        built_at = datetime.now(timezone.utc).replace(microsecond=0)
+        payload = await build()
+        entry = CachedResponse(
+            self.serialize(payload),
+            built_at,
+            time.monotonic() + self.ttl
+        )
+
+        # A build that raced an invalidation may hold stale data; serve it once but don't keep it
+        if generation == self._generation:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return entry
+
+    def invalidate(self):
+        """Drop every entry; called when new articles are committed"""
+        self._entries.clear()
+        self._generation += 1
+        self.stats['invalidations'] += 1
+
+    @staticmethod
+    def serialize(payload: Dict) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(payload)
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def respond(self, request: Request, entry: CachedResponse) -> Response:
+        """Full response, or 304 when the client's validators still match"""
+        headers = {
+            'ETag': entry.etag,
+            'Last-Modified': format_datetime(entry.last_modified, usegmt=True),
+            'Cache-Control': 'public, max-age=0, must-revalidate'
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if entry.etag in tags or '*' in tags:
+                return Response(status_code=304, headers=headers)
+        else:
+            if_modified_since = request.headers.get('if-modified-since')
+            if if_modified_since:
+                try:
+                    since = parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    since = None
+                if since is not None and since.tzinfo is not None and entry.last_modified <= since:
+                    return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type='application/json', headers=headers)
+
+
+# Shared by the news routes and invalidated by the scheduler
+news_cache = ResponseCache()
+
+metrics.counter(
+    'response_cache_lookups_total', 'API response cache lookups by result', ('result',),
+    function=lambda: {('hit',): news_cache.stats['hits'], ('miss',): news_cache.stats['misses']}
+)
+metrics.counter(
+    'response_cache_invalidations_total', 'API response cache invalidations',
+    function=lambda: {(): news_cache.stats['invalidations']}
+)
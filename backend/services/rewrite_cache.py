@@ -0,0 +1,104 @@
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Cached rewrites expire from Mongo after this many seconds (TTL index on createdAt)
+CACHE_TTL_SECONDS = int(float(os.environ.get('REWRITE_CACHE_TTL_DAYS', 7)) * 86400)
+
+
+def _normalize_text(text: Optional[str]) -> str:
+    return ' '.join((text or '').split()).casefold()
+
+
+class RewriteCache:
+    """Content-addressed cache of parsed LLM rewrites.
+
+    Keys hash the normalized source title, description and content together
+    with the model and system prompt, so the same wire story under another URL
+    or category reuses the earlier rewrite. An in-process LRU sits in front of
+    the `rewrite_cache` collection, whose documents expire via a TTL index.
+    """
+
+    def __init__(self, db=None, max_entries: Optional[int] = None):
+        self.collection = db.rewrite_cache if db is not None else None
+        self.max_entries = max_entries or int(os.environ.get('REWRITE_CACHE_SIZE', 2000))
+        self._entries: OrderedDict = OrderedDict()
+
+        self.stats = {
+            'memoryHits': 0,
+            'storeHits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'tokensSaved': 0
+        }
+
+    @staticmethod
+    def make_key(source_article: Dict, model: str, system_message: str) -> str:
+        parts = [
+            _normalize_text(source_article.get('sourceTitle')),
+            _normalize_text(source_article.get('sourceDescription')),
+            _normalize_text(source_article.get('sourceContent')),
+            model,
+            system_message
+        ]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    async def get(self, key: str, cost: int = 0) -> Optional[Dict]:
+        """Cached parsed rewrite for `key`; `cost` is the token estimate a hit saves"""
+        parsed = self._entries.get(key)
+        if parsed is not None:
+            self._entries.move_to_end(key)
+            self.stats['memoryHits'] += 1
+            self.stats['tokensSaved'] += cost
+            return parsed
+
+        if self.collection is not None:
+            try:
+                doc = await self.collection.find_one({'_id': key}, {'parsed': 1})
+            except PyMongoError as e:
+                logger.error(f"Error reading rewrite cache: {str(e)}")
+                doc = None
+
+            if doc:
+                self._remember(key, doc['parsed'])
+                self.stats['storeHits'] += 1
+                self.stats['tokensSaved'] += cost
+                return doc['parsed']
+
+        self.stats['misses'] += 1
+        return None
+
+    async def put(self, key: str, parsed: Dict, model: Optional[str] = None):
+        self._remember(key, parsed)
+
+        if self.collection is not None:
+            try:
+                await self.collection.update_one(
+                    {'_id': key},
+                    {'$set': {'parsed': parsed, 'model': model, 'createdAt': datetime.utcnow()}},
+                    upsert=True
+                )
+            except PyMongoError as e:
+                logger.error(f"Error writing rewrite cache: {str(e)}")
+
+    def _remember(self, key: str, parsed: Dict):
+        self._entries[key] = parsed
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def snapshot_stats(self, since: Optional[Dict] = None) -> Dict:
+        """Counters (relative to an earlier copy of `stats`, if given) plus the hit rate"""
+        since = since or {}
+        stats = {key: value - since.get(key, 0) for key, value in self.stats.items()}
+        hits = stats['memoryHits'] + stats['storeHits']
+        lookups = hits + stats['misses']
+        stats['hitRate'] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,264 @@
+import os
+import re
+import math
+import time
+import heapq
+import asyncio
+import logging
+import unicodedata
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional
+from pymongo.errors import PyMongoError
+from backend.services.catch_up import ArticleCatchUp
+
+logger = logging.getLogger(__name__)
+
+# Latin words, or runs of Devanagari letters/signs/digits (dandas split words)
+TOKEN_RE = re.compile(r'[a-z0-9]+|[ऀ-ॣ०-ॿ]+')
+
+STOPWORDS = {
+    'का', 'के', 'की', 'है', 'हैं', 'में', 'से', 'को', 'पर', 'और', 'एक', 'यह', 'वह', 'ने', 'भी',
+    'था', 'थी', 'थे', 'लिए', 'तो', 'ही', 'कि', 'जो', 'कर', 'किया', 'इस', 'उस', 'गया', 'गई',
+    'रहा', 'रही', 'रहे', 'हो', 'होने', 'साथ', 'बाद', 'तक', 'अब', 'या', 'व', 'न', 'नहीं',
+    'the', 'a', 'an', 'of', 'in', 'on', 'and', 'to', 'for', 'is', 'are', 'was', 'with', 'by', 'at', 'from'
+}
+
+# Inflectional suffixes stripped by the light Hindi stemmer, longest first
+HINDI_SUFFIXES = sorted([
+    'ियों', 'ियां', 'ियाँ', 'ाओं', 'ाएं', 'ाएँ', 'ुओं', 'ुएं', 'ों', 'ें', 'ीं', 'ाँ', 'ां',
+    'ाना', 'ाने', 'ानी', 'िया', 'ियो', 'ा', 'ी', 'े', 'ो', 'ि', 'ु', 'ू'
+], key=len, reverse=True)
+
+# Field weights folded into term frequency
+FIELD_WEIGHTS = (('title', 3), ('summary', 2), ('content', 1))
+
+INDEX_PROJECTION = {'_id': 0, 'articleId': 1, 'title': 1, 'summary': 1, 'content': 1}
+
+
+@lru_cache(maxsize=200000)
+def stem(token: str) -> str:
+    """Strip one inflectional suffix, keeping at least two characters of stem"""
+    if token.isascii():
+        return token
+    for suffix in HINDI_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Normalized, stemmed search terms of `text`.
+
+    NFC-normalizes, lower-cases Latin text, drops the nukta and folds
+    chandrabindu into anusvara so spelling variants meet, then removes
+    stopwords and stems.
+    """
+    text = unicodedata.normalize('NFC', text or '').lower()
+    text = text.replace('़', '').replace('ँ', 'ं')
+    return [
+        stem(token)
+        for token in TOKEN_RE.findall(text)
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+class SearchIndex:
+    """In-process inverted index over article title, summary and content.
+
+    Postings are compact arrays of (document slot, weighted term frequency)
+    and results are ranked with BM25. Once a term is in more than
+    `champion_size` documents it also keeps a champion list: a bounded heap
+    of its highest-impact postings, which is all a query scores for that
+    term. Query cost then stays flat however common the term becomes, and
+    `total` becomes a lower bound for such queries.
+
+    Articles are added incrementally as the scheduler commits them;
+    `refresh()` also picks up articles stored by other processes (e.g. the
+    cron job) through an ArticleCatchUp. `generation` changes whenever an
+    article is added, so cached results can be keyed on it.
+    """
+
+    def __init__(
+        self,
+        db=None,
+        content_tokens: Optional[int] = None,
+        refresh_interval: Optional[float] = None,
+        champion_size: Optional[int] = None,
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        self.db = db
+        self.content_tokens = content_tokens or int(os.environ.get('SEARCH_CONTENT_TOKENS', 200))
+        self.refresh_interval = refresh_interval or float(os.environ.get('SEARCH_REFRESH_SECONDS', 30))
+        self.champion_size = champion_size or int(os.environ.get('SEARCH_CHAMPION_SIZE', 1000))
+        self.k1 = k1
+        self.b = b
+
+        self._article_ids = array('q')   # slot -> articleId
+        self._lengths = array('I')        # slot -> weighted document length
+        self._slots: Dict[int, int] = {}  # articleId -> slot
+        self._postings: Dict[str, array] = {}
+        self._frequencies: Dict[str, array] = {}
+        self._champions: Dict[str, list] = {}  # term -> min-heap of (impact, slot, tf)
+        self._total_length = 0
+
+        self.max_article_id = 0
+        self.generation = 0
+        self._catch_up = ArticleCatchUp(db, INDEX_PROJECTION) if db is not None else None
+        self._last_refresh = 0.0
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, article: Dict):
+        """Index one article (id, title, summary, content); re-adding is a no-op"""
+        article_id = article['articleId']
+        if article_id in self._slots:
+            return
+
+        frequencies: Dict[str, int] = {}
+        for field, weight in FIELD_WEIGHTS:
+            text = article.get(field) or ''
+            if field == 'content':
+                # Only the lead is indexed; trim before tokenizing the whole body
+                tokens = tokenize(text[:self.content_tokens * 12])[:self.content_tokens]
+            else:
+                tokens = tokenize(text)
+            for token in tokens:
+                frequencies[token] = frequencies.get(token, 0) + weight
+
+        slot = len(self._article_ids)
+        self._slots[article_id] = slot
+        self._article_ids.append(article_id)
+        length = sum(frequencies.values())
+        self._lengths.append(length)
+        self._total_length += length
+        self.max_article_id = max(self.max_article_id, article_id)
+        self.generation += 1
+
+        for token, frequency in frequencies.items():
+            frequency = min(frequency, 65535)
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('I')
+                self._frequencies[token] = array('H')
+            postings.append(slot)
+            self._frequencies[token].append(frequency)
+
+            champions = self._champions.get(token)
+            if champions is not None:
+                entry = (self._impact(frequency, length), slot, frequency)
+                if len(champions) < self.champion_size:
+                    heapq.heappush(champions, entry)
+                elif entry > champions[0]:
+                    heapq.heapreplace(champions, entry)
+            elif len(postings) > self.champion_size:
+                self._build_champions(token)
+
+    def _impact(self, tf: int, length: int) -> float:
+        """Length-normalized term weight used to pick champion postings"""
+        average_length = self._total_length / len(self._article_ids) or 1.0
+        return tf / (tf + self.k1 * (1 - self.b + self.b * length / average_length))
+
+    def _build_champions(self, token: str):
+        lengths = self._lengths
+        entries = (
+            (self._impact(tf, lengths[slot]), slot, tf)
+            for slot, tf in zip(self._postings[token], self._frequencies[token])
+        )
+        champions = heapq.nlargest(self.champion_size, entries)
+        heapq.heapify(champions)
+        self._champions[token] = champions
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> Dict:
+        """Ranked article IDs for `query` plus the total number of matches"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        document_count = len(self._article_ids)
+        if not terms or not document_count:
+            return {'ids': [], 'total': 0}
+
+        average_length = self._total_length / document_count or 1.0
+        k1, b = self.k1, self.b
+        lengths = self._lengths
+        scores: Dict[int, float] = {}
+        largest_df = 0
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            df = len(postings)
+            largest_df = max(largest_df, df)
+            idf = math.log(1 + (document_count - df + 0.5) / (df + 0.5))
+            boost = idf * (k1 + 1)
+            base = k1 * (1 - b)
+            scale = k1 * b / average_length
+            get = scores.get
+
+            champions = self._champions.get(term)
+            if champions is not None:
+                candidates = ((slot, tf) for _, slot, tf in champions)
+            else:
+                candidates = zip(postings, self._frequencies[term])
+            for slot, tf in candidates:
+                scores[slot] = get(slot, 0.0) + boost * tf / (tf + base + scale * lengths[slot])
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=itemgetter(1))[offset:]
+        return {
+            'ids': [self._article_ids[slot] for slot, _ in top],
+            'total': max(len(scores), largest_df)
+        }
+
+    def start(self):
+        """Build the index from Mongo in the background"""
+        if self._task is None:
+            self._last_refresh = time.monotonic()
+            self._task = asyncio.create_task(self.load())
+
+    async def load(self, batch_size: int = 500):
+        """Index every stored article not yet in the index, in articleId order"""
+        if self.db is None:
+            return
+        started = time.monotonic()
+        before = len(self)
+        # Articles stored while this runs are left to refresh()
+        self._catch_up.mark()
+        await self._index_since(self.max_article_id, batch_size)
+        logger.info(
+            f"Search index: added {len(self) - before} articles in {time.monotonic() - started:.1f}s "
+            f"({len(self)} total, {len(self._postings)} terms)"
+        )
+
+    async def refresh(self):
+        """Pick up articles stored by other processes, at most every refresh_interval"""
+        if self.db is None or time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        if self._refresh_lock.locked():
+            return
+        async with self._refresh_lock:
+            self._last_refresh = time.monotonic()
+            try:
+                async for article in self._catch_up.fetch():
+                    self.add(article)
+            except PyMongoError as e:
+                logger.error(f"Error catching up the search index: {str(e)}")
+
+    async def _index_since(self, article_id: int, batch_size: int = 500):
+        try:
+            cursor = self.db.articles.find(
+                {'articleId': {'$gt': article_id}},
+                INDEX_PROJECTION
+            ).sort('articleId', 1).batch_size(batch_size)
+            indexed = 0
+            async for article in cursor:
+                self.add(article)
+                indexed += 1
+                if indexed % 50 == 0:
+                    # Let request handlers run during a large initial build
+                    await asyncio.sleep(0)
+        except PyMongoError as e:
+            logger.error(f"Error indexing articles for search: {str(e)}")
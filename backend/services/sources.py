@@ -0,0 +1,237 @@
+import os
+import re
+import json
+import html
+import logging
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional
+from xml.etree.ElementTree import XMLPullParser, ParseError
+from backend.services.http_client import UpstreamClient
+from backend.services.watermarks import WatermarkStore, parse_published_at
+
+logger = logging.getLogger(__name__)
+
+TAG_RE = re.compile(r'<[^>]+>')
+SPACE_RE = re.compile(r'\s+')
+
+
+class SourceAdapter:
+    """A news source the fetcher pulls from besides NewsAPI.
+
+    `fetch()` returns source articles in the shape of
+    NewsFetcher._format_articles: sourceTitle, sourceUrl, sourceDescription,
+    sourceContent, sourceImage, sourcePublishedAt, category, priority and
+    source.
+    """
+
+    name = 'source'
+    category = None
+
+    async def fetch(self) -> List[Dict]:
+        raise NotImplementedError
+
+
+def _local_name(tag: str) -> str:
+    """'{http://www.w3.org/2005/Atom}entry' -> 'entry'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _plain_text(value: Optional[str]) -> str:
+    """Feed HTML reduced to plain text"""
+    if not value:
+        return ''
+    return SPACE_RE.sub(' ', html.unescape(TAG_RE.sub(' ', value))).strip()
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """RSS (RFC 822) or Atom (ISO 8601) date as a naive UTC datetime"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+        if parsed.tzinfo is not None:
+            parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+        return parsed
+    except (TypeError, ValueError):
+        return parse_published_at(value)
+
+
+async def iter_feed_items(chunks: AsyncIterator[bytes]) -> AsyncIterator[Dict]:
+    """Stream raw fields of RSS <item> / Atom <entry> elements from byte chunks.
+
+    Each item is dropped from the tree as soon as it is read, so memory stays
+    flat however long the feed is, and a consumer that stops early stops the
+    download with it.
+    """
+    parser = XMLPullParser(events=('end',))
+    async for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if _local_name(element.tag) not in ('item', 'entry'):
+                continue
+            yield _item_fields(element)
+            element.clear()
+    parser.close()
+
+
+def _item_fields(element) -> Dict:
+    fields = {}
+    for child in element:
+        name = _local_name(child.tag)
+        if name == 'link':
+            # Atom: <link rel="alternate" href="..."/>; RSS: <link>url</link>
+            if child.get('href') and child.get('rel', 'alternate') == 'alternate':
+                fields.setdefault('link', child.get('href'))
+            elif child.text:
+                fields.setdefault('link', child.text.strip())
+        elif name in ('content', 'thumbnail', 'enclosure') and child.get('url'):
+            # media:content / media:thumbnail / enclosure images
+            if (child.get('type') or child.get('medium') or 'image').startswith('image'):
+                fields.setdefault('image', child.get('url'))
+        elif name == 'source':
+            fields['source'] = (child.text or '').strip()
+        elif name in ('encoded', 'content'):
+            fields.setdefault('content', child.text or '')
+        elif child.text:
+            fields.setdefault(name, child.text)
+    return fields
+
+
+class RssFeedSource(SourceAdapter):
+    """RSS 2.0 / Atom feed, parsed as its body streams in.
+
+    With a watermark store, items published before the feed's watermark are
+    dropped, and the request is conditional on the ETag / Last-Modified
+    committed with that watermark: a 304 then means everything in the feed
+    was already stored, so it is not read at all. A run that fails before
+    committing leaves the old validators, so the next one reads the body
+    again. So does a read that stopped at `limit` new items or at malformed
+    XML, which also leaves the watermark where it was.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        category: str,
+        priority: int = 5,
+        limit: int = 20,
+        http_client: Optional[UpstreamClient] = None,
+        watermarks: Optional[WatermarkStore] = None,
+        lookback_days: int = 2
+    ):
+        self.name = name
+        self.url = url
+        self.category = category
+        self.priority = priority
+        self.limit = limit
+        self.http = http_client or UpstreamClient()
+        self.watermarks = watermarks
+        self.lookback = timedelta(days=lookback_days)
+        self.last_stats = {}
+
+    async def fetch(self) -> List[Dict]:
+        key = f"feed:{self.name}"
+        headers = {}
+        since = None
+        if self.watermarks:
+            since = self.watermarks.since(key, self.lookback)
+            validators = self.watermarks.validators(key)
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('lastModified'):
+                headers['If-Modified-Since'] = validators['lastModified']
+
+        articles = []
+        newest = None
+        # Stopped at the limit or at malformed XML: items past that point were never read
+        truncated = False
+        async with self.http.stream(self.url, headers=headers) as response:
+            if response.status_code == 304:
+                self.last_stats = {'notModified': True, 'returned': 0}
+                return []
+
+            try:
+                # The limit counts articles kept, not items skipped as older than the watermark
+                async for fields in iter_feed_items(response.aiter_bytes(self.CHUNK_SIZE)):
+                    published = _parse_date(fields.get('pubDate') or fields.get('published') or fields.get('updated'))
+                    if since and published and published < since:
+                        continue
+                    article = self._format_item(fields, published)
+                    if not article:
+                        continue
+                    if published and (newest is None or published > newest):
+                        newest = published
+                    articles.append(article)
+                    if self.limit and len(articles) >= self.limit:
+                        truncated = True
+                        break
+            except ParseError as e:
+                truncated = True
+                logger.error(f"Malformed feed {self.name}, keeping {len(articles)} items parsed so far: {str(e)}")
+
+        if self.watermarks:
+            # A partial read keeps the watermark and the old validators, so the next run reads the feed again
+            validators = None
+            if not truncated:
+                validators = {'etag': response.headers.get('etag'), 'lastModified': response.headers.get('last-modified')}
+            self.watermarks.observe(key, newest, len(articles), complete=not truncated, validators=validators)
+        self.last_stats = {'notModified': False, 'returned': len(articles), 'truncated': truncated}
+        logger.info(f"Fetched {len(articles)} articles from feed: {self.name}")
+        return articles
+
+    def _format_item(self, fields: Dict, published: Optional[datetime]) -> Optional[Dict]:
+        title = _plain_text(fields.get('title'))
+        link = fields.get('link') or fields.get('guid')
+        if not title or not link:
+            return None
+
+        description = _plain_text(fields.get('description') or fields.get('summary'))
+        return {
+            'sourceTitle': title,
+            'sourceUrl': link.strip(),
+            'sourceDescription': description,
+            'sourceContent': _plain_text(fields.get('content')) or description,
+            'sourceImage': fields.get('image', ''),
+            'sourcePublishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ') if published else '',
+            'category': self.category,
+            'priority': self.priority,
+            'source': fields.get('source') or self.name
+        }
+
+
+def load_feed_sources(
+    http_client: Optional[UpstreamClient] = None,
+    watermarks: Optional[WatermarkStore] = None
+) -> List[SourceAdapter]:
+    """Feeds configured in RSS_FEEDS, a JSON list of
+    {"name", "url", "category", "priority"?, "limit"?} objects
+    """
+    raw = os.environ.get('RSS_FEEDS', '').strip()
+    if not raw:
+        return []
+    try:
+        configs = json.loads(raw)
+    except ValueError as e:
+        logger.error(f"Ignoring invalid RSS_FEEDS: {str(e)}")
+        return []
+
+    sources = []
+    for config in configs:
+        try:
+            sources.append(RssFeedSource(
+                name=config['name'],
+                url=config['url'],
+                category=config['category'],
+                priority=int(config.get('priority', 5)),
+                limit=int(config.get('limit', 20)),
+                http_client=http_client,
+                watermarks=watermarks
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Ignoring RSS feed config {config!r}: {str(e)}")
+    return sources
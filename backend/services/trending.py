@@ -0,0 +1,248 @@
+import os
+import re
+import math
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from pymongo.errors import PyMongoError
+from backend.services.catch_up import ArticleCatchUp
+
+logger = logging.getLogger(__name__)
+
+
+class TrendingIndex:
+    """Incrementally maintained trending ranking of articles.
+
+    An article's score at time t is
+
+        sum(view_weight * 2^-(t - t_view)/half_life)
+        + priority_weight * priority * 2^-(t - t_published)/half_life
+
+    i.e. decayed views plus a priority bonus that decays with age. Every term
+    decays at the same rate, so the score factors into exp(-lambda * t) times
+    a time-invariant sum S. Ranking by S therefore never needs recomputing:
+    a view just adds exp(lambda * (t - epoch)) to one article's S, and the
+    entries stay in a sorted list, making a top-N read O(N). The epoch is
+    moved forward (rescaling every S) long before the exponent can overflow.
+
+    Every worker records only the views it serves, so each one snapshots
+    its own view contributions to `trending_snapshots` (`trending:<owner>`)
+    and periodically merges everyone else's into its ranking; priority
+    bonuses are recomputed from the articles on load. Articles stored by
+    other processes are picked up by the same periodic task.
+    """
+
+    SNAPSHOT_ID = 'trending'
+    # Snapshots untouched for this many half-lives have decayed to nothing
+    SNAPSHOT_HORIZON_HALF_LIVES = 10
+    SEED_PROJECTION = {'_id': 0, 'articleId': 1, 'date': 1, 'priority': 1, 'views': 1}
+
+    def __init__(
+        self,
+        db=None,
+        half_life_hours: Optional[float] = None,
+        priority_weight: Optional[float] = None,
+        max_tracked: Optional[int] = None,
+        snapshot_interval: Optional[float] = None,
+        owner: Optional[str] = None
+    ):
+        self.db = db
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        half_life = half_life_hours or float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 6))
+        self.decay = math.log(2) / (half_life * 3600)
+        self.horizon = timedelta(hours=half_life * self.SNAPSHOT_HORIZON_HALF_LIVES)
+        self.priority_weight = priority_weight or float(os.environ.get('TRENDING_PRIORITY_WEIGHT', 5))
+        self.view_weight = 1.0
+        self.max_tracked = max_tracked or int(os.environ.get('TRENDING_MAX_TRACKED', 5000))
+        self.snapshot_interval = snapshot_interval or float(os.environ.get('TRENDING_SNAPSHOT_SECONDS', 300))
+
+        self.epoch = time.time()
+        self._scores: Dict[int, float] = {}
+        self._ranked: List[tuple] = []  # (S, articleId), ascending
+        # Parts of S from views: recorded here, and merged from other workers' snapshots
+        self._views: Dict[int, float] = {}
+        self._merged: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._catch_up = ArticleCatchUp(db, self.SEED_PROJECTION) if db is not None else None
+
+    def _weight(self, timestamp: float) -> float:
+        """Time-invariant weight of an event at `timestamp` relative to the epoch"""
+        exponent = self.decay * (timestamp - self.epoch)
+        if exponent > 300:
+            self._rebase(timestamp)
+            exponent = 0.0
+        return math.exp(max(exponent, -700))
+
+    def _rebase(self, now: float):
+        """Move the epoch to `now`, rescaling all scores by the same factor"""
+        factor = math.exp(-self.decay * (now - self.epoch))
+        self.epoch = now
+        self._scores = {article_id: score * factor for article_id, score in self._scores.items()}
+        self._views = {article_id: score * factor for article_id, score in self._views.items()}
+        self._merged = {article_id: score * factor for article_id, score in self._merged.items()}
+        self._ranked = sorted((score, article_id) for article_id, score in self._scores.items())
+
+    def _add(self, article_id: int, amount: float):
+        old = self._scores.get(article_id)
+        if old is not None:
+            index = bisect_left(self._ranked, (old, article_id))
+            if index < len(self._ranked) and self._ranked[index] == (old, article_id):
+                self._ranked.pop(index)
+        new = (old or 0.0) + amount
+        self._scores[article_id] = new
+        insort(self._ranked, (new, article_id))
+
+        # Drop the weakest entries in one slice once well over the cap
+        if len(self._ranked) > self.max_tracked * 1.1:
+            dropped, self._ranked = self._ranked[:-self.max_tracked], self._ranked[-self.max_tracked:]
+            for _, dropped_id in dropped:
+                self._scores.pop(dropped_id, None)
+                self._views.pop(dropped_id, None)
+                self._merged.pop(dropped_id, None)
+
+    def add_article(self, article: Dict, with_views: bool = True):
+        """Track a newly published (or seeded) article.
+
+        Its stored view count, dated at publication, is added unless
+        `with_views` is False. It is not snapshotted: every worker seeds it
+        alike.
+        """
+        published = article.get('date')
+        if isinstance(published, datetime):
+            # Mongo returns naive UTC datetimes
+            timestamp = published.replace(tzinfo=published.tzinfo or timezone.utc).timestamp()
+        else:
+            timestamp = time.time()
+        amount = self.priority_weight * article.get('priority', 5)
+        if with_views:
+            amount += self.view_weight * article.get('views', 0)
+        self._add(article['articleId'], amount * self._weight(timestamp))
+
+    def record_view(self, article_id: int, count: int = 1):
+        amount = self.view_weight * count * self._weight(time.time())
+        self._add(article_id, amount)
+        self._views[article_id] = self._views.get(article_id, 0.0) + amount
+
+    def top(self, limit: int = 10) -> List[int]:
+        """Article IDs with the highest current score"""
+        return [article_id for _, article_id in reversed(self._ranked[-limit:])]
+
+    def score(self, article_id: int) -> float:
+        """Current (decayed) score of an article"""
+        return self._scores.get(article_id, 0.0) * math.exp(-self.decay * (time.time() - self.epoch))
+
+    def _snapshot_query(self, **extra) -> Dict:
+        """Per-worker snapshot documents other than this worker's"""
+        return {
+            '_id': {'$regex': f"^{re.escape(self.SNAPSHOT_ID)}:", '$ne': self._snapshot_id},
+            **extra
+        }
+
+    @property
+    def _snapshot_id(self) -> str:
+        return f"{self.SNAPSHOT_ID}:{self.owner}"
+
+    async def load(self, seed_days: int = 3):
+        """Seed from recent articles and merge every worker's view snapshot.
+
+        With no snapshots yet, the articles' stored view counts stand in for
+        the views.
+        """
+        if self.db is None:
+            return
+        self._catch_up.mark()
+        try:
+            has_snapshots = await self.db.trending_snapshots.count_documents(self._snapshot_query(), limit=1) > 0
+            cursor = self.db.articles.find(
+                {'date': {'$gte': datetime.utcnow() - timedelta(days=seed_days)}},
+                self.SEED_PROJECTION
+            )
+            async for article in cursor:
+                self.add_article(article, with_views=not has_snapshots)
+            merged = await self.merge_snapshots()
+            logger.info(
+                f"Seeded trending index with {len(self._scores)} recent articles, "
+                f"views from {merged} worker snapshots"
+            )
+        except PyMongoError as e:
+            logger.error(f"Error loading trending index: {str(e)}")
+
+    async def catch_up(self) -> int:
+        """Track articles other processes stored since the last check; returns how many"""
+        added = 0
+        async for article in self._catch_up.fetch():
+            if article['articleId'] not in self._scores:
+                # Fresh articles have no views worth seeding
+                self.add_article(article, with_views=False)
+                added += 1
+        return added
+
+    async def merge_snapshots(self) -> int:
+        """Replace the views merged from other workers with their latest snapshots; returns how many"""
+        cutoff = datetime.utcnow() - self.horizon
+        combined: Dict[int, float] = {}
+        count = 0
+        async for snapshot in self.db.trending_snapshots.find(self._snapshot_query(updatedAt={'$gte': cutoff})):
+            # Rescale from the snapshot's epoch to ours
+            factor = math.exp(max(min(self.decay * (snapshot['epoch'] - self.epoch), 700), -700))
+            for article_id, score in snapshot['entries']:
+                combined[article_id] = combined.get(article_id, 0.0) + score * factor
+            count += 1
+
+        for article_id in combined.keys() | self._merged.keys():
+            change = combined.get(article_id, 0.0) - self._merged.get(article_id, 0.0)
+            if change:
+                self._add(article_id, change)
+        self._merged = {article_id: score for article_id, score in combined.items() if article_id in self._scores}
+        return count
+
+    async def snapshot(self):
+        """Persist this worker's views so a restart, or another worker, doesn't lose them"""
+        if self.db is None:
+            return
+        try:
+            await self.db.trending_snapshots.replace_one(
+                {'_id': self._snapshot_id},
+                {
+                    '_id': self._snapshot_id,
+                    'epoch': self.epoch,
+                    'entries': [[article_id, score] for article_id, score in self._views.items()],
+                    'updatedAt': datetime.utcnow()
+                },
+                upsert=True
+            )
+            # Snapshots of workers gone for good have decayed away
+            await self.db.trending_snapshots.delete_many(
+                self._snapshot_query(updatedAt={'$lt': datetime.utcnow() - self.horizon})
+            )
+        except PyMongoError as e:
+            logger.error(f"Error saving trending snapshot: {str(e)}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            await self.snapshot()
+            try:
+                await self.merge_snapshots()
+                await self.catch_up()
+            except PyMongoError as e:
+                logger.error(f"Error refreshing trending index: {str(e)}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.snapshot()
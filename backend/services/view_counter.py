@@ -0,0 +1,119 @@
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """Write-behind aggregation of article page views.
+
+    `increment` acknowledges a view from memory and returns an estimated
+    count (last persisted value plus unflushed views). Deltas are written
+    every `flush_interval` seconds as one unordered `bulk_write` of `$inc`
+    updates, so Mongo load follows the number of distinct articles viewed,
+    not the number of page views. `stop()` flushes whatever is left.
+    """
+
+    def __init__(self, db, flush_interval: Optional[float] = None, max_tracked: int = 10000):
+        self.db = db
+        self.flush_interval = flush_interval or float(os.environ.get('VIEW_FLUSH_INTERVAL_SECONDS', 10))
+        self.max_tracked = max_tracked
+
+        self._pending: Dict[int, int] = {}
+        self._persisted: OrderedDict = OrderedDict()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def increment(self, article_id: int) -> Optional[int]:
+        """Record one view; returns the estimated count, or None if the article doesn't exist"""
+        persisted = self._persisted.get(article_id)
+        if persisted is None:
+            # First view of this article since startup: one read to check it exists
+            article = await self.db.articles.find_one({'articleId': article_id}, {'_id': 0, 'views': 1})
+            if not article:
+                return None
+            persisted = article.get('views', 0)
+            self._remember(article_id, persisted)
+        else:
+            self._persisted.move_to_end(article_id)
+
+        self._pending[article_id] = self._pending.get(article_id, 0) + 1
+        return self._persisted.get(article_id, persisted) + self._pending[article_id]
+
+    def estimate(self, article_id: int) -> Optional[int]:
+        persisted = self._persisted.get(article_id)
+        if persisted is None:
+            return None
+        return persisted + self._pending.get(article_id, 0)
+
+    async def flush(self) -> int:
+        """Write accumulated deltas; returns the number of articles updated"""
+        async with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            operations = [
+                UpdateOne({'articleId': article_id}, {'$inc': {'views': delta}})
+                for article_id, delta in pending.items()
+            ]
+            try:
+                await self.db.articles.bulk_write(operations, ordered=False)
+            except PyMongoError as e:
+                # Put the deltas back so the next flush retries them
+                for article_id, delta in pending.items():
+                    self._pending[article_id] = self._pending.get(article_id, 0) + delta
+                logger.error(f"Error flushing {len(pending)} view counts: {str(e)}")
+                return 0
+
+            # Re-read the flushed counts so estimates include other workers' views
+            try:
+                cursor = self.db.articles.find(
+                    {'articleId': {'$in': list(pending)}},
+                    {'_id': 0, 'articleId': 1, 'views': 1}
+                )
+                async for article in cursor:
+                    self._remember(article['articleId'], article.get('views', 0))
+            except PyMongoError as e:
+                logger.warning(f"Could not refresh view counts: {str(e)}")
+                for article_id, delta in pending.items():
+                    if article_id in self._persisted:
+                        self._persisted[article_id] += delta
+
+            return len(pending)
+
+    def _remember(self, article_id: int, views: int):
+        self._persisted[article_id] = views
+        self._persisted.move_to_end(article_id)
+        while len(self._persisted) > self.max_tracked:
+            self._persisted.popitem(last=False)
+
+    def start(self):
+        """Start the periodic flush loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"View counter flushing every {self.flush_interval:g}s")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error in view counter flush loop: {str(e)}")
+
+    async def stop(self):
+        """Stop the flush loop and write the remaining deltas"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
@@ -0,0 +1,168 @@
+import os
+import math
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+def parse_published_at(value) -> Optional[datetime]:
+    """NewsAPI `publishedAt` ('2024-01-01T10:00:00Z') as a naive UTC datetime"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (ValueError, AttributeError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+class WatermarkStore:
+    """Per-query high-water marks of `publishedAt`, kept in `fetch_watermarks`.
+
+    A query only asks NewsAPI for articles newer than its watermark. Each
+    watermark also tracks an exponentially weighted rate of new articles per
+    hour, which sizes the next request's page. Observations are staged
+    during a run and only written by `commit()`, once the run has stored its
+    articles, so a failed run refetches the same window instead of skipping
+    it.
+    """
+
+    def __init__(
+        self,
+        db,
+        min_page_size: Optional[int] = None,
+        max_page_size: Optional[int] = None,
+        rate_smoothing: float = 0.3
+    ):
+        self.db = db
+        self.min_page_size = min_page_size or int(os.environ.get('FETCH_MIN_PAGE_SIZE', 5))
+        self.max_page_size = max_page_size or int(os.environ.get('FETCH_MAX_PAGE_SIZE', 100))
+        self.rate_smoothing = rate_smoothing
+
+        self._marks: Dict[str, Dict] = {}
+        self._staged: Dict[str, Dict] = {}
+
+    async def load(self):
+        """Read every watermark in one query (a few dozen documents at most)"""
+        self._staged = {}
+        try:
+            self._marks = {
+                mark['_id']: mark
+                async for mark in self.db.fetch_watermarks.find({})
+            }
+        except PyMongoError as e:
+            logger.error(f"Error loading fetch watermarks, fetching full windows: {str(e)}")
+            self._marks = {}
+
+    def since(self, key: str, lookback: timedelta, now: Optional[datetime] = None) -> datetime:
+        """Oldest publishedAt to request: the watermark, but never older than `lookback`"""
+        now = now or datetime.utcnow()
+        floor = now - lookback
+        mark = self._marks.get(key)
+        if mark and mark.get('publishedAt') and mark['publishedAt'] > floor:
+            return mark['publishedAt']
+        return floor
+
+    def page_size(self, key: str, default: int, now: Optional[datetime] = None) -> int:
+        """Page size for the expected number of new articles, capped at `default`.
+
+        `default` is the query's configured per-run limit; with no history the
+        full limit is requested.
+        """
+        mark = self._marks.get(key)
+        if not mark or mark.get('ratePerHour') is None or not mark.get('fetchedAt'):
+            return default
+        hours = max((now or datetime.utcnow()) - mark['fetchedAt'], timedelta(0)).total_seconds() / 3600
+        # Headroom over the expected count, so a busier window still fits
+        expected = math.ceil(mark['ratePerHour'] * hours * 1.5) + 1
+        return max(min(expected, default, self.max_page_size), min(self.min_page_size, default))
+
+    def observe(
+        self,
+        key: str,
+        newest: Optional[datetime],
+        total_results: int,
+        now: Optional[datetime] = None,
+        complete: bool = True,
+        validators: Optional[Dict] = None
+    ):
+        """Stage the outcome of one query until `commit()`.
+
+        `complete` is False when the query returned fewer articles than
+        matched. Results come newest first, so the missing ones are older
+        than everything returned: the watermark then stays put and the next
+        run asks for the same window again, with a page sized by the higher
+        rate.
+
+        `validators` ({'etag', 'lastModified'} of the response read) are
+        committed with the watermark, so a conditional request only relies
+        on them once what they cover has been stored.
+        """
+        now = now or datetime.utcnow()
+        mark = self._marks.get(key) or {}
+        rate = mark.get('ratePerHour')
+        if mark.get('fetchedAt'):
+            hours = max((now - mark['fetchedAt']).total_seconds() / 3600, 1 / 60)
+            observed = total_results / hours
+            rate = observed if rate is None else rate + self.rate_smoothing * (observed - rate)
+
+        if not complete:
+            newest = None
+        newest = max(filter(None, [newest, mark.get('publishedAt')]), default=None)
+        self._staged[key] = {
+            'publishedAt': newest,
+            'ratePerHour': rate,
+            'fetchedAt': now,
+            'lastTotalResults': total_results,
+            'validators': validators
+        }
+
+    def validators(self, key: str) -> Dict:
+        """ETag / Last-Modified committed with a feed's watermark, if any"""
+        mark = self._marks.get(key) or {}
+        return mark.get('validators') or {}
+
+    async def commit(self) -> int:
+        """Persist staged watermarks; returns how many were written"""
+        staged, self._staged = self._staged, {}
+        if not staged:
+            return 0
+
+        operations = []
+        for key, mark in staged.items():
+            update = {'$set': {
+                'ratePerHour': mark['ratePerHour'],
+                'fetchedAt': mark['fetchedAt'],
+                'lastTotalResults': mark['lastTotalResults']
+            }}
+            if mark['validators'] is not None:
+                update['$set']['validators'] = mark['validators']
+            if mark['publishedAt'] is not None:
+                # $max keeps a newer mark written meanwhile by another process
+                update['$max'] = {'publishedAt': mark['publishedAt']}
+            operations.append(UpdateOne({'_id': key}, update, upsert=True))
+
+        try:
+            await self.db.fetch_watermarks.bulk_write(operations, ordered=False)
+        except PyMongoError as e:
+            logger.error(f"Error saving {len(operations)} fetch watermarks: {str(e)}")
+            return 0
+
+        for key, mark in staged.items():
+            if mark['validators'] is None:
+                # Nothing new was written, so the stored validators still apply
+                mark = {name: value for name, value in mark.items() if name != 'validators'}
+            self._marks[key] = {**self._marks.get(key, {}), **mark, '_id': key}
+        return len(operations)
+
+    def discard(self):
+        """Drop staged observations after a failed run"""
+        self._staged = {}
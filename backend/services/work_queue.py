@@ -0,0 +1,227 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import PyMongoError
+from backend.services.dedupe import source_key
+
+logger = logging.getLogger(__name__)
+
+# Finished items are kept this long (TTL on finishedAt) for inspection
+ITEM_TTL_SECONDS = int(os.environ.get('WORK_ITEM_TTL_DAYS', 7)) * 86400
+
+PENDING = 'pending'
+REWRITING = 'rewriting'
+REWRITTEN = 'rewritten'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class WorkQueue:
+    """Durable per-article work items for the rewrite pipeline, in `work_items`.
+
+    Each source article is one item keyed on its sourceUrlKey and moves
+    pending -> rewriting -> rewritten -> done. Workers claim items with an
+    atomic find_one_and_update that sets a lease; an item whose lease has
+    expired (its worker died) can be claimed by anyone. The rewrite is
+    checkpointed on the item, so an item claimed back in the `rewritten`
+    state goes straight to storage without another LLM call.
+
+    An item is rewritten at most `max_attempts` times before it is marked
+    failed; only claims that lead to an LLM call count as attempts. A
+    checkpoint whose article fails to store goes back to `rewritten`, and is
+    marked failed after `max_attempts` failed stores.
+    """
+
+    def __init__(
+        self,
+        db,
+        lease_seconds: Optional[float] = None,
+        max_attempts: Optional[int] = None
+    ):
+        self.db = db
+        self.lease = timedelta(seconds=lease_seconds or float(os.environ.get('WORK_LEASE_SECONDS', 300)))
+        self.max_attempts = max_attempts or int(os.environ.get('WORK_MAX_ATTEMPTS', 3))
+
+    async def enqueue(self, job_id: str, articles: List[Dict], batchable=None) -> int:
+        """Add source articles as pending items; returns how many were new.
+
+        An article already queued (e.g. left over from an interrupted run)
+        keeps its existing item and progress.
+        """
+        if not articles:
+            return 0
+
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {'_id': source_key(article)},
+                {'$setOnInsert': {
+                    'jobId': job_id,
+                    'state': PENDING,
+                    'article': article,
+                    'batchable': bool(batchable(article)) if batchable else False,
+                    'priority': article.get('priority', 5),
+                    'attempts': 0,
+                    'leaseOwner': None,
+                    'leaseExpiresAt': None,
+                    'createdAt': now,
+                    'updatedAt': now
+                }},
+                upsert=True
+            )
+            for article in articles
+        ]
+        result = await self.db.work_items.bulk_write(operations, ordered=False)
+        return result.upserted_count
+
+    async def claim(self, owner: str, limit: int = 1, batchable_only: bool = False) -> List[Dict]:
+        """Lease up to `limit` claimable items to `owner`, highest priority first.
+
+        With `batchable_only`, only batchable items that still need a
+        rewrite are claimed (to fill a batch request).
+        """
+        now = datetime.utcnow()
+        # A checkpointed rewrite needs no LLM call, so it is claimable whatever its attempts
+        checkpointed = {'state': REWRITTEN, 'leaseExpiresAt': {'$lte': now}}
+        retry = {'state': REWRITING, 'leaseExpiresAt': {'$lt': now}, 'attempts': {'$lt': self.max_attempts}}
+        pending = {'state': PENDING, 'attempts': {'$lt': self.max_attempts}}
+        if batchable_only:
+            retry['batchable'] = pending['batchable'] = True
+
+        items = []
+        for _ in range(limit):
+            # Abandoned items first (they are the oldest), keeping their state and checkpoint;
+            # only claims that lead to an LLM call use up an attempt
+            item = None
+            if not batchable_only:
+                item = await self._claim_one(checkpointed, owner, now)
+            if item is None:
+                item = await self._claim_one(retry, owner, now, attempt=True)
+            if item is None:
+                item = await self._claim_one(pending, owner, now, {'state': REWRITING}, attempt=True)
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    async def _claim_one(
+        self,
+        query: Dict,
+        owner: str,
+        now: datetime,
+        extra: Optional[Dict] = None,
+        attempt: bool = False
+    ) -> Optional[Dict]:
+        update = {
+            '$set': {
+                'leaseOwner': owner,
+                'leaseExpiresAt': now + self.lease,
+                'updatedAt': now,
+                **(extra or {})
+            }
+        }
+        if attempt:
+            update['$inc'] = {'attempts': 1}
+        return await self.db.work_items.find_one_and_update(
+            query,
+            update,
+            sort=[('priority', -1), ('createdAt', 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def checkpoint(self, url: str, owner: str, rewritten: Dict) -> bool:
+        """Store an item's rewrite and renew its lease for the store stage"""
+        now = datetime.utcnow()
+        result = await self.db.work_items.update_one(
+            {'_id': url, 'leaseOwner': owner},
+            {'$set': {
+                'state': REWRITTEN,
+                'rewritten': rewritten,
+                'leaseExpiresAt': now + self.lease,
+                'updatedAt': now
+            }}
+        )
+        return result.modified_count == 1
+
+    async def release(self, item: Dict, owner: str, error: str):
+        """Give a failed item back to the queue, or fail it after its last attempt"""
+        now = datetime.utcnow()
+        final = item.get('attempts', 0) >= self.max_attempts
+        update = {
+            'state': FAILED if final else PENDING,
+            'leaseOwner': None,
+            'leaseExpiresAt': None,
+            'error': error[:500],
+            'updatedAt': now
+        }
+        if final:
+            update['finishedAt'] = now
+        await self.db.work_items.update_one({'_id': item['_id'], 'leaseOwner': owner}, {'$set': update})
+        return final
+
+    async def release_checkpoint(self, item: Dict, owner: str, error: str):
+        """Give back an item whose article failed to store, keeping its rewrite.
+
+        The item returns to `rewritten` with an expired lease, so the next
+        claim stores it without another LLM call. After `max_attempts` failed
+        stores it is marked failed (the checkpoint stays on the item).
+        """
+        now = datetime.utcnow()
+        final = item.get('storeAttempts', 0) + 1 >= self.max_attempts
+        update = {
+            'state': FAILED if final else REWRITTEN,
+            'leaseOwner': None,
+            'leaseExpiresAt': now,
+            'error': error[:500],
+            'updatedAt': now
+        }
+        if final:
+            update['finishedAt'] = now
+        await self.db.work_items.update_one(
+            {'_id': item['_id'], 'leaseOwner': owner},
+            {'$set': update, '$inc': {'storeAttempts': 1}}
+        )
+        return final
+
+    async def complete(self, urls: List[str]):
+        """Mark items whose articles are stored as done"""
+        if not urls:
+            return
+        now = datetime.utcnow()
+        try:
+            await self.db.work_items.update_many(
+                {'_id': {'$in': urls}, 'state': {'$ne': DONE}},
+                {'$set': {'state': DONE, 'leaseOwner': None, 'finishedAt': now, 'updatedAt': now}}
+            )
+        except PyMongoError as e:
+            logger.error(f"Error completing {len(urls)} work items: {str(e)}")
+
+    async def sweep(self) -> int:
+        """Fail items whose last lease ran out; returns how many"""
+        now = datetime.utcnow()
+        result = await self.db.work_items.update_many(
+            {
+                'state': REWRITING,
+                'leaseExpiresAt': {'$lt': now},
+                'attempts': {'$gte': self.max_attempts}
+            },
+            {'$set': {
+                'state': FAILED,
+                'leaseOwner': None,
+                'error': 'lease expired on last attempt',
+                'finishedAt': now,
+                'updatedAt': now
+            }}
+        )
+        if result.modified_count:
+            logger.warning(f"Failed {result.modified_count} work items abandoned on their last attempt")
+        return result.modified_count
+
+    async def counts(self) -> Dict[str, int]:
+        """Number of items in each state"""
+        counts = {}
+        async for row in self.db.work_items.aggregate([{'$group': {'_id': '$state', 'count': {'$sum': 1}}}]):
+            counts[row['_id']] = row['count']
+        return counts